@@ -7,7 +7,20 @@ Kotemari: プロジェクト分析およびコンテキスト生成ライブラ
 
 __version__ = "0.0.1" # TODO: Keep this in sync with pyproject.toml
 
-from .core import Kotemari
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .core import Kotemari
+
+def __getattr__(name: str):
+    # Load the facade on first access, so importing a submodule (e.g. the CLI parser for
+    # `--help`) does not pull in the whole analysis stack.
+    # 初回アクセス時にファサードを読み込み、サブモジュール（例: `--help` 用の CLI パーサー）の
+    # インポートで分析スタック全体が読み込まれないようにします。
+    if name == "Kotemari":
+        from .core import Kotemari
+        return Kotemari
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Optionally expose other core components if needed
 # 必要に応じて他のコアコンポーネントを公開します
@@ -1,14 +1,10 @@
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 import logging
-import sys
-import traceback
+import os
 
 from rich.console import Console
 from rich.table import Table
-from rich.syntax import Syntax
-from rich.panel import Panel
-from rich.text import Text
 from rich import box
 from rich.tree import Tree
 
@@ -28,6 +24,18 @@ logger = logging.getLogger("kotemari_cli")
 
 console = Console()
 
+def _tree_dir_node(nodes: Dict[str, Tree], dir_part: str) -> Tree:
+    """
+    Returns the tree node of a root-relative directory, adding it and any missing parents.
+    ルートからの相対ディレクトリのツリーノードを返します。存在しない場合は親を含めて追加します。
+    """
+    node = nodes.get(dir_part)
+    if node is None:
+        parent_part, _, name = dir_part.rpartition(os.sep)
+        node = _tree_dir_node(nodes, parent_part).add(f":folder: [bold]{name}")
+        nodes[dir_part] = node
+    return node
+
 class CliController:
     """
     Handles the logic for CLI commands, interfacing with the Kotemari core library.
@@ -60,6 +68,9 @@ class CliController:
     def _get_kotemari_instance(self, ctx: typer.Context) -> Kotemari:
         """Gets or initializes the Kotemari instance, using log level from callback."""
         if self._kotemari_instance:
+            # A reused instance may be behind the disk; the stat-based skip keeps this cheap
+            # 再利用したインスタンスはディスクより古い可能性があります。stat による省略で安価に済みます
+            self._kotemari_instance.refresh()
             return self._kotemari_instance
 
         # Retrieve log_level from the context object set in the callback
@@ -80,6 +91,7 @@ class CliController:
             self._kotemari_instance = Kotemari(
                 project_root=self.project_root, # Use resolved path from __init__
                 config_path=self.config_path,
+                use_cache=self.use_cache,
                 log_level=determined_log_level # Pass the determined log level
             )
             logger.info(f"Kotemari instance created with log level: {logging.getLevelName(determined_log_level)}")
@@ -108,7 +120,7 @@ class CliController:
             console.print_exception(show_locals=True)
             raise typer.Exit(code=1)
 
-    def _display_analysis_summary(self, analyzed_files: list):
+    def _display_analysis_summary(self, analyzed_files: tuple[FileInfo, ...]):
         """Displays the analysis summary in a table format.
         解析結果の要約をテーブル形式で表示します。
         """
@@ -227,7 +239,8 @@ class CliController:
         """
         try:
             logger.info("Listing project files via CLI controller...")
-            analyzed_files: list[FileInfo] = self._get_kotemari_instance(ctx).analyze_project()
+            instance = self._get_kotemari_instance(ctx)
+            analyzed_files: tuple[FileInfo, ...] = instance.analyze_project()
             logger.debug(f"display_list: Got {len(analyzed_files)} files.")
             if not analyzed_files:
                 self.console.print("No files found in the project (after applying ignore rules).")
@@ -236,18 +249,21 @@ class CliController:
             self.console.print("Files (respecting ignore rules):")
             # Use the instance's project_root consistently
             # インスタンスの project_root を一貫して使用
-            project_root_instance = self._get_kotemari_instance(ctx).project_root
+            project_root_instance = instance.project_root
+            root_prefix = os.path.join(str(project_root_instance), "")
+            lines: List[str] = []
             for file_info in sorted(analyzed_files, key=lambda f: f.path):
-                # Calculate relative path correctly
-                # 相対パスを正しく計算
-                try:
-                    relative_path = file_info.path.relative_to(project_root_instance)
-                    self.console.print(f"  {relative_path}")
-                except ValueError:
+                path_str = str(file_info.path)
+                if path_str.startswith(root_prefix):
+                    lines.append(f"  {path_str[len(root_prefix):]}")
+                else:
                     # Handle case where file path is not under project root (should not happen with proper analysis)
                     # ファイルパスがプロジェクトルートの下にない場合の処理（適切な分析では発生しないはず）
                     logger.warning(f"File path {file_info.path} is not relative to project root {project_root_instance}. Skipping display.")
-                    self.console.print(f"  {file_info.path} (Absolute Path)") # Display absolute path as fallback
+                    lines.append(f"  {path_str} (Absolute Path)") # Display absolute path as fallback
+            # One render and write for the whole list; file names are printed verbatim, not as markup
+            # リスト全体を1回で描画・書き込みします。ファイル名はマークアップとしてではなくそのまま出力します
+            self.console.print("\n".join(lines), markup=False, highlight=False)
 
             logger.debug("display_list: Finished printing files.")
         except Exception as e:
@@ -262,7 +278,8 @@ class CliController:
         """
         try:
             logger.info("Displaying project file tree via CLI controller...")
-            analyzed_files: list[FileInfo] = self._get_kotemari_instance(ctx).analyze_project()
+            instance = self._get_kotemari_instance(ctx)
+            analyzed_files: tuple[FileInfo, ...] = instance.analyze_project()
             logger.debug(f"display_tree: Got {len(analyzed_files)} files.")
             if not analyzed_files:
                 self.console.print("No files found to build tree (after applying ignore rules).")
@@ -270,35 +287,22 @@ class CliController:
 
             # Build and display tree using rich
             # rich を使用してツリーを構築および表示
-            project_root_instance = self._get_kotemari_instance(ctx).project_root # Get root path once
+            project_root_instance = instance.project_root
             tree = Tree(f":open_file_folder: [bold blue]{project_root_instance.name}")
-            nodes: Dict[Path, Tree] = {project_root_instance: tree} # Map paths to Tree nodes
+            # Directory nodes keyed by root-relative path strings; building the tree needs no Path objects
+            # ルートからの相対パス文字列をキーとするディレクトリノード。ツリーの構築に Path オブジェクトは不要です
+            nodes: Dict[str, Tree] = {"": tree}
+            root_prefix = os.path.join(str(project_root_instance), "")
 
-            # Use the instance's project_root consistently
-            # インスタンスの project_root を一貫して使用
             for file_info in sorted(analyzed_files, key=lambda f: f.path):
-                try:
-                    relative_path = file_info.path.relative_to(project_root_instance)
-                    parts = list(relative_path.parts)
-                    current_node = tree
-                    current_path = project_root_instance
-                    for i, part in enumerate(parts):
-                        current_path = current_path / part
-                        if i == len(parts) - 1: # File node
-                            # Add file node to its parent directory node
-                            # ファイルノードを親ディレクトリノードに追加
-                            parent_node = nodes.get(current_path.parent, tree)
-                            parent_node.add(f":page_facing_up: {part}")
-                        else: # Directory node
-                            if current_path not in nodes:
-                                # Add directory node if it doesn't exist
-                                # ディレクトリノードが存在しない場合は追加
-                                parent_node = nodes.get(current_path.parent, tree)
-                                new_node = parent_node.add(f":folder: [bold]{part}")
-                                nodes[current_path] = new_node
-                            current_node = nodes[current_path]
-                except ValueError:
+                path_str = str(file_info.path)
+                if not path_str.startswith(root_prefix):
                     logger.warning(f"Skipping file for tree display: {file_info.path} is not relative to {project_root_instance}")
+                    continue
+                dir_part, _, name = path_str[len(root_prefix):].rpartition(os.sep)
+                # Add file node to its parent directory node
+                # ファイルノードを親ディレクトリノードに追加
+                _tree_dir_node(nodes, dir_part).add(f":page_facing_up: {name}")
 
             self.console.print(tree)
             logger.debug("display_tree: Finished displaying tree.")
@@ -1,17 +1,20 @@
 from pathlib import Path
-from typing import List, Optional, Callable, Union, Dict, Set
+from typing import List, Optional, Callable, Union, Dict, Set, Tuple
+import contextlib
+import dataclasses
 import logging
-import datetime
+import os
 import hashlib
 import importlib.metadata
+import sys
 import threading
-import queue
-import sys # Add sys for stderr output
 
 from .domain.file_info import FileInfo
 from .domain.file_system_event import FileSystemEvent
 from .domain.dependency_info import DependencyInfo, DependencyType
 from .utility.path_resolver import PathResolver
+from .utility.batch_queue import BatchQueue
+from .utility.error_log_sampler import ErrorLogSampler
 from .usecase.project_analyzer import ProjectAnalyzer
 from .usecase.config_manager import ConfigManager
 from .gateway.gitignore_reader import GitignoreReader
@@ -21,6 +24,7 @@ from .usecase.context_builder import ContextBuilder
 from .domain.project_config import ProjectConfig
 from .domain.context_data import ContextData
 from .gateway.file_system_accessor import FileSystemAccessor
+from .gateway.cache_storage import CacheStorage
 from .domain.file_content_formatter import BasicFileContentFormatter
 from .service.hash_calculator import HashCalculator
 from .service.language_detector import LanguageDetector
@@ -28,6 +32,7 @@ from .service.ast_parser import AstParser
 from .domain.exceptions import (
     KotemariError,
     AnalysisError,
+    AnalysisCancelledError,
     FileNotFoundErrorInAnalysis,
     ContextGenerationError,
     DependencyError
@@ -41,6 +46,74 @@ try:
 except importlib.metadata.PackageNotFoundError:
     __version__ = "0.0.0-dev" # Fallback version
 
+# Upper bound on pending watcher events; beyond this the oldest are dropped and a full re-analysis runs.
+# 保留中の監視イベントの上限。これを超えると古いものから破棄され、完全な再分析が実行されます。
+EVENT_QUEUE_MAXSIZE = 10000
+# Seconds the worker keeps collecting after the first event, so one editor save is handled as one batch.
+# 最初のイベント後にワーカーが収集を続ける秒数。エディタの1回の保存を1つのバッチとして処理します。
+EVENT_DEBOUNCE_SECONDS = 0.2
+# Number of striped per-path locks serializing differential updates (a power of two).
+# 差分更新を直列化するパス単位のストライプロック数（2のべき乗）。
+PATH_LOCK_STRIPES = 64
+
+# Dependency types resolved against the project; built once instead of per dependency.
+# プロジェクト内で解決される依存関係の種類。依存関係ごとではなく一度だけ構築します。
+_INTERNAL_DEPENDENCY_TYPES = frozenset((DependencyType.INTERNAL_ABSOLUTE, DependencyType.INTERNAL_RELATIVE))
+
+def _event_coalesce_key(event: FileSystemEvent) -> Optional[str]:
+    """
+    Key used to coalesce pending events for the same path. Moves are never coalesced.
+    同じパスの保留中イベントを統合するためのキー。移動イベントは統合されません。
+    """
+    if event.event_type == "moved":
+        return None
+    return str(event.src_path)
+
+def _merge_events(pending: FileSystemEvent, newer: FileSystemEvent) -> FileSystemEvent:
+    """
+    Merges a newer event into a pending one for the same path.
+    A delete followed by a re-create becomes a modification so the old index entries are replaced.
+    同じパスの保留中イベントに新しいイベントを統合します。
+    削除後の再作成は、古いインデックスエントリが置き換えられるよう変更として扱います。
+    """
+    if pending.event_type == "deleted" and newer.event_type in ("created", "modified"):
+        return dataclasses.replace(newer, event_type="modified")
+    return newer
+
+def _drop_superseded_events(events: List[FileSystemEvent]) -> List[FileSystemEvent]:
+    """
+    Drops file create/modify events for paths that a later event in the same batch moves away.
+    Editors that save atomically write a temporary file and rename it over the target; the move
+    already analyzes the destination, so analyzing the vanished temporary file is wasted work.
+    同じバッチ内の後続イベントで移動されるパスに対する、ファイルの作成/変更イベントを破棄します。
+    アトミック保存を行うエディタは一時ファイルを書き込んで対象へリネームします。移動イベントが
+    移動先を分析するため、消えた一時ファイルの分析は無駄な処理になります。
+    """
+    moved_away: Set[str] = set()
+    kept: List[FileSystemEvent] = []
+    for event in reversed(events):
+        if not event.is_directory:
+            if event.event_type == "moved":
+                moved_away.add(str(event.src_path))
+            elif event.event_type in ("created", "modified") and str(event.src_path) in moved_away:
+                continue
+        kept.append(event)
+    kept.reverse()
+    return kept
+
+def _intern_dependency_names(file_info: FileInfo) -> None:
+    """
+    Interns the module name strings of a file's dependencies. The same modules are imported
+    by many files, so interning keeps one string per name and turns the equality checks of
+    later lookups into identity checks.
+    ファイルの依存関係のモジュール名文字列をインターンします。同じモジュールは多くのファイルから
+    インポートされるため、インターンにより名前ごとに1つの文字列だけを保持し、後続の検索での
+    等価比較を同一性比較にします。
+    """
+    for dependency in file_info.dependencies or ():
+        dependency.module_name = sys.intern(dependency.module_name)
+        dependency.resolved_name = sys.intern(dependency.resolved_name)
+
 class Kotemari:
     """
     The main facade class for the Kotemari library.
@@ -57,7 +130,8 @@ class Kotemari:
         config_path: Optional[Union[str, Path]] = None,
         use_cache: bool = True,
         cache_dir: Optional[Union[str, Path]] = None,
-        log_level: Union[int, str] = logging.INFO
+        log_level: Union[int, str] = logging.INFO,
+        parse_in_processes: bool = False
     ):
         """
         Initializes the Kotemari facade.
@@ -75,14 +149,27 @@ class Kotemari:
                 設定ファイル（例: .kotemari.yml）へのパス。
                 None の場合、project_root から上方に検索します。
                 デフォルトは None。
-            use_cache (bool, optional): Whether to use in-memory caching.
-                                       メモリ内キャッシングを使用するかどうか。
-            cache_dir (Optional[Path | str], optional): The directory for caching.
-                                                       キャッシュのためのディレクトリ。
+            use_cache (bool, optional): Whether to persist the analysis index between runs, so a cold
+                                        start only re-analyzes files changed since the last run.
+                                        実行間で分析インデックスを永続化し、コールドスタート時に
+                                        前回以降に変更されたファイルのみを再分析するかどうか。
+            cache_dir (Optional[Path | str], optional): The directory for the persisted index.
+                                                       Defaults to ~/.cache/kotemari.
+                                                       永続化されたインデックスのディレクトリ。
+                                                       デフォルトは ~/.cache/kotemari。
             log_level (Union[int, str], optional): The logging level for the Kotemari instance.
                                                   Defaults to logging.INFO.
                                                   ログレベル。
                                                   デフォルトは logging.INFO。
+            parse_in_processes (bool, optional): Parse the Python files of larger projects in a pool of
+                                                 worker processes (one per instance, shut down by close()).
+                                                 The calling program's entry point must be guarded by
+                                                 `if __name__ == "__main__":`. Defaults to False.
+                                                 大きなプロジェクトの Python ファイルをワーカープロセスのプール
+                                                 （インスタンスごとに1つ、close() で終了）で解析します。
+                                                 呼び出し元プログラムのエントリポイントは
+                                                 `if __name__ == "__main__":` で保護されている必要があります。
+                                                 デフォルトは False。
         """
         # --- Core Components Initialization ---
         self._path_resolver = PathResolver()
@@ -92,9 +179,6 @@ class Kotemari:
         if not self._project_root.is_dir():
             raise NotADirectoryError(f"Project root is not a valid directory: {self._project_root}")
 
-        # Debug print to stderr
-        # print(f"Kotemari.__init__: Initializing for {self._project_root}", file=sys.stderr)
-
         self._config_path: Optional[Path] = None
         if config_path:
             self._config_path = self._path_resolver.resolve_absolute(config_path, base_dir=self._project_root)
@@ -106,10 +190,18 @@ class Kotemari:
         self._file_accessor = FileSystemAccessor(self._path_resolver)
         self._gitignore_reader = GitignoreReader(self._project_root)
         self._ignore_processor = IgnoreRuleProcessor(self._project_root, self._config, self._path_resolver)
+        # Matchers fetched once; refreshed by _reload_ignore_rules() when a .gitignore changes
+        # 一度だけ取得する判定関数。.gitignore の変更時に _reload_ignore_rules() で更新されます
+        self._ignore_fn = self._ignore_processor.get_ignore_function()
+        self._ignore_dir_fn = self._ignore_processor.get_dir_ignore_function()
         self._hash_calculator = HashCalculator()
         self._language_detector = LanguageDetector()
         self._ast_parser = AstParser()
         self._formatter = BasicFileContentFormatter()
+        self._cache_storage: Optional[CacheStorage] = None
+        if use_cache:
+            self._cache_storage = CacheStorage(self._project_root, self._file_accessor,
+                                               cache_dir=Path(cache_dir) if cache_dir else None)
 
         # --- Analyzer Initialization ---
         self.analyzer: ProjectAnalyzer = ProjectAnalyzer(
@@ -120,25 +212,56 @@ class Kotemari:
             ignore_processor=self._ignore_processor,
             hash_calculator=self._hash_calculator,
             language_detector=self._language_detector,
-            ast_parser=self._ast_parser
+            ast_parser=self._ast_parser,
+            parse_in_processes=parse_in_processes
         )
 
         # --- In-Memory Cache Initialization (Step 11-1-2 & 11-1-3) ---
-        self._analysis_results: Dict[Path, FileInfo] = {}
+        # Keyed by str(FileInfo.path) so lookups hash a plain string instead of a Path.
+        # Copy-on-write: writers build a new dict under _analysis_lock and swap the reference,
+        # so readers take the current dict without locking and never see it change size.
+        # Path ではなく文字列をハッシュして検索できるよう、str(FileInfo.path) をキーにします。
+        # コピーオンライト: 書き込み側は _analysis_lock の下で新しい辞書を作成して参照を差し替えるため、
+        # 読み取り側はロックなしで現在の辞書を取得でき、そのサイズが変わることはありません。
+        self._analysis_results: Dict[str, FileInfo] = {}
         self._reverse_dependency_index: Dict[Path, Set[Path]] = {}
+        # Targets each file is linked under in the reverse index, so its edges can be replaced exactly
+        # 各ファイルが逆インデックスで紐付けられている依存先。これによりそのエッジを正確に置き換えられます
+        self._forward_dependency_index: Dict[Path, Set[Path]] = {}
+        # Dotted module name -> analyzed file defining it, used to resolve internal imports by lookup
+        # ドット区切りのモジュール名 -> それを定義する分析済みファイル。内部インポートを検索で解決するために使用
+        self._module_map: Dict[str, Path] = {}
+        # (results dict, its values as a tuple): rebuilt lazily once per published results dict
+        # (結果の辞書, その値のタプル): 公開された結果の辞書ごとに一度だけ遅延して再構築されます
+        self._values_snapshot: Tuple[Optional[Dict[str, FileInfo]], Tuple[FileInfo, ...]] = (None, ())
         self.project_analyzed: bool = False
-        self._analysis_lock = threading.Lock() # Lock for accessing/modifying analysis results
+        self._analysis_lock = threading.Lock() # Serializes writers of the analysis results
+        # Differential updates of one file serialize on its stripe; a full rebuild takes every stripe
+        # 1ファイルの差分更新はそのストライプで直列化され、完全な再構築はすべてのストライプを取得します
+        self._path_locks = [threading.RLock() for _ in range(PATH_LOCK_STRIPES)]
+        self._full_analysis_lock = threading.Lock() # Serializes full re-analyses
         self._reverse_dependency_index_lock = threading.Lock() # Lock for the reverse dependency index (Step 12-1-2)
 
         # --- Monitoring and Background Update Components (Will be initialized in start_watching - Step 11-1-4,5,6) ---
         self._event_monitor: Optional[FileSystemEventMonitor] = None
-        self._event_queue: Optional[queue.Queue] = None
+        self._event_queue: Optional[BatchQueue[FileSystemEvent]] = None
         self._background_worker_thread: Optional[threading.Thread] = None
         self._stop_worker_event = threading.Event()
-
-        logger.info(f"Kotemari v{__version__} initialized for project root: {self._project_root}")
+        # The worker thread is created on the first start_watching and then parked between watch sessions
+        # ワーカースレッドは最初の start_watching で作成され、監視セッションの間は待機状態になります
+        self._watch_active = threading.Event()
+        # Set by close() to let the parked worker thread exit
+        # 待機中のワーカースレッドを終了させるために close() が設定します
+        self._shutdown_worker = threading.Event()
+        self._worker_idle = threading.Event()
+        self._worker_idle.set()
+        # Repeated errors on the event path are logged with a traceback only for the first few occurrences
+        # イベント処理中に繰り返し発生するエラーは、最初の数回のみトレースバック付きで記録されます
+        self._error_log_sampler = ErrorLogSampler()
+
+        logger.info("Kotemari v%s initialized for project root: %s", __version__, self._project_root)
         if self._config_path:
-            logger.info(f"Using explicit config path: {self._config_path}")
+            logger.info("Using explicit config path: %s", self._config_path)
 
         # Initialize Context Builder
         self.context_builder = ContextBuilder(
@@ -148,7 +271,8 @@ class Kotemari:
 
         # --- Perform initial analysis (Step 11-1-2 cont.) ---
         logger.info("Performing initial project analysis...")
-        self._run_analysis_and_update_memory() # Perform initial full analysis
+        previous_results = self._cache_storage.load_analysis_index() if self._cache_storage else None
+        self._run_analysis_and_update_memory(previous_results=previous_results) # Perform initial full analysis
 
     @property
     def project_root(self) -> Path:
@@ -160,34 +284,155 @@ class Kotemari:
         # プライベート変数を返す
         return self._project_root
 
-    def _run_analysis_and_update_memory(self):
-        """Runs the analysis and updates the in-memory cache atomically."""
-        logger.debug("Acquiring analysis lock for full analysis...")
-        with self._analysis_lock:
+    def _run_analysis_and_update_memory(self, cancel_event: Optional[threading.Event] = None,
+                                        previous_results: Optional[Dict[str, FileInfo]] = None,
+                                        trust_mtime: bool = True):
+        """
+        Runs the analysis and updates the in-memory cache atomically.
+        The analysis itself runs without holding the analysis lock, so readers are only
+        blocked for the swap. If cancel_event is set while the analysis runs, the current cache is kept.
+        Unchanged files found in previous_results (e.g., a persisted index) are reused as is.
+        分析を実行し、メモリ内キャッシュをアトミックに更新します。
+        分析自体は分析ロックを保持せずに実行されるため、読み取り側がブロックされるのは差し替えの間だけです。
+        分析中に cancel_event が設定された場合は、現在のキャッシュを保持します。
+        previous_results（例: 永続化されたインデックス）にある変更のないファイルはそのまま再利用されます。
+        With trust_mtime=False they are re-hashed, and only files whose hash changed are parsed again.
+        trust_mtime=False の場合は再ハッシュされ、ハッシュが変化したファイルのみが再解析されます。
+        """
+        with self._full_analysis_lock:
             logger.info("Running full project analysis...")
             try:
                 # English: Analyze the project to get a list of FileInfo objects.
                 # 日本語: プロジェクトを分析して FileInfo オブジェクトのリストを取得します。
-                analysis_list: list[FileInfo] = self.analyzer.analyze()
-
-                # English: Convert the list to a dictionary keyed by path for efficient lookup.
-                # 日本語: 効率的な検索のために、リストをパスをキーとする辞書に変換します。
-                new_results: Dict[Path, FileInfo] = {fi.path: fi for fi in analysis_list}
-
-                # English: Update the in-memory cache with the new dictionary results.
-                # 日本語: 新しい辞書の結果でメモリ内キャッシュを更新します。
-                self._analysis_results = new_results
-                self._build_reverse_dependency_index()
-                self.project_analyzed = True
-                logger.info(f"Initial analysis complete. Found {len(self._analysis_results)} files.")
+                analyze_kwargs = {}
+                if cancel_event is not None:
+                    analyze_kwargs["cancel_event"] = cancel_event
+                if previous_results:
+                    analyze_kwargs["previous_results"] = previous_results
+                if not trust_mtime:
+                    analyze_kwargs["trust_mtime"] = False
+                analysis_list: list[FileInfo] = self.analyzer.analyze(**analyze_kwargs)
+
+                # English: Convert the list to a dictionary keyed by the path string for efficient lookup.
+                # 日本語: 効率的な検索のために、リストをパス文字列をキーとする辞書に変換します。
+                new_results: Dict[str, FileInfo] = {str(fi.path): fi for fi in analysis_list}
+                for file_info in analysis_list:
+                    _intern_dependency_names(file_info)
+            except AnalysisCancelledError:
+                logger.info("Full project analysis cancelled; keeping the current results.")
+                return
             except Exception as e:
-                logger.error(f"Initial project analysis failed: {e}", exc_info=True)
-                self._analysis_results = {} # Ensure cache is cleared on error
-                self.project_analyzed = False
-                # Optionally re-raise or handle differently?
-            logger.debug("Released analysis lock after full analysis.")
+                logger.error("Initial project analysis failed: %s", e, exc_info=True)
+                new_results = None
+
+            # English: Swap the results in while holding every path stripe, so no differential update interleaves.
+            # 日本語: 差分更新が割り込まないよう、すべてのパスストライプを保持したまま結果を差し替えます。
+            with contextlib.ExitStack() as stack:
+                for path_lock in self._path_locks:
+                    stack.enter_context(path_lock)
+                logger.debug("Acquiring analysis lock to swap in full analysis results...")
+                with self._analysis_lock:
+                    if new_results is None:
+                        self.project_analyzed = False
+                        self._analysis_results = {} # Ensure cache is cleared on error
+                    else:
+                        self._analysis_results = new_results
+                        self.project_analyzed = True
+                if new_results is not None:
+                    self._build_reverse_dependency_index()
+                    logger.info("Initial analysis complete. Found %d files.", len(new_results))
+            logger.debug("Released locks after full analysis.")
+            if new_results is not None:
+                self._save_analysis_index()
+
+    def _save_analysis_index(self) -> None:
+        """
+        Persists the current analysis results when caching is enabled.
+        キャッシュが有効な場合、現在の分析結果を永続化します。
+        """
+        if self._cache_storage is None or not self.project_analyzed:
+            return
+        self._cache_storage.save_analysis_index(self._analysis_results)
+
+    def _store_result(self, file_info: FileInfo) -> None:
+        """
+        Adds or replaces one entry of the analysis results by swapping in a modified copy.
+        Caller must hold _analysis_lock.
+        変更したコピーに差し替えることで、分析結果の1エントリを追加または置換します。
+        呼び出し元は _analysis_lock を保持している必要があります。
+        """
+        self._store_results((file_info,))
+
+    def _store_results(self, file_infos: Tuple[FileInfo, ...]) -> None:
+        """
+        Adds or replaces several entries of the analysis results, copying the dict only once.
+        Caller must hold _analysis_lock.
+        辞書のコピーを1回だけ行い、分析結果の複数のエントリを追加または置換します。
+        呼び出し元は _analysis_lock を保持している必要があります。
+        """
+        if not file_infos:
+            return
+        results = dict(self._analysis_results)
+        for file_info in file_infos:
+            results[str(file_info.path)] = file_info
+        self._analysis_results = results
+        for file_info in file_infos:
+            self._refresh_module_entry(str(file_info.path), results)
+
+    def _mark_dependencies_stale(self, dependent_paths: Set[Path], changed_path: Path) -> None:
+        """
+        Publishes copies of the dependents' FileInfo flagged with stale dependencies, in one swap.
+        Published FileInfo objects are never modified in place.
+        依存元の FileInfo を依存関係が古いものとしてマークしたコピーを、1回の差し替えで公開します。
+        公開済みの FileInfo オブジェクトはその場で変更されません。
+
+        Args:
+            dependent_paths (Set[Path]): Files depending on the changed file.
+                                         変更されたファイルに依存するファイル。
+            changed_path (Path): The changed (modified or deleted) file, or the removed directory.
+                                 変更（または削除）されたファイル、または削除されたディレクトリ。
+        """
+        with self._analysis_lock:
+            stale_infos = []
+            for dependent_path in dependent_paths:
+                dependent_info = self._analysis_results.get(str(dependent_path))
+                if dependent_path == changed_path:
+                    continue
+                if dependent_info is None:
+                    logger.warning("Dependent '%s' found for '%s' but not in analysis results.", dependent_path, changed_path)
+                    continue
+                if not dependent_info.dependencies_stale:
+                    logger.debug("依存関係の波及: %s の依存関係を古いものとしてマークします。", dependent_path)
+                    stale_infos.append(dataclasses.replace(dependent_info, dependencies_stale=True))
+            self._store_results(tuple(stale_infos))
 
-    def analyze_project(self, force_reanalyze: bool = False) -> list[FileInfo]:
+    def _discard_result(self, path_key: str) -> Optional[FileInfo]:
+        """
+        Removes one entry of the analysis results by swapping in a modified copy.
+        Caller must hold _analysis_lock.
+        変更したコピーに差し替えることで、分析結果の1エントリを削除します。
+        呼び出し元は _analysis_lock を保持している必要があります。
+
+        Returns:
+            Optional[FileInfo]: The removed entry, or None if there was none.
+                                削除されたエントリ。存在しなかった場合は None。
+        """
+        file_info = self._analysis_results.get(path_key)
+        if file_info is not None:
+            results = dict(self._analysis_results)
+            del results[path_key]
+            self._analysis_results = results
+            self._refresh_module_entry(path_key, results)
+        return file_info
+
+    def _lock_for(self, path: Path) -> threading.RLock:
+        """
+        Returns the striped lock that serializes differential updates of a path.
+        パスの差分更新を直列化するストライプロックを返します。
+        """
+        return self._path_locks[hash(str(path)) & (PATH_LOCK_STRIPES - 1)]
+
+    def analyze_project(self, force_reanalyze: bool = False) -> Tuple[FileInfo, ...]:
         """
         Returns the analyzed project files from the in-memory cache.
         Performs re-analysis only if forced.
@@ -195,36 +440,95 @@ class Kotemari:
         強制された場合のみ再分析を実行します。
 
         Args:
-            force_reanalyze: If True, ignores the current in-memory cache and performs a full re-analysis.
-                             Trueの場合、現在のメモリ内キャッシュを無視して完全な再分析を実行します。
+            force_reanalyze: If True, re-scans and re-hashes every file. Files whose content hash is
+                             unchanged keep their parsed dependencies; use invalidate_cache() to re-parse everything.
+                             Trueの場合、すべてのファイルを再スキャン・再ハッシュします。内容のハッシュが変わらない
+                             ファイルは解析済みの依存関係を保持します。すべてを再解析するには invalidate_cache() を使用します。
 
         Returns:
-            A list of FileInfo objects representing the analyzed files.
-            分析されたファイルを表す FileInfo オブジェクトのリスト。
+            A tuple of FileInfo objects representing the analyzed files. The tuple is shared
+            between calls until the results change, so it is not copied per call.
+            分析されたファイルを表す FileInfo オブジェクトのタプル。結果が変わるまで呼び出し間で
+            共有されるため、呼び出しごとにコピーされません。
 
         Raises:
              AnalysisError: If the analysis has not completed successfully yet.
                             分析がまだ正常に完了していない場合。
         """
-        logger.debug(f"analyze_project called. Force reanalyze: {force_reanalyze}")
+        logger.debug("analyze_project called. Force reanalyze: %s", force_reanalyze)
         if force_reanalyze:
             logger.info("Forcing re-analysis...")
-            self._run_analysis_and_update_memory() # Run full analysis
+            self._run_analysis_and_update_memory(previous_results=self._analysis_results, trust_mtime=False)
 
-        # Debug print to stderr
-        # print(f"Kotemari.analyze_project: Starting analysis for {self._project_root}", file=sys.stderr)
+        results = self._results_snapshot()
+        cached_results, values = self._values_snapshot
+        if cached_results is not results:
+            values = tuple(results.values())
+            self._values_snapshot = (results, values)
+        logger.debug("Returning %s results from memory.", len(values))
+        return values
 
-        logger.debug("Acquiring analysis lock to read results...")
-        with self._analysis_lock:
-            logger.debug("Acquired analysis lock.")
-            if not self.project_analyzed or self._analysis_results is None:
-                logger.error("Analysis has not completed successfully yet.")
-                raise AnalysisError("Project analysis has not completed successfully.")
-            logger.debug(f"Returning {len(self._analysis_results)} results from memory.")
-            # Return a copy to prevent external modification?
-            # 外部からの変更を防ぐためにコピーを返しますか？
-            # For now, return direct reference for performance.
-            return list(self._analysis_results.values()) # Return reference to in-memory list
+    def close(self) -> None:
+        """
+        Stops watching (if active), ends the background worker thread and shuts down the analyzer's
+        worker processes, if any were started.
+        監視を（有効であれば）停止し、バックグラウンドワーカースレッドと、起動されていれば
+        アナライザーのワーカープロセスを終了します。
+        """
+        if self._event_monitor is not None and self._event_monitor.is_alive():
+            self.stop_watching()
+        if self._background_worker_thread is not None:
+            # Wake the parked worker so it sees the shutdown flag and returns
+            # 待機中のワーカーを起こし、終了フラグを確認して戻るようにします
+            self._shutdown_worker.set()
+            self._watch_active.set()
+            if self._event_queue is not None:
+                self._event_queue.interrupt()
+            self._background_worker_thread.join()
+            self._background_worker_thread = None
+            self._watch_active.clear()
+            logger.debug("Background worker stopped.")
+        self.analyzer.close()
+
+    def refresh(self) -> None:
+        """
+        Brings the results up to date with the disk after a period without watching, e.g. when a
+        long-lived instance is reused. Ignore rules are reloaded, and files whose stat is unchanged
+        keep their cached analysis, so only changed files are hashed and parsed again.
+        監視していない期間の後（長寿命のインスタンスを再利用する場合など）に、結果をディスクの状態に合わせます。
+        無視ルールは再読み込みされ、stat が変わっていないファイルはキャッシュ済みの分析結果を保持するため、
+        変更されたファイルのみが再ハッシュ・再解析されます。
+        """
+        logger.info("Refreshing the analysis results against the disk...")
+        self._reload_ignore_rules()
+        self._run_analysis_and_update_memory(previous_results=self._analysis_results)
+
+    def invalidate_cache(self) -> None:
+        """
+        Discards the persisted analysis index and re-analyzes every file from scratch.
+        永続化された分析インデックスを破棄し、すべてのファイルを最初から再分析します。
+        """
+        logger.info("Invalidating the analysis cache and re-analyzing from scratch...")
+        if self._cache_storage is not None:
+            self._cache_storage.clear_analysis_index()
+        self._run_analysis_and_update_memory()
+
+    def _results_snapshot(self) -> Dict[str, FileInfo]:
+        """
+        Returns the current analysis results without locking. The dict is never mutated
+        after it is published, so the caller can iterate it freely.
+        現在の分析結果をロックなしで返します。辞書は公開後に変更されないため、
+        呼び出し元は自由に反復処理できます。
+
+        Raises:
+            AnalysisError: If the analysis has not completed successfully yet.
+                           分析がまだ正常に完了していない場合。
+        """
+        results = self._analysis_results
+        if not self.project_analyzed or results is None:
+            logger.error("Analysis has not completed successfully yet.")
+            raise AnalysisError("Project analysis has not completed successfully.")
+        return results
 
     def list_files(self, relative: bool = True) -> List[str]:
         """
@@ -247,20 +551,23 @@ class Kotemari:
             AnalysisError: If the analysis has not completed successfully yet.
                           分析がまだ正常に完了していない場合。
         """
-        # Ensure analysis results are available by calling analyze_project without force
-        # 強制せずに analyze_project を呼び出して分析結果が利用可能であることを確認します
-        analysis_results = self.analyze_project() # Gets results from memory or raises error
+        # The str keys already are the absolute paths; relative paths are sliced off the
+        # root prefix instead of calling Path.relative_to for every file.
+        # str キーはすでに絶対パスです。相対パスはファイルごとに Path.relative_to を呼び出す代わりに、
+        # ルートの接頭辞を切り取って求めます。
+        path_keys = list(self._results_snapshot()) # Raises if no analysis is available
 
         if relative:
-            try:
-                return sorted([str(f.path.relative_to(self.project_root).as_posix()) for f in analysis_results])
-            except ValueError as e:
-                 logger.error(f"Error calculating relative path during list_files: {e}")
-                 # Fallback or re-raise? For now, log and return absolute paths.
-                 # フォールバックしますか、それとも再発生させますか？とりあえずログに記録し、絶対パスを返します。
-                 return sorted([str(f.path) for f in analysis_results])
-        else:
-            return sorted([str(f.path) for f in analysis_results])
+            root_prefix = str(self.project_root) + os.sep
+            prefix_length = len(root_prefix)
+            if all(path_key.startswith(root_prefix) for path_key in path_keys):
+                if os.sep == "/":
+                    return sorted(path_key[prefix_length:] for path_key in path_keys)
+                return sorted(path_key[prefix_length:].replace(os.sep, "/") for path_key in path_keys)
+            logger.error("Error calculating relative path during list_files: a file is not under %s", self.project_root)
+            # Fallback: log and return absolute paths.
+            # フォールバック: ログに記録し、絶対パスを返します。
+        return sorted(path_keys)
 
     def get_tree(self, max_depth: Optional[int] = None) -> str:
         """
@@ -281,60 +588,56 @@ class Kotemari:
             AnalysisError: If the analysis has not completed successfully yet.
                           分析がまだ正常に完了していない場合。
         """
-        analysis_results = self.analyze_project() # Gets results from memory or raises error
+        path_keys = list(self._results_snapshot())
 
-        if not analysis_results:
+        if not path_keys:
             return "Project is empty or all files are ignored."
 
-        # Build directory structure from analyzed files
-        dir_structure = {}
-        try:
-            relative_paths = sorted([f.path.relative_to(self.project_root) for f in analysis_results])
-        except ValueError as e:
-            logger.error(f"Error calculating relative path during get_tree: {e}")
-            return f"Error building tree: {e}"
-
-        for path in relative_paths:
+        # Build a trie of directories from the str keys: slicing off the root prefix replaces
+        # a Path.relative_to call per file. Directories map to dicts, files to None.
+        # str キーからディレクトリのトライを構築します。ルートの接頭辞を切り取ることで、
+        # ファイルごとの Path.relative_to 呼び出しを置き換えます。ディレクトリは辞書、ファイルは None に対応します。
+        root_prefix = str(self.project_root) + os.sep
+        prefix_length = len(root_prefix)
+        dir_structure: Dict[str, Optional[dict]] = {}
+        for path_key in path_keys:
+            if not path_key.startswith(root_prefix):
+                logger.error("Error calculating relative path during get_tree: %s is not under %s", path_key, self.project_root)
+                return f"Error building tree: {path_key} is not under {self.project_root}"
+            *dir_parts, file_name = path_key[prefix_length:].split(os.sep)
             current_level = dir_structure
-            parts = path.parts
-            for i, part in enumerate(parts):
-                if i == len(parts) - 1: # It's a file
-                    if part not in current_level:
-                         current_level[part] = None # Mark as file
-                else: # It's a directory
-                    if part not in current_level:
-                        current_level[part] = {}
-                    # Handle potential conflict: a file exists where a directory is expected
-                    if current_level[part] is None:
-                        logger.warning(f"Tree structure conflict: Both file and directory found at '/{'/'.join(parts[:i+1])}'")
-                        # Decide how to handle: maybe skip adding the directory? For now, overwrite.
-                        current_level[part] = {}
-                    current_level = current_level[part]
-
+            for part in dir_parts:
+                child = current_level.get(part)
+                if child is None:
+                    if part in current_level:
+                        # Handle potential conflict: a file exists where a directory is expected. For now, overwrite.
+                        logger.warning("Tree structure conflict: Both file and directory found at '%s'", part)
+                    child = current_level[part] = {}
+                current_level = child
+            current_level.setdefault(file_name, None)
+
+        # Emit lines depth-first with an explicit stack of (sorted items, next index, prefix, depth)
+        # (ソート済み要素, 次のインデックス, 接頭辞, 深さ) の明示的なスタックで深さ優先に行を出力します
         lines = [self.project_root.name] # Start with project root name
-
-        def build_tree_lines(dir_structure: dict, prefix: str = "", depth: int = 0, max_depth: Optional[int] = None) -> List[str]:
-            items = sorted(dir_structure.items())
-            pointers = ["├── "] * (len(items) - 1) + ["└── "]
-            for pointer, (name, content) in zip(pointers, items):
-                yield prefix + pointer + name
-                if isinstance(content, dict):
-                    if max_depth is not None and depth + 1 >= max_depth:
-                        # Reached max depth, show ellipsis if directory is not empty
-                        # 最大深度に到達しました。ディレクトリが空でない場合は省略記号を表示します
-                        if content: # Check if the dictionary is not empty
-                             yield prefix + ("│   " if pointer == "├── " else "    ") + "..."
-                    else:
-                        # Continue recursion if max_depth not reached
-                        # max_depthに達していない場合は再帰を続行します
-                        extension = "│   " if pointer == "├── " else "    "
-                        # Recursive call
-                        yield from build_tree_lines(content, prefix + extension, depth + 1, max_depth)
-
-        # Pass max_depth to the initial call
-        # 最初の呼び出しに max_depth を渡します
-        tree_lines = list(build_tree_lines(dir_structure, max_depth=max_depth))
-        return "\n".join(lines + tree_lines)
+        stack = [(sorted(dir_structure.items()), 0, "", 0)]
+        while stack:
+            items, index, prefix, depth = stack.pop()
+            if index >= len(items):
+                continue
+            stack.append((items, index + 1, prefix, depth))
+            name, content = items[index]
+            is_last = index == len(items) - 1
+            lines.append(prefix + ("└── " if is_last else "├── ") + name)
+            if content is not None:
+                extension = prefix + ("    " if is_last else "│   ")
+                if max_depth is not None and depth + 1 >= max_depth:
+                    # Reached max depth, show ellipsis if directory is not empty
+                    # 最大深度に到達しました。ディレクトリが空でない場合は省略記号を表示します
+                    if content:
+                        lines.append(extension + "...")
+                else:
+                    stack.append((sorted(content.items()), 0, extension, depth + 1))
+        return "\n".join(lines)
 
     def get_dependencies(self, target_file_path: str) -> List[DependencyInfo]:
         """
@@ -355,21 +658,14 @@ class Kotemari:
             AnalysisError: If the analysis has not completed successfully yet.
                           分析がまだ正常に完了していない場合。
         """
-        analysis_results = self.analyze_project() # Ensure analysis is done and get results
         absolute_target_path = self._path_resolver.resolve_absolute(target_file_path, base_dir=self.project_root)
 
-        # Find the file info in the cached results
-        # キャッシュされた結果でファイル情報を見つけます
-        file_info = None
-        with self._analysis_lock: # Accessing shared analysis_results
-             if analysis_results is not None:
-                for fi in analysis_results:
-                    if fi.path == absolute_target_path:
-                        file_info = fi
-                        break
+        # Find the file info in the cached results with a single keyed lookup
+        # キャッシュされた結果から1回のキー検索でファイル情報を見つけます
+        file_info = self._results_snapshot().get(str(absolute_target_path))
 
         if file_info is None:
-            logger.warning(f"Target file not found in analysis results: {target_file_path} (resolved: {absolute_target_path})")
+            logger.warning("Target file not found in analysis results: %s (resolved: %s)", target_file_path, absolute_target_path)
             raise FileNotFoundErrorInAnalysis(f"File '{target_file_path}' not found in the project analysis.")
 
         # Return dependencies from the found FileInfo
@@ -399,49 +695,35 @@ class Kotemari:
             FileNotFoundError: If a target file does not exist on the filesystem (should be rare after analysis check).
                                ターゲットファイルがファイルシステムに存在しない場合（分析チェック後には稀）。
         """
-        logger.info(f"Generating context for: {target_files}")
+        logger.info("Generating context for: %s", target_files)
         if not self.project_analyzed or self._analysis_results is None:
             raise AnalysisError("Project must be analyzed first before getting context.")
-
-        # Create a quick lookup map from the analysis results
-        # 分析結果からクイックルックアップマップを作成します
-        # analyzed_paths: Dict[Path, FileInfo] = {f.path: f for f in self._analysis_results} # This line is incorrect and removed.
-        # logger.debug(f"Context: Analyzed path keys: {list(analyzed_paths.keys())}") # DEBUG LOGGING REMOVED
+        results = self._analysis_results
 
         valid_target_paths: List[Path] = []
         potential_errors: List[str] = []
-        resolved_paths_map: Dict[str, Path] = {}
 
-        for file_path_str in target_files:
-            absolute_path: Optional[Path] = None
+        # Resolve each input and check it against the analysis results in a single pass
+        # 各入力を解決し、1回の走査で分析結果と照合します
+        for file_path_str in dict.fromkeys(target_files):
             try:
                 # Resolve the input path string relative to the project root
                 # 入力パス文字列をプロジェクトルートからの相対パスとして解決します
                 absolute_path = self._path_resolver.resolve_absolute(file_path_str, base_dir=self.project_root)
-                resolved_paths_map[file_path_str] = absolute_path # Store resolved path
             except FileNotFoundError as e: # Error from PathResolver only
-                 potential_errors.append(f"File specified for context not found or inaccessible: '{file_path_str}'. Error: {e}")
-                 logger.warning(f"Context: Could not resolve path '{file_path_str}': {e}")
-                 continue # Skip to the next file path string
-
-        # Now, check resolved paths against analyzed results *after* the loop
-        # ループの後で、解決されたパスを分析結果と照合します
-        for file_path_str, absolute_path in resolved_paths_map.items():
-             # Check if the resolved path exists in our analyzed files map
-             # 解決されたパスが分析済みファイルマップに存在するか確認します
-             # Use self._analysis_results directly
-             # self._analysis_results を直接使用します
-            if absolute_path not in self._analysis_results:
-                # print(f"DEBUG Kotemari.get_context: Path check FAILED for {repr(absolute_path)}. Analyzed keys: {[repr(p) for p in analyzed_paths.keys()]}") # TEMP DEBUG PRINT
+                potential_errors.append(f"File specified for context not found or inaccessible: '{file_path_str}'. Error: {e}")
+                logger.warning("Context: Could not resolve path '%s': %s", file_path_str, e)
+                continue
+
+            if str(absolute_path) in results:
+                valid_target_paths.append(absolute_path)
+            else:
                 error_msg = (
                     f"File '{absolute_path}' (from input '{file_path_str}') was not found in the project analysis results. "
                     f"It might be ignored, outside the project root, or does not exist in the analyzed set."
                 )
                 potential_errors.append(error_msg)
-                logger.warning(f"Context: {error_msg}")
-            else:
-                # print(f"DEBUG Kotemari.get_context: Path check OK for {repr(absolute_path)}") # TEMP DEBUG PRINT
-                valid_target_paths.append(absolute_path)
+                logger.warning("Context: %s", error_msg)
 
         # If any errors occurred during resolution or analysis check, raise them now
         # 解決または分析チェック中にエラーが発生した場合は、ここで発生させます
@@ -458,12 +740,11 @@ class Kotemari:
 
         # Pass only the valid target paths to the builder
         # 有効なターゲットパスのみをビルダーに渡します
-        # print(f"DEBUG Kotemari.get_context: Calling ContextBuilder with valid_target_paths = {valid_target_paths}") # TEMP DEBUG PRINT
         context_data = self.context_builder.build_context(
             target_files=valid_target_paths, # Corrected argument name
             project_root=self.project_root
         )
-        logger.info(f"Context generated successfully for {len(target_files)} files.")
+        logger.info("Context generated successfully for %d files.", len(target_files))
         return context_data
 
     # === File System Watching ===
@@ -483,14 +764,28 @@ class Kotemari:
             return
 
         logger.info("Starting file system monitor...")
-        self._event_queue = queue.Queue()
+        if self._background_worker_thread is None:
+            self._event_queue = BatchQueue(maxsize=EVENT_QUEUE_MAXSIZE,
+                                           key_func=_event_coalesce_key,
+                                           merge_func=_merge_events)
+            self._shutdown_worker.clear()
+            self._background_worker_thread = threading.Thread(target=self._background_worker,
+                                                              args=(self._event_queue,), daemon=True)
+            self._background_worker_thread.start()
         self._stop_worker_event.clear()
 
         # --- Internal event handler --- #
         def internal_event_handler(event: FileSystemEvent):
-            logger.info(f"[Watcher] Detected event: {event}")
+            # Drop events under ignored paths here, so they never reach the queue or the worker.
+            # A file or directory moved out of an ignored path is kept, because its destination must be analyzed.
+            # 無視されるパス配下のイベントはここで破棄し、キューやワーカーに到達させません。
+            # 無視パスから移動されたファイルやディレクトリは、移動先を分析する必要があるため保持します。
+            is_ignored = self._ignore_dir_fn if event.is_directory else self._ignore_fn
+            if is_ignored(event.src_path) and (event.dest_path is None or is_ignored(event.dest_path)):
+                return
+            logger.info("[Watcher] Detected event: %s", event)
             # Put the event into the queue for the background worker
-            if self._event_queue:
+            if self._event_queue is not None:
                  self._event_queue.put(event)
 
             # Call user callback if provided
@@ -498,447 +793,607 @@ class Kotemari:
                 try:
                     user_callback(event)
                 except Exception as e:
-                    logger.error(f"Error in user callback for event {event}: {e}", exc_info=True)
-
-        # --- Background worker thread --- # (Step 11-1-6)
-        def background_worker():
-            logger.info("Background analysis worker started.")
-            while not self._stop_worker_event.is_set():
-                try:
-                    # Wait for an event with a timeout to allow checking the stop signal
-                    event: Optional[FileSystemEvent] = self._event_queue.get(timeout=1.0)
-
-                    # English: Check for the sentinel value to stop the worker.
-                    # 日本語: ワーカーを停止させるための番兵値を確認します。
-                    if event is None:
-                        logger.debug("[Worker] Received stop sentinel.")
-                        break # Exit the loop
-
-                    logger.info(f"[Worker] Processing event: {event}")
-
-                    # English: Process the event using the dedicated method.
-                    # 日本語: 専用メソッドを使用してイベントを処理します。
-                    self._process_event(event)
-
-                    # English: Task is marked done inside _process_event now.
-                    # 日本語: タスクは _process_event 内で完了マークが付けられるようになりました。
-                    # self._event_queue.task_done() # Removed from here
-
-                except queue.Empty:
-                    # Timeout reached, loop again to check stop signal
-                    continue
-                except Exception as e:
-                    logger.error(f"[Worker] Error processing event queue: {e}", exc_info=True)
-                    # How to handle errors? Continue? Stop? Maybe mark task done if it wasn't?
-                    # エラーをどう処理しますか？続行しますか？停止しますか？ もしそうでなければタスクを完了としてマークしますか？
-                    # Ensure task_done is called even on unexpected errors in the loop itself
-                    # ループ自体で予期しないエラーが発生した場合でも task_done が呼び出されるようにします
-                    # This might be redundant if _process_event handles its errors and calls task_done.
-                    # _process_event がエラーを処理して task_done を呼び出す場合、これは冗長になる可能性があります。
-                    # Consider carefully if this is needed.
-                    # これが必要かどうか慎重に検討してください。
-                    # if self._event_queue:
-                    #     try:
-                    #         self._event_queue.task_done()
-                    #     except ValueError:
-                    #         pass # Ignore if task_done() called more times than tasks
-            logger.info("Background analysis worker stopped.")
+                    self._error_log_sampler.log(logger, e, "Error in user callback for event %s", event)
 
         # Initialize and start the monitor
         self._event_monitor = FileSystemEventMonitor(
             self.project_root,
-            internal_event_handler,
-            ignore_func=self._ignore_processor.get_ignore_function()
+            self._ignore_processor,
+            # Look up the attributes on every call so the monitor picks up reloaded ignore rules
+            # 再読み込みされた無視ルールをモニターが反映できるよう、呼び出しごとに属性を参照します
+            ignore_func=lambda path: self._ignore_fn(path),
+            ignore_dir_func=lambda path: self._ignore_dir_fn(path)
         )
-        self._event_monitor.start()
+        self._event_monitor.start(internal_event_handler)
 
-        # Start the background worker thread
-        self._background_worker_thread = threading.Thread(target=background_worker, daemon=True)
-        self._background_worker_thread.start()
+        # Wake the (persistent) background worker
+        # （常駐する）バックグラウンドワーカーを起こします
+        self._worker_idle.clear()
+        self._watch_active.set()
 
         logger.info("File system monitor and background worker started.")
 
+    # English comment:
+    # Background worker thread target function. The thread lives until close();
+    # between watch sessions it is parked on _watch_active instead of being torn down.
+    # 日本語コメント:
+    # バックグラウンドワーカースレッドのターゲット関数。スレッドは close() まで存続し、
+    # 監視セッションの間は破棄されずに _watch_active で待機します。
+    def _background_worker(self, event_queue: BatchQueue[FileSystemEvent]) -> None:
+        logger.info("Background analysis worker started.")
+        while True:
+            try:
+                # Only start_watching clears _worker_idle, so a stop right after a start never sees a stale wakeup
+                # _worker_idle をクリアするのは start_watching のみなので、開始直後の停止でも古い起床を見ることはありません
+                while not self._watch_active.is_set():
+                    logger.debug("[Worker] Parked until watching starts again.")
+                    self._worker_idle.set()
+                    self._watch_active.wait()
+                if self._shutdown_worker.is_set():
+                    logger.info("Background analysis worker stopped.")
+                    return
+                # Take a debounced burst in one hand-off; wake up periodically to check the stop signal
+                # デバウンスされた一連のイベントを一度に受け取り、停止シグナル確認のため定期的に起床します
+                events = event_queue.drain(timeout=1.0, settle=EVENT_DEBOUNCE_SECONDS)
+                if self._stop_worker_event.is_set():
+                    continue
+                if event_queue.take_overflow():
+                    # Events were dropped; only a full re-analysis is guaranteed to be correct
+                    # イベントが破棄されたため、完全な再分析のみが正しさを保証します
+                    logger.warning("[Worker] Event queue overflowed. Running a full re-analysis.")
+                    self._run_analysis_and_update_memory(cancel_event=self._stop_worker_event)
+                elif events:
+                    self._process_event_batch(events)
+            except Exception as e:
+                self._error_log_sampler.log(logger, e, "[Worker] Error processing event queue")
+
     def stop_watching(self):
-        """Stops the background file system monitor and worker thread."""
+        """Stops the background file system monitor and parks the worker thread until the next start_watching."""
         if self._event_monitor is None or not self._event_monitor.is_alive():
             logger.warning("File system monitor is not running.")
             return
 
         logger.info("Stopping file system monitor and background worker...")
 
-        # Stop the monitor
+        # Stop the monitor (joins the observer thread)
         self._event_monitor.stop()
-        self._event_monitor.join()
         logger.debug("File system monitor stopped.")
 
-        # Signal the worker thread to stop and wait for it
-        if self._background_worker_thread and self._background_worker_thread.is_alive():
-            self._stop_worker_event.set()
-            # Optionally put a dummy event to unblock the queue.get immediately
-            if self._event_queue:
-                self._event_queue.put(None) # Sentinel value or dummy event
-
-            self._background_worker_thread.join(timeout=5.0) # Wait with timeout
-            if self._background_worker_thread.is_alive():
-                 logger.warning("Background worker thread did not stop gracefully.")
-            else:
-                 logger.debug("Background worker thread stopped.")
+        # Park the worker: it finishes at most the update it is currently applying
+        # ワーカーを待機状態にします。実行中の更新が終わり次第停止します
+        self._stop_worker_event.set()
+        self._watch_active.clear()
+        if self._event_queue is not None:
+            self._event_queue.interrupt()
+            self._worker_idle.wait()
+            # Discard events left over from this session so they are not applied after a restart
+            # 再開後に適用されないよう、このセッションで残ったイベントを破棄します
+            self._event_queue.drain(timeout=0)
+            self._event_queue.take_overflow()
+        logger.debug("Background worker parked.")
+        # Differential updates since the last full analysis are only in memory; persist them on clean shutdown
+        # 前回の完全分析以降の差分更新はメモリ上にしかないため、正常終了時に永続化します
+        self._save_analysis_index()
 
         self._event_monitor = None
-        self._event_queue = None
-        self._background_worker_thread = None
         logger.info("File system monitor and background worker stopped.")
 
     # English comment:
-    # Build the reverse dependency index from the current analysis results.
-    # This method should be called within the lock.
+    # Build the reverse (and forward) dependency index from the current analysis results.
+    # Only used for the bulk pass after a full analysis; single files go through _update_reverse_index_for.
+    # The index is built without holding its lock and swapped in at the end.
     # 日本語コメント:
-    # 現在の解析結果から逆依存インデックスを構築します。
-    # このメソッドはロック内で呼び出す必要があります。
+    # 現在の解析結果から逆（および順）依存インデックスを構築します。
+    # 完全分析後の一括処理でのみ使用し、単一ファイルは _update_reverse_index_for で更新します。
+    # インデックスはロックを保持せずに構築され、最後に差し替えられます。
     def _build_reverse_dependency_index(self) -> None:
         logger.debug("逆依存インデックスの構築を開始します。")
+        # Build into new dicts without holding the lock, then swap them in
+        # ロックを保持せずに新しい辞書へ構築し、その後に差し替えます
+        results = self._analysis_results
+        new_index: Dict[Path, Set[Path]] = {}
+        new_forward_index: Dict[Path, Set[Path]] = {}
+        logger.debug("Building reverse index from %s analysis results.", len(results))
+        self._module_map = self._build_module_map(results)
+
+        for file_info in results.values():
+            targets = self._dependency_targets(file_info.path, file_info.dependencies, results)
+            if targets:
+                new_forward_index[file_info.path] = targets
+                for target in targets:
+                    new_index.setdefault(target, set()).add(file_info.path)
+
         with self._reverse_dependency_index_lock:
-            logger.debug("Acquired reverse dependency index lock.")
-            self._reverse_dependency_index.clear()
-            project_root = self.project_root
-            logger.debug(f"Building reverse index from {len(self._analysis_results)} analysis results.")
-
-            for dependent_path, file_info in self._analysis_results.items():
-                logger.debug(f"Processing dependent: {dependent_path}")
-                if file_info.dependencies:
-                    logger.debug(f"  Found {len(file_info.dependencies)} dependencies for {dependent_path}")
-                    for dep_info in file_info.dependencies:
-                        logger.debug(f"    Processing dependency: {dep_info.module_name} ({dep_info.dependency_type})")
-                        resolved_dependency_path: Optional[Path] = None
-
-                        if dep_info.dependency_type in [DependencyType.INTERNAL_ABSOLUTE, DependencyType.INTERNAL_RELATIVE]:
-                            # Use pre-resolved path from DependencyInfo if available
-                            if hasattr(dep_info, 'resolved_path') and dep_info.resolved_path:
-                                resolved_dependency_path = dep_info.resolved_path.resolve()
-                                logger.debug(f"      Using pre-resolved path: {resolved_dependency_path}")
-                            else:
-                                # Manual resolution (Fallback)
-                                logger.warning(f"DependencyInfo missing pre-resolved path for {dep_info.module_name}. Attempting manual.")
-                                try:
-                                    base_dir_for_resolve = dependent_path.parent
-                                    # ... (manual resolution logic - kept concise) ...
-                                    if dep_info.dependency_type == DependencyType.INTERNAL_ABSOLUTE:
-                                        module_path_parts = dep_info.module_name.split('.')
-                                        potential_path_py = project_root.joinpath(*module_path_parts).with_suffix(".py")
-                                        potential_path_init = project_root.joinpath(*module_path_parts, "__init__.py")
-                                        if potential_path_py.is_file():
-                                             resolved_dependency_path = potential_path_py.resolve()
-                                        elif potential_path_init.is_file():
-                                             resolved_dependency_path = potential_path_init.resolve()
-                                except Exception as e:
-                                     logger.warning(f"      Error during manual resolve: {e}")
-
-                            logger.debug(f"      Resolved path result: {resolved_dependency_path}")
-
-                        # Check if resolved and exists in analysis results
-                        if resolved_dependency_path:
-                            is_in_analysis = resolved_dependency_path in self._analysis_results
-                            logger.debug(f"      Is resolved path in analysis results? {is_in_analysis}")
-                            if is_in_analysis:
-                                logger.debug(f"      Adding to index: {resolved_dependency_path} <- {dependent_path}")
-                                self._reverse_dependency_index.setdefault(resolved_dependency_path, set()).add(dependent_path)
-                            else:
-                                logger.warning(f"      Resolved path {resolved_dependency_path} not found in analysis results. Skipping add.")
-                        else:
-                            logger.debug(f"    Dependency '{dep_info.module_name}' did not resolve or is external. Skipping add.")
-                else:
-                    logger.debug(f"  No dependencies found for {dependent_path}")
+            self._reverse_dependency_index = new_index
+            self._forward_dependency_index = new_forward_index
+        logger.debug("逆依存インデックスの構築完了: %s 件のエントリ。", len(new_index))
 
-            logger.debug(f"逆依存インデックスの構築完了: {len(self._reverse_dependency_index)} 件のエントリ。 Index: {self._reverse_dependency_index}")
-            logger.debug("Releasing reverse dependency index lock.")
+    def _module_name_of(self, path_key: str) -> Optional[str]:
+        """
+        Returns the dotted module name of a Python file in the project, e.g. 'pkg.mod' for
+        'pkg/mod.py' and 'pkg' for 'pkg/__init__.py'.
+        プロジェクト内の Python ファイルのドット区切りモジュール名を返します。
+        例: 'pkg/mod.py' は 'pkg.mod'、'pkg/__init__.py' は 'pkg'。
 
-    def _add_dependencies_to_reverse_index(self, dependent_path: Path, dependencies: List[DependencyInfo]) -> None:
+        Returns:
+            Optional[str]: The module name, or None for non-Python files and files outside the root.
+                           モジュール名。Python ファイル以外やルート外のファイルの場合は None。
+        """
+        root_prefix = str(self.project_root) + os.sep
+        if not path_key.startswith(root_prefix) or not path_key.endswith(".py"):
+            return None
+        parts = path_key[len(root_prefix):-3].split(os.sep)
+        if parts[-1] == "__init__":
+            parts.pop()
+        return ".".join(parts) or None
+
+    def _module_candidates(self, module_name: str) -> tuple:
+        """
+        Returns the path keys that may define a module, in resolution order (module file before package).
+        モジュールを定義し得るパスキーを解決順（パッケージよりモジュールファイルが先）で返します。
+        """
+        base = str(self.project_root.joinpath(*module_name.split(".")))
+        return (base + ".py", base + os.sep + "__init__.py")
+
+    def _build_module_map(self, results: Dict[str, FileInfo]) -> Dict[str, Path]:
+        """
+        Builds the module name -> file map for all analyzed Python files.
+        分析済みのすべての Python ファイルについて、モジュール名 -> ファイルのマップを構築します。
         """
-        Adds the dependencies of a single file to the reverse dependency index.
-        Should be called under the appropriate lock if modifying shared state.
-        単一ファイルの依存関係を逆依存インデックスに追加します。
-        共有状態を変更する場合は、適切なロックの下で呼び出す必要があります。
+        module_map: Dict[str, Path] = {}
+        for path_key, file_info in results.items():
+            module_name = self._module_name_of(path_key)
+            if module_name is None:
+                continue
+            if path_key.endswith("__init__.py"):
+                module_map.setdefault(module_name, file_info.path)
+            else:
+                module_map[module_name] = file_info.path
+        return module_map
+
+    def _refresh_module_entry(self, path_key: str, results: Dict[str, FileInfo]) -> None:
+        """
+        Re-resolves the module map entry of one file after it was added to or removed from the results.
+        結果への追加または削除の後に、1ファイル分のモジュールマップのエントリを再解決します。
         """
-        if not dependencies:
+        module_name = self._module_name_of(path_key)
+        if module_name is None:
             return
+        for candidate in self._module_candidates(module_name):
+            file_info = results.get(candidate)
+            if file_info is not None:
+                self._module_map[module_name] = file_info.path
+                return
+        self._module_map.pop(module_name, None)
+
+    def _resolve_module(self, dependent_path: Path, dep_info: DependencyInfo) -> Optional[Path]:
+        """
+        Resolves an internal import to the analyzed file defining it, using the module map.
+        モジュールマップを使用して、内部インポートをそれを定義する分析済みファイルに解決します。
+        """
+        if dep_info.dependency_type is DependencyType.INTERNAL_RELATIVE and dep_info.level is not None:
+            package = self._module_name_of(str(dependent_path))
+            if package is None:
+                return None
+            package_parts = package.split(".")
+            if not str(dependent_path).endswith("__init__.py"):
+                package_parts.pop()
+            if dep_info.level - 1 > len(package_parts):
+                return None
+            del package_parts[len(package_parts) - (dep_info.level - 1):]
+            module_name = ".".join(package_parts + ([dep_info.module_name] if dep_info.module_name else []))
+        else:
+            module_name = dep_info.module_name
+        return self._module_map.get(module_name)
+
+    def _dependency_targets(self, dependent_path: Path, dependencies: Optional[List[DependencyInfo]],
+                            results: Dict[str, FileInfo]) -> Set[Path]:
+        """
+        Resolves the internal dependencies of a file to the analyzed files they refer to.
+        ファイルの内部依存関係を、それが参照する分析済みファイルに解決します。
+
+        Args:
+            dependent_path (Path): The file whose dependencies are resolved.
+                                   依存関係を解決するファイル。
+            dependencies (Optional[List[DependencyInfo]]): Its dependencies.
+                                                           その依存関係。
+            results (Dict[str, FileInfo]): The analysis results a target must be part of.
+                                           依存先が含まれている必要がある分析結果。
+
+        Returns:
+            Set[Path]: The resolved paths of the dependencies found in results.
+                       results に含まれる依存先の解決済みパス。
+        """
+        targets: Set[Path] = set()
+        for dep_info in dependencies or ():
+            if dep_info.dependency_type not in _INTERNAL_DEPENDENCY_TYPES:
+                continue
+            if dep_info.resolved_path:
+                resolved_dependency_path = dep_info.resolved_path
+                if str(resolved_dependency_path) not in results:
+                    resolved_dependency_path = resolved_dependency_path.resolve()
+            else:
+                resolved_dependency_path = self._resolve_module(dependent_path, dep_info)
+
+            if resolved_dependency_path is None:
+                logger.debug("Dependency '%s' of %s did not resolve. Skipping.", dep_info.module_name, dependent_path)
+            elif str(resolved_dependency_path) in results:
+                targets.add(resolved_dependency_path)
+            else:
+                logger.warning("Resolved path %s not found in analysis results. Skipping add.", resolved_dependency_path)
+        return targets
 
-        logger.debug(f"Adding dependencies to reverse index for: {dependent_path}")
-        project_root = self.project_root # Get project root once
+    def _update_reverse_index_for(self, dependent_path: Path,
+                                  dependencies: Optional[List[DependencyInfo]]) -> None:
+        """
+        Replaces the reverse index edges of a single file: edges it no longer has are removed and new ones added.
+        The work is proportional to the file's own dependencies, not to the size of the index.
+        単一ファイルの逆インデックスのエッジを置き換えます。不要になったエッジを削除し、新しいエッジを追加します。
+        処理量はインデックス全体の大きさではなく、そのファイル自身の依存関係の数に比例します。
 
+        Args:
+            dependent_path (Path): The file whose edges are replaced.
+                                   エッジを置き換えるファイル。
+            dependencies (Optional[List[DependencyInfo]]): Its current dependencies, or None if it was removed.
+                                                           現在の依存関係。ファイルが削除された場合は None。
+        """
+        targets = self._dependency_targets(dependent_path, dependencies, self._analysis_results)
         with self._reverse_dependency_index_lock:
-            for dep_info in dependencies:
-                resolved_dependency_path: Optional[Path] = None
-                if dep_info.dependency_type in [DependencyType.INTERNAL_ABSOLUTE, DependencyType.INTERNAL_RELATIVE]:
-                    # Use the pre-resolved path if available in DependencyInfo
-                    # DependencyInfo で利用可能な場合は、事前に解決されたパスを使用します
-                    if hasattr(dep_info, 'resolved_path') and dep_info.resolved_path:
-                        resolved_dependency_path = dep_info.resolved_path.resolve() # Ensure it's resolved
-                        logger.debug(f"Using pre-resolved path from DependencyInfo: {resolved_dependency_path}")
-                    else:
-                        # Fallback to resolving manually if not pre-resolved (should ideally not happen with current flow)
-                        # 事前に解決されていない場合は手動での解決にフォールバックします（現在のフローでは理想的には発生しません）
-                        logger.warning(f"DependencyInfo for {dep_info.module_name} in {dependent_path} missing pre-resolved path, attempting manual resolve.")
-                        # ... (Keep the existing manual resolution logic as fallback)
-                        base_dir_for_resolve = dependent_path.parent
-                        # ... (manual resolution code) ...
-
-                # Check if the resolved dependency exists in our analysis results
-                # 解決された依存関係が分析結果に存在するかどうかを確認します
-                logger.debug(f"Checking reverse index condition for {resolved_dependency_path}")
-                logger.debug(f"Analysis results keys: {list(self._analysis_results.keys())}")
-                if resolved_dependency_path:
-                    is_in_analysis = resolved_dependency_path in self._analysis_results
-                    logger.debug(f"Is {resolved_dependency_path} in analysis results? {is_in_analysis}")
-                    if is_in_analysis:
-                        self._reverse_dependency_index.setdefault(resolved_dependency_path, set()).add(dependent_path)
-                        logger.debug(f"Added reverse dependency link: {resolved_dependency_path} <- {dependent_path}")
-                    else:
-                        logger.warning(f"Could not add reverse dependency for {resolved_dependency_path} from {dependent_path}: Target not found in analysis results.")
-                else:
-                    logger.debug(f"Skipping reverse dependency add for {dep_info.module_name} from {dependent_path}: Path not resolved.")
+            old_targets = self._forward_dependency_index.pop(dependent_path, set())
+            for target in old_targets - targets:
+                dependents = self._reverse_dependency_index.get(target)
+                if dependents is not None:
+                    dependents.discard(dependent_path)
+                    if not dependents:
+                        del self._reverse_dependency_index[target]
+            for target in targets - old_targets:
+                self._reverse_dependency_index.setdefault(target, set()).add(dependent_path)
+            if targets:
+                self._forward_dependency_index[dependent_path] = targets
+        logger.debug("Reverse index for %s: %s removed, %s added.", dependent_path,
+                     len(old_targets - targets), len(targets - old_targets))
+
+    def _is_unchanged_on_disk(self, file_path: Path, existing: FileInfo) -> bool:
+        """
+        Cheaply checks whether a file still matches its cached FileInfo, so no-op
+        MODIFIED events (touch, editor saves without edits) can skip re-analysis.
+        The stat (mtime_ns, size) is compared first; if only the mtime moved and the
+        size is unchanged, the content hash decides. A matching hash publishes a copy
+        carrying the new mtime.
+        ファイルがキャッシュ済みの FileInfo と一致したままかを安価に確認し、
+        内容に変化のない MODIFIED イベント（touch、編集なしの保存など）の再分析を省略できるようにします。
+        まず stat (mtime_ns, size) を比較し、mtime のみが変化してサイズが同じ場合は
+        コンテンツハッシュで判定します。ハッシュが一致した場合は新しい mtime を持つコピーを公開します。
+
+        Args:
+            file_path (Path): The path of the modified file.
+                              変更されたファイルのパス。
+            existing (FileInfo): The cached FileInfo for the path.
+                                 そのパスのキャッシュ済み FileInfo。
+
+        Returns:
+            bool: True if the file content is known to be unchanged.
+                  ファイル内容が変化していないことが分かっている場合は True。
+        """
+        try:
+            stat_result = os.stat(file_path)
+        except OSError:
+            return False
+        if existing.size != stat_result.st_size:
+            return False
+        if existing.mtime_ns == stat_result.st_mtime_ns:
+            return True
+        if existing.hash is None:
+            return False
+        if self._hash_calculator.calculate_file_hash(file_path) != existing.hash:
+            return False
+        with self._analysis_lock:
+            # Only refresh the entry we compared against; a concurrent update may have replaced it
+            # 比較したエントリのみを更新します。並行する更新で置き換えられている可能性があります
+            if self._analysis_results.get(str(existing.path)) is existing:
+                self._store_result(dataclasses.replace(existing, mtime_ns=stat_result.st_mtime_ns))
+        return True
 
-    def _remove_dependencies_from_reverse_index(self, dependent_path: Path, dependencies: List[DependencyInfo]) -> None:
+    def _process_event_batch(self, events: List[FileSystemEvent]) -> None:
         """
-        Removes the dependencies of a single file from the reverse dependency index.
-        Should be called under the appropriate lock if modifying shared state.
-        単一ファイルの依存関係を逆依存インデックスから削除します。
-        共有状態を変更する場合は、適切なロックの下で呼び出す必要があります。
+        Applies a batch of drained events differentially, in arrival order.
+        取り出したイベントのバッチを到着順に差分適用します。
+
+        Args:
+            events (List[FileSystemEvent]): Events in arrival order, already coalesced per path.
+                                            到着順のイベント（パスごとに統合済み）。
         """
-        if not dependencies:
-            return
+        events = _drop_superseded_events(events)
+        for index, event in enumerate(events):
+            if self._stop_worker_event.is_set():
+                # Shutdown was requested; do not start another differential update
+                # 停止が要求されたため、次の差分更新は開始しません
+                logger.debug("[Worker] Stop requested; skipping %s remaining events in batch.", len(events) - index)
+                return
+            logger.info("[Worker] Processing event: %s", event)
+            self._process_event(event)
 
-        logger.debug(f"Removing dependencies from reverse index for: {dependent_path}")
-        project_root = self.project_root
+    def _remove_cached_subtree(self, dir_path: Path) -> List[FileInfo]:
+        """
+        Removes every cached file under a directory with a single copy of the results,
+        then updates the reverse index per file and marks the remaining dependents stale.
+        ディレクトリ配下のキャッシュ済みファイルを結果の1回のコピーですべて削除し、
+        その後ファイルごとに逆インデックスを更新して、残った依存元を古いものとしてマークします。
 
+        Args:
+            dir_path (Path): The directory whose cached files are removed.
+                             キャッシュ済みファイルを削除するディレクトリ。
+
+        Returns:
+            List[FileInfo]: The removed entries.
+                            削除されたエントリ。
+        """
+        prefix = str(dir_path.resolve()) + os.sep
+        with self._analysis_lock:
+            removed = [fi for key, fi in self._analysis_results.items() if key.startswith(prefix)]
+            if removed:
+                results = {key: fi for key, fi in self._analysis_results.items() if not key.startswith(prefix)}
+                self._analysis_results = results
+                for file_info in removed:
+                    self._refresh_module_entry(str(file_info.path), results)
+        logger.info("差分更新: ディレクトリ %s 配下の %s 件のファイルをキャッシュから削除しました。", dir_path, len(removed))
+
+        removed_paths = {file_info.path for file_info in removed}
+        for removed_path in removed_paths:
+            # Drop the edges OF the removed file
+            # 削除されたファイル自身のエッジを削除します
+            self._update_reverse_index_for(removed_path, None)
+        dependents: Set[Path] = set()
         with self._reverse_dependency_index_lock:
-            for dep_info in dependencies:
-                resolved_dependency_path: Optional[Path] = None
-                if dep_info.dependency_type in [DependencyType.INTERNAL_ABSOLUTE, DependencyType.INTERNAL_RELATIVE]:
-                    try:
-                        # --- Path Resolution Logic (copied from _add...) ---
-                        base_dir_for_resolve = dependent_path.parent
-                        if dep_info.dependency_type == DependencyType.INTERNAL_RELATIVE and dep_info.level is not None:
-                            relative_module_path_parts = dep_info.module_name.split('.')
-                            current_dir = base_dir_for_resolve
-                            for _ in range(dep_info.level -1):
-                                current_dir = current_dir.parent
-                            potential_path_py = current_dir.joinpath(*relative_module_path_parts).with_suffix(".py")
-                            potential_path_init = current_dir.joinpath(*relative_module_path_parts, "__init__.py")
-                            if potential_path_py.is_file():
-                                resolved_dependency_path = potential_path_py.resolve()
-                            elif potential_path_init.is_file():
-                                resolved_dependency_path = potential_path_init.resolve()
-                        elif dep_info.dependency_type == DependencyType.INTERNAL_ABSOLUTE:
-                            module_path_parts = dep_info.module_name.split('.')
-                            potential_path_py = project_root.joinpath(*module_path_parts).with_suffix(".py")
-                            potential_path_init = project_root.joinpath(*module_path_parts, "__init__.py")
-                            if potential_path_py.is_file():
-                                resolved_dependency_path = potential_path_py.resolve()
-                            elif potential_path_init.is_file():
-                                resolved_dependency_path = potential_path_init.resolve()
-                        # --- End Path Resolution Logic ---
-                    except Exception as e:
-                        logger.warning(f"Error resolving path for dependency '{dep_info.module_name}' in file '{dependent_path}' during remove: {e}")
-
-                if resolved_dependency_path:
-                    if resolved_dependency_path in self._reverse_dependency_index:
-                        dependents = self._reverse_dependency_index[resolved_dependency_path]
-                        dependents.discard(dependent_path) # Remove the file from the set
-                        logger.debug(f"Removed reverse dependency link: {resolved_dependency_path} <- {dependent_path}")
-                        # Optional: Clean up empty sets
-                        # オプション: 空のセットをクリーンアップ
-                        if not dependents:
-                            logger.debug(f"Removing empty set for dependency: {resolved_dependency_path}")
-                            del self._reverse_dependency_index[resolved_dependency_path]
-
-    def _remove_dependent_references_from_reverse_index(self, deleted_dependent_path: Path) -> None:
-        """
-        Removes all references to a deleted file from the values (sets) in the reverse dependency index.
-        Should be called under the appropriate lock if modifying shared state.
-        逆依存インデックスの値 (セット) から、削除されたファイルへのすべての参照を削除します。
-        共有状態を変更する場合は、適切なロックの下で呼び出す必要があります。
-        """
-        logger.debug(f"Removing all references to deleted file from reverse index: {deleted_dependent_path}")
-        with self._reverse_dependency_index_lock:
-            # Iterate through a copy of keys to avoid modification issues during iteration
-            # 繰り返し中の変更の問題を避けるために、キーのコピーを反復処理します
-            for dependency_path in list(self._reverse_dependency_index.keys()):
-                dependents = self._reverse_dependency_index[dependency_path]
-                if deleted_dependent_path in dependents:
-                    dependents.discard(deleted_dependent_path)
-                    logger.debug(f"Removed reference {dependency_path} <- {deleted_dependent_path}")
-                    # Optional: Clean up empty sets
-                    # オプション: 空のセットをクリーンアップ
-                    if not dependents:
-                        logger.debug(f"Removing empty set for dependency after deleting reference: {dependency_path}")
-                        del self._reverse_dependency_index[dependency_path]
+            for removed_path in removed_paths:
+                # Drop the removed file AS A KEY, keeping its dependents for propagation
+                # 削除されたファイルをキーとして削除し、波及のためにその依存元を保持します
+                dependents |= self._reverse_dependency_index.pop(removed_path, set())
+        dependents -= removed_paths
+        if dependents:
+            logger.info("依存関係の波及: %s の削除により、%s 個のファイルに影響の可能性があります。", dir_path, len(dependents))
+            self._mark_dependencies_stale(dependents, dir_path)
+        return removed
+
+    def _process_directory_event(self, event: FileSystemEvent) -> None:
+        """
+        Applies a directory event by touching only the affected subtree instead of re-analyzing
+        the whole project. A move removes the old subtree and scans the new one. The files of
+        a new subtree are analyzed first and then published with a single copy of the results.
+        プロジェクト全体を再分析する代わりに、影響を受けるサブツリーのみを更新してディレクトリイベントを適用します。
+        移動の場合は古いサブツリーを削除し、新しいサブツリーをスキャンします。新しいサブツリーのファイルは
+        先にすべて分析し、その後結果の1回のコピーで公開します。
+
+        Args:
+            event (FileSystemEvent): A directory event.
+                                     ディレクトリイベント。
+        """
+        if event.event_type in ("deleted", "moved"):
+            removed = self._remove_cached_subtree(Path(event.src_path))
+            if any(file_info.path.name == ".gitignore" for file_info in removed):
+                self._reload_rules_and_reanalyze(Path(event.src_path))
+                return
+
+        if event.event_type == "created":
+            new_dir = Path(event.src_path)
+        elif event.event_type == "moved" and event.dest_path:
+            new_dir = Path(event.dest_path)
+        else:
+            # Directory modifications carry no file content changes
+            # ディレクトリの変更イベントはファイル内容の変更を伴いません
+            return
+
+        if self._ignore_dir_fn(new_dir):
+            logger.debug("Ignoring directory event for ignored path: %s", new_dir)
+            return
+        scanned_files = list(self._file_accessor.scan_directory(
+                new_dir,
+                ignore_func=self._ignore_fn,
+                ignore_dir_func=self._ignore_dir_fn))
+        if any(file_info.path.name == ".gitignore" for file_info in scanned_files):
+            self._reload_rules_and_reanalyze(new_dir)
+            return
+
+        logger.info("差分更新: ディレクトリ %s 配下の %s 件のファイルを分析します。", new_dir, len(scanned_files))
+        new_file_infos = []
+        for scanned_file in scanned_files:
+            new_file_info = self.analyzer.analyze_single_file(scanned_file.path)
+            if new_file_info:
+                _intern_dependency_names(new_file_info)
+                new_file_infos.append(new_file_info)
+        with self._analysis_lock:
+            self._store_results(tuple(new_file_infos))
+
+        # Every file of the subtree is published, so imports between them resolve
+        # サブツリーのすべてのファイルが公開済みのため、それらの間のインポートも解決されます
+        for new_file_info in new_file_infos:
+            self._update_reverse_index_for(new_file_info.path, new_file_info.dependencies)
+
+    def _reload_ignore_rules(self) -> None:
+        """
+        Reloads the ignore rules and refreshes the cached matchers.
+        無視ルールを再読み込みし、キャッシュされた判定関数を更新します。
+        """
+        self._ignore_processor.reload_rules()
+        self._ignore_fn = self._ignore_processor.get_ignore_function()
+        self._ignore_dir_fn = self._ignore_processor.get_dir_ignore_function()
+
+    def _reload_rules_and_reanalyze(self, changed_path: Path) -> None:
+        """
+        Reloads the ignore rules and re-analyzes the whole project after a .gitignore changed.
+        .gitignore の変更後に、無視ルールを再読み込みしてプロジェクト全体を再分析します。
+
+        Args:
+            changed_path (Path): The changed .gitignore, or the directory holding one.
+                                 変更された .gitignore、またはそれを含むディレクトリ。
+        """
+        # The ignore rules changed, so the set of analyzed files may change anywhere
+        # 無視ルールが変更されたため、分析対象ファイルの集合はどこでも変わり得ます
+        logger.info("Ignore rules changed (%s). Reloading rules and re-analyzing the project.", changed_path)
+        self._reload_ignore_rules()
+        self._run_analysis_and_update_memory()
 
     def _process_event(self, event: FileSystemEvent):
         # This method processes a single event. Logic moved from background_worker.
         # このメソッドは単一のイベントを処理します。ロジックは background_worker から移動しました。
         try:
             file_path = Path(event.src_path)
-            logger.debug(f"Processing event: type={event.event_type}, path={file_path}, is_dir={event.is_directory}")
+            logger.debug("Processing event: type=%s, path=%s, is_dir=%s", event.event_type, file_path, event.is_directory)
 
-            # Ignore events based on config rules
-            # 設定ルールに基づいてイベントを無視
-            if self._ignore_processor.should_ignore(file_path):
-                logger.debug(f"Ignoring event for path: {file_path}")
+            if event.is_directory:
+                self._process_directory_event(event)
                 return
 
-            if event.event_type == "created":
-                # Add new file info to cache
-                # 新しいファイル情報をキャッシュに追加
-                logger.info(f"差分更新: 作成されたファイル {file_path} を分析します。")
-                new_file_info = self.analyzer.analyze_single_file(file_path)
-                if new_file_info:
-                    with self._analysis_lock:
-                        # Get old dependencies before overwriting (should be None for created)
-                        # 上書きする前に古い依存関係を取得します (作成された場合は None のはずです)
-                        old_dependencies = self._analysis_results.get(file_path, None).dependencies if self._analysis_results.get(file_path, None) else []
-                        self._analysis_results[file_path] = new_file_info
-
-                    # Update reverse index outside analysis lock, but needs its own lock
-                    # 分析ロックの外で逆インデックスを更新しますが、独自のロックが必要です
-                    # Since it's a new file, only need to add new dependencies
-                    # 新しいファイルなので、新しい依存関係を追加するだけで済みます
-                    self._add_dependencies_to_reverse_index(file_path, new_file_info.dependencies)
-                    # TODO: Handle propagation for created files impacting others? (Less common)
-                    # TODO: 作成されたファイルが他のファイルに影響を与える場合の波及処理を扱いますか？（一般的ではない）
-
-            elif event.event_type == "deleted":
-                # Remove file info from cache
-                # ファイル情報をキャッシュから削除
-                with self._analysis_lock:
-                    old_file_info = self._analysis_results.pop(file_path.resolve(), None) # Use resolve() for consistency
-
-                if old_file_info:
-                    logger.info(f"差分更新: 削除されたファイル {file_path} をキャッシュから削除しました。")
-                    resolved_deleted_path = file_path.resolve()
-
-                    # ** Get dependents BEFORE removing the key from reverse index **
-                    # ** 逆インデックスからキーを削除する前に依存元を取得 **
-                    dependents: Set[Path]
-                    with self._reverse_dependency_index_lock:
-                        # Copy the set to avoid modification issues
-                        dependents = self._reverse_dependency_index.get(resolved_deleted_path, set()).copy()
-
-                    # Update reverse index
-                    # 1. Remove dependencies OF the deleted file (if any)
-                    self._remove_dependencies_from_reverse_index(resolved_deleted_path, old_file_info.dependencies)
-                    # 2. Remove references TO the deleted file from other entries' values
-                    self._remove_dependent_references_from_reverse_index(resolved_deleted_path)
-                    # 3. Remove the deleted file AS A KEY from the index
-                    with self._reverse_dependency_index_lock:
-                        if resolved_deleted_path in self._reverse_dependency_index:
-                            logger.debug(f"Removing key {resolved_deleted_path} from reverse dependency index.")
-                            del self._reverse_dependency_index[resolved_deleted_path]
-                        else:
-                            logger.debug(f"Key {resolved_deleted_path} not found in reverse dependency index, nothing to remove.")
-
-                    # ** Propagate staleness to dependents **
-                    # ** 依存元に stale 状態を伝播 **
-                    if dependents:
-                        logger.info(f"依存関係の波及: {resolved_deleted_path} の削除により、{len(dependents)} 個のファイルに影響の可能性があります。")
-                        with self._analysis_lock: # Lock needed to modify FileInfo objects
-                            for dependent_path in dependents:
-                                if dependent_path in self._analysis_results:
-                                    logger.debug(f"依存関係の波及: {dependent_path} の依存関係を古いものとしてマークします。")
-                                    self._analysis_results[dependent_path].dependencies_stale = True
-                                else:
-                                    logger.warning(f"Dependent '{dependent_path}' found for deleted '{resolved_deleted_path}' but not in analysis results.")
-
-            elif event.event_type == "modified":
-                # Update cache for the modified file
-                # 変更されたファイルのキャッシュを更新
-                logger.info(f"差分更新: 変更されたファイル {file_path} を再分析します。")
-                updated_file_info = self.analyzer.analyze_single_file(file_path)
-
-                if updated_file_info:
-                    with self._analysis_lock:
-                        # Get old dependencies before overwriting
-                        # 上書きする前に古い依存関係を取得します
-                        old_dependencies = self._analysis_results.get(file_path, None).dependencies if self._analysis_results.get(file_path, None) else []
-                        self._analysis_results[file_path] = updated_file_info
-
-                    # Update reverse index incrementally
-                    # 逆インデックスを増分更新
-                    self._remove_dependencies_from_reverse_index(file_path, old_dependencies)
-                    self._add_dependencies_to_reverse_index(file_path, updated_file_info.dependencies)
-
-                    # --- Dependency Propagation (Step 12-4 will refine this) ---
-                    # English: Find files that depend on the modified file and potentially mark them.
-                    # 日本語: 変更されたファイルに依存するファイルを見つけ、潜在的にマークします。
-                    affected_dependents: Set[Path]
-                    with self._reverse_dependency_index_lock:
-                        affected_dependents = self._reverse_dependency_index.get(file_path, set()).copy() # Copy to avoid issues if set is modified
-
-                    if affected_dependents:
-                        logger.info(f"依存関係の波及: {file_path} の変更により、{len(affected_dependents)} 個のファイルに影響の可能性があります。")
-                        with self._analysis_lock: # Need lock to modify FileInfo objects in _analysis_results
-                            for dependent_path in affected_dependents:
-                                if dependent_path != file_path and dependent_path in self._analysis_results:
-                                    logger.debug(f"依存関係の波及: {dependent_path} の依存関係を古いものとしてマークします。")
-                                    # Mark the FileInfo as having stale dependencies
-                                    # FileInfo を古い依存関係を持つものとしてマークします
-                                    self._analysis_results[dependent_path].dependencies_stale = True
-                                    # TODO: Decide if we need to re-analyze *here* or *on-demand* later.
-                                    # ここで再分析するか、後でオンデマンドで分析するかを決定する必要があります。
-                                    # For now, just marking is sufficient for Step 12-4-2.
-                                    # 現時点では、マークするだけで Step 12-4-2 には十分です。
-                    # --- End Dependency Propagation Placeholder ---
-
-                else: # Analysis failed or file should be removed (e.g., became ignored)
-                    # 解析失敗、またはファイルを削除すべき場合の処理 (例: 無視されるようになった)
-                    with self._analysis_lock:
-                        old_file_info = self._analysis_results.pop(file_path, None)
+            # Ignore events based on config rules
+            # 設定ルールに基づいてイベントを無視
+            if self._ignore_fn(file_path):
+                if event.event_type == "moved" and event.dest_path and not self._ignore_fn(Path(event.dest_path)):
+                    # Moved out of an ignored path: nothing was cached for the source, so this is a create
+                    # 無視パスからの移動: 移動元はキャッシュされていないため、作成として扱います
+                    logger.debug("Treating move out of ignored path %s as a create of %s", file_path, event.dest_path)
+                    event = FileSystemEvent(event_type="created", src_path=Path(event.dest_path), is_directory=False)
+                    file_path = Path(event.src_path)
+                else:
+                    logger.debug("Ignoring event for path: %s", file_path)
+                    return
 
-                    if old_file_info:
-                        logger.info(f"差分更新: 分析失敗/無視のため、ファイル {file_path} をキャッシュから削除します。")
-                        # Update reverse index
-                        # 逆インデックスを更新
-                        self._remove_dependencies_from_reverse_index(file_path, old_file_info.dependencies)
-                        self._remove_dependent_references_from_reverse_index(file_path)
-                        # TODO: Trigger re-analysis for files that depended on this? (Handled by propagation?)
+            if file_path.name == ".gitignore" or (event.dest_path and Path(event.dest_path).name == ".gitignore"):
+                self._reload_rules_and_reanalyze(file_path)
+                return
 
-            elif event.event_type == "moved":
+            if event.event_type == "moved":
                 # Handle moved files/directories
                 src_path = Path(event.src_path)
                 dest_path = Path(event.dest_path) if event.dest_path else None
-                logger.warning(f"Moved event handling not fully implemented: {src_path} -> {dest_path}")
+                logger.info("差分更新: 移動されたファイル %s -> %s を処理します。", src_path, dest_path)
 
                 if dest_path:
-                    # Treat as delete and create for simplicity, though inefficient
-                    # 簡単のため、非効率的ではあるが、削除と作成として扱います
-                    # Need to get dependencies *before* deleting from cache
-                    # キャッシュから削除する*前*に依存関係を取得する必要があります
-                    old_file_info = None
-                    with self._analysis_lock:
-                         old_file_info = self._analysis_results.get(src_path)
-
-                    # Simulate delete
-                    delete_event = FileSystemEvent(event_type="deleted", src_path=str(src_path), is_directory=event.is_directory)
+                    # A file move only touches two entries: drop the old one (updating the reverse index
+                    # and marking dependents stale), then analyze the file at its new location
+                    # ファイルの移動は2つのエントリにのみ影響します。古いエントリを削除し（逆インデックスの更新と
+                    # 依存元の stale マークを含む）、新しい場所のファイルを分析します
+                    delete_event = FileSystemEvent(event_type="deleted", src_path=src_path, is_directory=False)
                     self._process_event(delete_event)
 
                     # Simulate create (if not ignored at new location)
                     # 作成をシミュレートします (新しい場所で無視されない場合)
-                    if not self._ignore_processor.should_ignore(dest_path):
-                        create_event = FileSystemEvent(event_type="created", src_path=str(dest_path), is_directory=event.is_directory)
+                    if not self._ignore_fn(dest_path):
+                        create_event = FileSystemEvent(event_type="created", src_path=dest_path, is_directory=False)
                         self._process_event(create_event)
                     else:
-                        logger.info(f"Moved file {dest_path} is ignored at the new location.")
+                        logger.info("Moved file %s is ignored at the new location.", dest_path)
                 else:
-                    logger.warning(f"Move event without destination path: {src_path}")
+                    logger.warning("Move event without destination path: %s", src_path)
+                return
+
+            if event.event_type == "modified":
+                # Fast path before taking any lock: a single stat (plus a hash only if just the mtime moved)
+                # ロックを取得する前の高速パス: stat 1回（mtime のみ変化した場合はハッシュも）で判定します
+                existing_file_info = self._analysis_results.get(str(file_path))
+                if existing_file_info is not None and self._is_unchanged_on_disk(file_path, existing_file_info):
+                    logger.debug("Skipping re-analysis of unchanged file: %s", file_path)
+                    return
+
+            # Differential updates of the same path are serialized on its lock stripe
+            # 同じパスの差分更新は、そのロックストライプで直列化されます
+            with self._lock_for(file_path):
+                if event.event_type == "created":
+                    # Add new file info to cache
+                    # 新しいファイル情報をキャッシュに追加
+                    logger.info("差分更新: 作成されたファイル %s を分析します。", file_path)
+                    new_file_info = self.analyzer.analyze_single_file(file_path)
+                    if new_file_info:
+                        _intern_dependency_names(new_file_info)
+                        with self._analysis_lock:
+                            self._store_result(new_file_info)
+
+                        # Update reverse index outside analysis lock, but needs its own lock.
+                        # Edges of a previous entry for the same path (if any) are replaced.
+                        # 分析ロックの外で逆インデックスを更新しますが、独自のロックが必要です。
+                        # 同じパスの以前のエントリのエッジ（あれば）は置き換えられます。
+                        self._update_reverse_index_for(file_path, new_file_info.dependencies)
+                        # TODO: Handle propagation for created files impacting others? (Less common)
+                        # TODO: 作成されたファイルが他のファイルに影響を与える場合の波及処理を扱いますか？（一般的ではない）
+
+                elif event.event_type == "deleted":
+                    # Remove file info from cache
+                    # ファイル情報をキャッシュから削除
+                    with self._analysis_lock:
+                        old_file_info = self._discard_result(str(file_path.resolve())) # Use resolve() for consistency
 
-            # Mark the event as processed
-            if self._event_queue:
-                 self._event_queue.task_done()
+                    if old_file_info:
+                        logger.info("差分更新: 削除されたファイル %s をキャッシュから削除しました。", file_path)
+                        resolved_deleted_path = file_path.resolve()
+
+                        # ** Get dependents BEFORE removing the key from reverse index **
+                        # ** 逆インデックスからキーを削除する前に依存元を取得 **
+                        dependents: Set[Path]
+                        with self._reverse_dependency_index_lock:
+                            # Copy the set to avoid modification issues
+                            dependents = self._reverse_dependency_index.get(resolved_deleted_path, set()).copy()
+
+                        # Update reverse index
+                        # 1. Remove the edges OF the deleted file (if any)
+                        self._update_reverse_index_for(resolved_deleted_path, None)
+                        # 2. Remove the deleted file AS A KEY from the index
+                        with self._reverse_dependency_index_lock:
+                            if resolved_deleted_path in self._reverse_dependency_index:
+                                logger.debug("Removing key %s from reverse dependency index.", resolved_deleted_path)
+                                del self._reverse_dependency_index[resolved_deleted_path]
+                            else:
+                                logger.debug("Key %s not found in reverse dependency index, nothing to remove.", resolved_deleted_path)
+
+                        # ** Propagate staleness to dependents **
+                        # ** 依存元に stale 状態を伝播 **
+                        if dependents:
+                            logger.info("依存関係の波及: %s の削除により、%s 個のファイルに影響の可能性があります。", resolved_deleted_path, len(dependents))
+                            self._mark_dependencies_stale(dependents, resolved_deleted_path)
+
+                elif event.event_type == "modified":
+                    # Update cache for the modified file
+                    # 変更されたファイルのキャッシュを更新
+                    logger.info("差分更新: 変更されたファイル %s を再分析します。", file_path)
+                    updated_file_info = self.analyzer.analyze_single_file(file_path)
+
+                    if updated_file_info:
+                        _intern_dependency_names(updated_file_info)
+                        with self._analysis_lock:
+                            self._store_result(updated_file_info)
+
+                        # Update reverse index incrementally
+                        # 逆インデックスを増分更新
+                        self._update_reverse_index_for(file_path, updated_file_info.dependencies)
+
+                        # --- Dependency Propagation (Step 12-4 will refine this) ---
+                        # English: Find files that depend on the modified file and potentially mark them.
+                        # 日本語: 変更されたファイルに依存するファイルを見つけ、潜在的にマークします。
+                        affected_dependents: Set[Path]
+                        with self._reverse_dependency_index_lock:
+                            affected_dependents = self._reverse_dependency_index.get(file_path, set()).copy() # Copy to avoid issues if set is modified
+
+                        if affected_dependents:
+                            logger.info("依存関係の波及: %s の変更により、%s 個のファイルに影響の可能性があります。", file_path, len(affected_dependents))
+                            # Mark the dependents as having stale dependencies
+                            # 依存元を古い依存関係を持つものとしてマークします
+                            # TODO: Decide if we need to re-analyze *here* or *on-demand* later.
+                            # ここで再分析するか、後でオンデマンドで分析するかを決定する必要があります。
+                            self._mark_dependencies_stale(affected_dependents, file_path)
+                        # --- End Dependency Propagation Placeholder ---
+
+                    else: # Analysis failed or file should be removed (e.g., became ignored)
+                        # 解析失敗、またはファイルを削除すべき場合の処理 (例: 無視されるようになった)
+                        with self._analysis_lock:
+                            old_file_info = self._discard_result(str(file_path))
+
+                        if old_file_info:
+                            logger.info("差分更新: 分析失敗/無視のため、ファイル %s をキャッシュから削除します。", file_path)
+                            # Update reverse index
+                            # 逆インデックスを更新
+                            self._update_reverse_index_for(file_path, None)
+                            # TODO: Trigger re-analysis for files that depended on this? (Handled by propagation?)
 
         except Exception as e:
-            logger.error(f"Error processing event {event}: {e}", exc_info=True)
-            # Ensure task_done is called even if an error occurs during processing
-            if self._event_queue:
-                 self._event_queue.task_done()
+            self._error_log_sampler.log(logger, e, "Error processing event %s", event)
 
     # English comment:
     # Background worker thread target function.
\ No newline at end of file
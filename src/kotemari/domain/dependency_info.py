@@ -20,7 +20,7 @@ class DependencyType(Enum):
     INTERNAL_ABSOLUTE = auto()
     EXTERNAL = auto()
 
-@dataclass(init=False)
+@dataclass(init=False, slots=True)
 class DependencyInfo:
     """
     Represents a dependency relationship extracted from source code.
@@ -68,4 +68,32 @@ class DependencyInfo:
     def __lt__(self, other):
         # English: Define less-than for sorting based on module_name
         # 日本語: module_name に基づくソートのための less-than を定義
-        return self.module_name < other.module_name
\ No newline at end of file
+        return self.module_name < other.module_name
+
+    def to_dict(self) -> dict:
+        """
+        Returns the fields as primitives (str path, enum name) for serialization.
+        シリアライズ用に、フィールドをプリミティブ（文字列のパス、列挙型の名前）として返します。
+        """
+        return {
+            "module_name": self.module_name,
+            "resolved_name": self.resolved_name,
+            "dependency_type": self.dependency_type.name,
+            "level": self.level,
+            "resolved_path": str(self.resolved_path) if self.resolved_path is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DependencyInfo":
+        """
+        Rebuilds a DependencyInfo from the output of to_dict().
+        to_dict() の出力から DependencyInfo を再構築します。
+        """
+        resolved_path = data.get("resolved_path")
+        return cls(
+            module_name=data["module_name"],
+            resolved_name=data["resolved_name"],
+            dependency_type=DependencyType[data["dependency_type"]],
+            level=data.get("level"),
+            resolved_path=Path(resolved_path) if resolved_path is not None else None,
+        )
@@ -33,6 +33,12 @@ class AnalysisError(KotemariError):
     """
     pass
 
+class AnalysisCancelledError(AnalysisError):
+    """Raised when a running analysis is stopped early on request (e.g., on shutdown).
+    実行中の解析が要求により途中で停止された場合（例：シャットダウン時）に発生するエラー。
+    """
+    pass
+
 class CacheError(KotemariError):
     """Error related to cache operations (read, write, validation).
     キャッシュ操作（読み取り、書き込み、検証）に関連するエラー。
@@ -6,7 +6,7 @@ from typing import Optional, List
 from .dependency_info import DependencyInfo
 
 
-@dataclass
+@dataclass(slots=True)
 class FileInfo:
     """
     Represents information about a single file in the project.
@@ -15,8 +15,10 @@ class FileInfo:
     Attributes:
         path (Path): The absolute path to the file.
                      ファイルへの絶対パス。
-        mtime (datetime.datetime): The last modification time of the file.
-                                ファイルの最終更新日時。
+        mtime_ns (int): The raw last modification time in nanoseconds (st_mtime_ns).
+                        The datetime is only built on demand, by the mtime property.
+                        ナノ秒単位の生の最終更新時刻（st_mtime_ns）。
+                        datetime は mtime プロパティで必要な時にのみ構築されます。
         size (int): The size of the file in bytes.
                     ファイルサイズ（バイト単位）。
         hash (Optional[str]): The hash (e.g., SHA256) of the file content.
@@ -29,9 +31,48 @@ class FileInfo:
                                   依存関係の再計算が必要かどうかを示すフラグ
     """
     path: Path
-    mtime: datetime.datetime
+    mtime_ns: int
     size: int
     hash: Optional[str] = None
     language: Optional[str] = None
     dependencies: List[DependencyInfo] = field(default_factory=list)
-    dependencies_stale: bool = False
\ No newline at end of file
+    dependencies_stale: bool = False
+
+    @property
+    def mtime(self) -> datetime.datetime:
+        """
+        The last modification time of the file, as an aware UTC datetime.
+        ファイルの最終更新日時（UTC のタイムゾーン付き datetime）。
+        """
+        return datetime.datetime.fromtimestamp(self.mtime_ns / 1e9, tz=datetime.timezone.utc)
+
+    def to_dict(self) -> dict:
+        """
+        Returns the fields as primitives (str path) for serialization.
+        シリアライズ用に、フィールドをプリミティブ（文字列のパス）として返します。
+        """
+        return {
+            "path": str(self.path),
+            "mtime_ns": self.mtime_ns,
+            "size": self.size,
+            "hash": self.hash,
+            "language": self.language,
+            "dependencies": [dependency.to_dict() for dependency in self.dependencies],
+            "dependencies_stale": self.dependencies_stale,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FileInfo":
+        """
+        Rebuilds a FileInfo from the output of to_dict().
+        to_dict() の出力から FileInfo を再構築します。
+        """
+        return cls(
+            path=Path(data["path"]),
+            mtime_ns=data["mtime_ns"],
+            size=data["size"],
+            hash=data.get("hash"),
+            language=data.get("language"),
+            dependencies=[DependencyInfo.from_dict(dependency) for dependency in data.get("dependencies", ())],
+            dependencies_stale=data.get("dependencies_stale", False),
+        )
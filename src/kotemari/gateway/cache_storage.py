@@ -0,0 +1,193 @@
+from pathlib import Path
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import logging
+import os
+
+try:
+    # msgpack is an optional, faster and more compact encoding for the index.
+    # msgpack はインデックス用のオプションの、より高速でコンパクトなエンコーディングです。
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the optional extra
+    msgpack = None
+
+from ..domain.file_info import FileInfo
+from ..domain.exceptions import FileSystemError
+from ..service.hash_calculator import DEFAULT_HASH_ALGORITHM
+from .file_system_accessor import FileSystemAccessor
+
+logger = logging.getLogger(__name__)
+
+def _encode_payload(payload: Dict[str, Any]) -> bytes:
+    """
+    Encodes the index payload with msgpack when available, otherwise as compact JSON.
+    利用可能な場合は msgpack で、そうでなければコンパクトな JSON としてインデックスのペイロードをエンコードします。
+    """
+    if msgpack is not None:
+        return msgpack.packb(payload, use_bin_type=True)
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+def _decode_payload(data: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Decodes an index payload written by _encode_payload. A JSON document starts with '{',
+    which is never the first byte of a msgpack map, so either encoding is recognized.
+    _encode_payload で書き込まれたインデックスのペイロードをデコードします。JSON 文書は '{' で始まり、
+    これは msgpack のマップの先頭バイトにはならないため、どちらのエンコーディングも判別できます。
+
+    Returns:
+        Optional[Dict[str, Any]]: The payload, or None if it cannot be decoded here.
+                                  ペイロード。ここでデコードできない場合は None。
+    """
+    try:
+        if data[:1] == b"{":
+            return json.loads(data)
+        if msgpack is not None:
+            return msgpack.unpackb(data, raw=False)
+    except ValueError as e: # json.JSONDecodeError and msgpack's decoding errors
+        logger.warning("Could not decode the analysis index: %s", e)
+    return None
+
+class CacheStorage:
+    """
+    Persists the analysis index of a project between runs, so a cold start only
+    re-analyzes the files that changed since the index was written.
+    実行間でプロジェクトの分析インデックスを永続化し、コールドスタート時に
+    インデックス書き込み以降に変更されたファイルのみを再分析できるようにします。
+    """
+
+    # Bump whenever the stored layout (or FileInfo.to_dict) changes; older files are then ignored.
+    # 保存形式（または FileInfo.to_dict）が変わるたびに上げます。古いファイルは無視されます。
+    CACHE_FORMAT_VERSION = 4
+    INDEX_SUFFIX = ".idx"
+    # Index files kept in the cache directory; the least recently written beyond this are deleted.
+    # キャッシュディレクトリに保持するインデックスファイル数。これを超えた分は書き込みの古い順に削除されます。
+    MAX_INDEX_FILES = 64
+
+    def __init__(self, project_root: Path, fs_accessor: FileSystemAccessor,
+                 cache_dir: Optional[Path] = None):
+        """
+        Initializes the CacheStorage.
+        CacheStorage を初期化します。
+
+        Args:
+            project_root (Path): The absolute project root the index belongs to.
+                                 インデックスが属するプロジェクトルートの絶対パス。
+            fs_accessor (FileSystemAccessor): Used to read and write the index file.
+                                              インデックスファイルの読み書きに使用します。
+            cache_dir (Optional[Path], optional): Directory holding the index files.
+                                                  Defaults to $XDG_CACHE_HOME/kotemari (~/.cache/kotemari).
+                                                  インデックスファイルを格納するディレクトリ。
+                                                  デフォルトは $XDG_CACHE_HOME/kotemari (~/.cache/kotemari)。
+        """
+        self.project_root = project_root
+        self.fs_accessor = fs_accessor
+        if cache_dir is None:
+            cache_dir = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "kotemari"
+        project_key = hashlib.sha1(str(project_root).encode("utf-8")).hexdigest()[:16]
+        self.index_path = Path(cache_dir).resolve() / f"{project_key}{self.INDEX_SUFFIX}"
+
+    def save_analysis_index(self, analysis_results: Dict[str, FileInfo]) -> bool:
+        """
+        Writes the analysis index to disk. Failures are logged and reported, never raised.
+        分析インデックスをディスクに書き込みます。失敗はログに記録して返り値で通知し、例外は発生させません。
+
+        Args:
+            analysis_results (Dict[str, FileInfo]): The index keyed by str(FileInfo.path).
+                                                    str(FileInfo.path) をキーとするインデックス。
+
+        Returns:
+            bool: True if the index was written.
+                  インデックスが書き込まれた場合は True。
+        """
+        payload = {
+            "version": self.CACHE_FORMAT_VERSION,
+            "project_root": str(self.project_root),
+            # Hashes from another algorithm (e.g. blake3 installed or removed since) never match
+            # 別のアルゴリズムのハッシュ（その後 blake3 が導入・削除された場合など）は一致しません
+            "hash_algorithm": DEFAULT_HASH_ALGORITHM,
+            "files": [file_info.to_dict() for file_info in analysis_results.values()],
+        }
+        try:
+            self.fs_accessor.write_bytes(_encode_payload(payload), self.index_path)
+        except Exception as e:
+            logger.warning("Could not write the analysis index to %s: %s", self.index_path, e)
+            return False
+        logger.debug("Saved analysis index with %d files to %s", len(analysis_results), self.index_path)
+        self._evict_old_indexes()
+        return True
+
+    def _evict_old_indexes(self) -> None:
+        """
+        Deletes the least recently written index files beyond MAX_INDEX_FILES, so the cache
+        directory stays bounded however many projects are analyzed.
+        MAX_INDEX_FILES を超えたインデックスファイルを書き込みの古い順に削除し、分析したプロジェクトの数に
+        かかわらずキャッシュディレクトリの大きさを抑えます。
+        """
+        try:
+            with os.scandir(self.index_path.parent) as it:
+                entries = [(entry.stat().st_mtime_ns, entry.path) for entry in it
+                           if entry.name.endswith(self.INDEX_SUFFIX) and entry.is_file()]
+        except OSError as e:
+            logger.debug("Could not list the cache directory %s: %s", self.index_path.parent, e)
+            return
+        if len(entries) <= self.MAX_INDEX_FILES:
+            return
+        entries.sort(reverse=True)
+        for _, path in entries[self.MAX_INDEX_FILES:]:
+            try:
+                os.unlink(path)
+            except OSError as e:
+                logger.debug("Could not delete the old analysis index %s: %s", path, e)
+
+    def load_analysis_index(self) -> Optional[Dict[str, FileInfo]]:
+        """
+        Reads the analysis index written by a previous run.
+        Entries whose mtime is not older than the index file itself are dropped, because
+        a change within the same timestamp tick would be invisible to an mtime comparison.
+        以前の実行で書き込まれた分析インデックスを読み込みます。
+        同じタイムスタンプの刻み内での変更は mtime の比較では検出できないため、
+        インデックスファイル自体より新しい（同時刻を含む）mtime を持つエントリは除外されます。
+
+        Returns:
+            Optional[Dict[str, FileInfo]]: The index keyed by str(FileInfo.path), or None if there is
+                                           no usable index (missing, unreadable, other version, project or hash algorithm).
+                                           str(FileInfo.path) をキーとするインデックス。利用可能なインデックスがない場合
+                                           （存在しない、読み取れない、バージョン・プロジェクト・ハッシュアルゴリズムが異なる）は None。
+        """
+        try:
+            index_mtime_ns = self.index_path.stat().st_mtime_ns
+            payload = _decode_payload(self.fs_accessor.read_bytes(self.index_path))
+        except (OSError, FileSystemError):
+            return None
+        if (not isinstance(payload, dict)
+                or payload.get("version") != self.CACHE_FORMAT_VERSION
+                or payload.get("project_root") != str(self.project_root)
+                or payload.get("hash_algorithm") != DEFAULT_HASH_ALGORITHM):
+            logger.info("Ignoring analysis index %s written by another version, project or hash algorithm.",
+                        self.index_path)
+            return None
+
+        # The version field vouches for the layout; only the entries that will be reused are rebuilt
+        # バージョンフィールドが形式を保証します。再利用されるエントリのみを再構築します
+        try:
+            results = {
+                entry["path"]: FileInfo.from_dict(entry)
+                for entry in payload["files"]
+                if entry["mtime_ns"] < index_mtime_ns
+            }
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning("Ignoring malformed analysis index %s: %s", self.index_path, e)
+            return None
+        logger.debug("Loaded analysis index with %d reusable files from %s", len(results), self.index_path)
+        return results
+
+    def clear_analysis_index(self) -> None:
+        """
+        Deletes the persisted analysis index, if any.
+        永続化された分析インデックスを（存在すれば）削除します。
+        """
+        try:
+            self.index_path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning("Could not delete the analysis index %s: %s", self.index_path, e)
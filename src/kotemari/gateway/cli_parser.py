@@ -1,18 +1,26 @@
 import typer
 from typing_extensions import Annotated
 from pathlib import Path
+import functools
 import logging
-from typing import List, Optional
+import os
+import sys
+from typing import TYPE_CHECKING, List, Optional
 
-from ..controller.cli_controller import CliController
+if TYPE_CHECKING:
+    # Imported on first use in _get_controller: `--help` never needs the analysis stack
+    # _get_controller での初回使用時にインポートします。`--help` では分析スタックは不要です
+    from ..controller.cli_controller import CliController
 
-# Basic logger setup (adjust level and format as needed)
-# Use a specific logger name to avoid interfering with other libraries
+# Use a specific logger name to avoid interfering with other libraries.
+# Logging is configured in main_callback, so importing this module (or `--help`) has no side effects.
 # 他のライブラリとの干渉を避けるために特定のロガー名を使用
+# ロギングは main_callback で設定するため、このモジュールのインポート（や `--help`）に副作用はありません。
 kotemari_cli_logger = logging.getLogger("kotemari_cli")
-logging.basicConfig(level=logging.WARNING, format='[%(levelname)s] %(name)s: %(message)s') # Default level WARN
 
-app = typer.Typer(help="Kotemari: Analyze Python projects and manage context for LLMs.")
+APP_HELP = "Kotemari: Analyze Python projects and manage context for LLMs."
+
+app = typer.Typer(help=APP_HELP)
 
 # --- Common Type Annotations with Options ---
 # Define Annotated types for common options BEFORE they are used in callback
@@ -44,9 +52,25 @@ Verbosity = Annotated[
 class GlobalState:
     """ Class to hold global state passed via ctx.obj """
     def __init__(self):
-        self.controller: Optional[CliController] = None
+        self.controller: Optional["CliController"] = None
         self.log_level: int = logging.WARNING # Store log level determined in callback
 
+@functools.lru_cache(maxsize=4)
+def _get_controller(project_root: str, config_path: Optional[str], use_cache: bool, log_level: int) -> "CliController":
+    """
+    Returns the controller for these options, reusing it across commands run in the same process,
+    so the Kotemari instance (ignore rules, analysis results) is only set up once.
+    これらのオプションに対応するコントローラーを返します。同じプロセス内で実行されるコマンド間で再利用するため、
+    Kotemari インスタンス（無視ルール、分析結果）のセットアップは一度だけです。
+    """
+    from ..controller.cli_controller import CliController
+    return CliController(
+        project_root=project_root,
+        config_path=config_path,
+        use_cache=use_cache,
+        log_level=log_level # Pass log level to Controller constructor
+    )
+
 @app.callback()
 def main_callback(
     ctx: typer.Context,
@@ -91,11 +115,8 @@ def main_callback(
     # Pass the determined log_level to the controller/Kotemari instance
     # 決定された log_level をコントローラー/Kotemari インスタンスに渡す
     ctx.obj.log_level = log_level # Store log level in state
-    ctx.obj.controller = CliController(
-        project_root=str(project_root),
-        config_path=str(config_path) if config_path else None,
-        use_cache=use_cache,
-        log_level=log_level # Pass log level to Controller constructor
+    ctx.obj.controller = _get_controller(
+        str(project_root), str(config_path) if config_path else None, use_cache, log_level
     )
     kotemari_cli_logger.debug(f"Controller initialized in callback for project: {project_root} with log level {logging.getLevelName(log_level)}")
 
@@ -107,7 +128,7 @@ def analyze(
     verbosity: Verbosity = 0 # Required for Typer to parse -v/-vv for this command
 ):
     """Analyze the project structure, dependencies, and file information."""
-    controller: CliController = ctx.obj.controller
+    controller: "CliController" = ctx.obj.controller
     if not controller:
         kotemari_cli_logger.error("Controller not initialized.")
         raise typer.Exit(code=1)
@@ -119,34 +140,36 @@ def analyze(
 @app.command()
 def dependencies(
     ctx: typer.Context,
-    target_file: Annotated[Path, typer.Argument(help="Path to the Python file to get dependencies for.", 
-                                                exists=True, file_okay=True, dir_okay=False, readable=True, resolve_path=True)],
+    # Not checked or resolved here: the facade resolves the path once and rejects files missing from the analysis
+    # ここでは確認・解決しません。ファサードがパスを一度だけ解決し、分析結果にないファイルを拒否します
+    target_file: Annotated[Path, typer.Argument(help="Path to the Python file to get dependencies for.")],
     verbosity: Verbosity = 0 # Add verbosity option
 ):
     """Show dependencies for a specific Python file within the project."""
-    controller: CliController = ctx.obj.controller
+    controller: "CliController" = ctx.obj.controller
     if not controller:
         kotemari_cli_logger.error("Controller not initialized.")
         raise typer.Exit(code=1)
 
     kotemari_cli_logger.info(f"Getting dependencies for: {target_file}")
-    controller.show_dependencies(ctx, str(target_file))
+    controller.show_dependencies(ctx, os.path.abspath(target_file)) # Relative to the CWD, without a stat
 
 @app.command()
 def context(
     ctx: typer.Context,
-    target_files: Annotated[List[Path], typer.Argument(help="Paths to the target files to include in the context.",
-                                                      exists=True, file_okay=True, dir_okay=False, readable=True, resolve_path=True)],
+    # Validated by the facade against the analysis results, as for `dependencies`
+    # `dependencies` と同様に、ファサードが分析結果に照らして検証します
+    target_files: Annotated[List[Path], typer.Argument(help="Paths to the target files to include in the context.")],
     verbosity: Verbosity = 0 # Add verbosity option
 ):
     """Generate a context string from specified files for LLM input."""
-    controller: CliController = ctx.obj.controller
+    controller: "CliController" = ctx.obj.controller
     if not controller:
         kotemari_cli_logger.error("Controller not initialized.")
         raise typer.Exit(code=1)
 
     kotemari_cli_logger.info(f"Generating context for: {', '.join(map(str, target_files))}")
-    target_file_strs = [str(p) for p in target_files]
+    target_file_strs = [os.path.abspath(p) for p in target_files] # Relative to the CWD, without a stat
     controller.generate_context(ctx, target_file_strs)
 
 # New CLI command to list files in the project directory
@@ -156,7 +179,7 @@ def list_cmd(
     verbosity: Verbosity = 0 # Add verbosity option
 ):
     """Lists all files in the given project root (respecting ignore rules)."""
-    controller: CliController = ctx.obj.controller
+    controller: "CliController" = ctx.obj.controller
     if not controller:
         kotemari_cli_logger.error("Controller not initialized.")
         raise typer.Exit(code=1)
@@ -171,7 +194,7 @@ def tree_cmd(
     verbosity: Verbosity = 0 # Add verbosity option
 ):
     """Displays the tree structure of the project directory (respecting ignore rules)."""
-    controller: CliController = ctx.obj.controller
+    controller: "CliController" = ctx.obj.controller
     if not controller:
         kotemari_cli_logger.error("Controller not initialized.")
         raise typer.Exit(code=1)
@@ -180,8 +203,56 @@ def tree_cmd(
     controller.display_tree(ctx)
 
 # --- Entry point for CLI --- 
+
+# Subcommands by name, so main() can register only the one that was asked for
+# main() が要求されたサブコマンドのみを登録できるよう、名前ごとのサブコマンド
+_COMMANDS = {
+    "analyze": analyze,
+    "dependencies": dependencies,
+    "context": context,
+    "list": list_cmd,
+    "tree": tree_cmd,
+}
+
+# Global options that consume the following argument as their value
+# 次の引数を値として消費するグローバルオプション
+_OPTIONS_WITH_VALUE = frozenset({"--project-root", "-p", "--config", "-c"})
+
+def _requested_command(args: List[str]) -> Optional[str]:
+    """
+    Returns the first positional argument of the command line (the subcommand name), if any.
+    コマンドラインの最初の位置引数（サブコマンド名）を返します（存在する場合）。
+    """
+    skip_value = False
+    for arg in args:
+        if skip_value:
+            skip_value = False
+        elif arg in _OPTIONS_WITH_VALUE:
+            skip_value = True
+        elif not arg.startswith("-"):
+            return arg
+    return None
+
+def _single_command_app(name: str) -> typer.Typer:
+    """
+    Builds an app with the global callback and only the named subcommand, so Click does not
+    construct the parsers of the other subcommands.
+    グローバルコールバックと指定されたサブコマンドのみを持つアプリを構築します。
+    これにより Click は他のサブコマンドのパーサーを構築しません。
+    """
+    single_app = typer.Typer(help=APP_HELP)
+    single_app.callback()(main_callback)
+    single_app.command(name)(_COMMANDS[name])
+    return single_app
+
 def main():
-    app()
+    # The full app is only needed to list every subcommand (e.g. a bare `kotemari --help`) or report an unknown one
+    # 完全なアプリは全サブコマンドの一覧表示（例: 引数なしの `kotemari --help`）や不明なコマンドの報告にのみ必要です
+    name = _requested_command(sys.argv[1:])
+    if name in _COMMANDS:
+        _single_command_app(name)()
+    else:
+        app()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
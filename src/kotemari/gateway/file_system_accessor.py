@@ -1,10 +1,15 @@
 from pathlib import Path
 import os
-import datetime
-from typing import Iterator, List, Callable, Union, Optional, Any # Iterator, List, Callable, Union, Optional, Any をインポート
+import stat
+from typing import Iterator, List, Callable, Union, Optional, Any, Dict # Iterator, List, Callable, Union, Optional, Any をインポート
 import sys
 import logging
 import pickle
+import tempfile
+import contextlib
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from ..domain.file_info import FileInfo
 from ..utility.path_resolver import PathResolver
@@ -12,12 +17,23 @@ from ..domain.exceptions import FileSystemError # カスタム例外をインポ
 
 logger = logging.getLogger(__name__)
 
+# Marks the end of a subtree in its scan queue.
+# スキャンキュー内のサブツリーの終端を示します。
+_SCAN_DONE = object()
+
 class FileSystemAccessor:
     """
     Provides access to the file system for reading files and listing directories.
     ファイル読み込みとディレクトリ一覧表示のためにファイルシステムへのアクセスを提供します。
     """
 
+    # Files a subtree walker may queue ahead of the consumer before it blocks.
+    # 利用側より先にサブツリーの走査スレッドがキューに積めるファイル数（超えるとブロックします）。
+    SCAN_QUEUE_SIZE = 1024
+    # Seconds a blocked walker waits before re-checking whether the scan was abandoned.
+    # ブロックされた走査スレッドが、スキャンが中止されたかを再確認するまでの待機秒数。
+    SCAN_QUEUE_POLL_INTERVAL = 0.1
+
     def __init__(self, path_resolver: PathResolver):
         """
         Initializes the FileSystemAccessor.
@@ -43,35 +59,108 @@ class FileSystemAccessor:
                  ファイルの内容。
 
         Raises:
-            FileNotFoundError: If the file does not exist.
-                               ファイルが存在しない場合。
-            IOError: If there is an error reading the file.
-                     ファイルの読み込み中にエラーが発生した場合。
+            FileSystemError: If the file does not exist or cannot be read.
+                             ファイルが存在しないか読み込めない場合。
         """
         abs_path = self.path_resolver.resolve_absolute(file_path)
         try:
-            with open(abs_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            # One read and one decode instead of the incremental text I/O stack
+            # テキスト I/O スタックの逐次デコードではなく、1回の読み込みと1回のデコード
+            content = abs_path.read_bytes().decode('utf-8')
+            if '\r' in content:
+                # Same newline translation as text mode (universal newlines)
+                # テキストモード（ユニバーサル改行）と同じ改行の変換
+                content = content.replace('\r\n', '\n').replace('\r', '\n')
+            return content
         except FileNotFoundError as e:
             # Wrap FileNotFoundError in our custom FileSystemError
             # FileNotFoundError をカスタム FileSystemError でラップします
             logger.warning(f"File not found during read: {abs_path}")
             raise FileSystemError(f"File not found: {abs_path}") from e
-        except IOError as e: # Catch potential encoding errors or other read issues
+        except IOError as e: # Catch other read issues
             logger.error(f"IOError reading file {abs_path}: {e}")
             raise FileSystemError(f"Error reading file {abs_path}: {e}") from e
+        except UnicodeDecodeError as e:
+            logger.error(f"Encoding error reading file {abs_path}: {e}")
+            raise FileSystemError(f"Error decoding file {abs_path} as UTF-8: {e}") from e
         except Exception as e: # Catch other unexpected errors
             # Catch potential encoding errors or other read issues
             # エンコーディングエラーやその他の読み取り問題をキャッチする
             logger.exception(f"Unexpected error reading file {abs_path}: {e}")
             raise FileSystemError(f"Unexpected error reading file {abs_path}: {e}") from e
 
-    def scan_directory(self, dir_path: Path | str, ignore_func: Callable[[Path], bool] | None = None) -> Iterator[FileInfo]:
+    def read_bytes(self, file_path: Path | str) -> bytes:
+        """
+        Reads the raw content of a file.
+        ファイルの生の内容を読み込みます。
+
+        Args:
+            file_path (Path | str): The path to the file to read.
+                                    読み込むファイルのパス。
+
+        Returns:
+            bytes: The content of the file.
+                   ファイルの内容。
+
+        Raises:
+            FileSystemError: If the file does not exist or cannot be read.
+                             ファイルが存在しないか読み込めない場合。
+        """
+        abs_path = self.path_resolver.resolve_absolute(file_path)
+        try:
+            return abs_path.read_bytes()
+        except FileNotFoundError as e:
+            raise FileSystemError(f"File not found: {abs_path}") from e
+        except OSError as e:
+            raise FileSystemError(f"Error reading file {abs_path}: {e}") from e
+
+    def read_many_bytes(self, file_paths: List[Path], max_workers: int = 32) -> Dict[Path, Optional[bytes]]:
+        """
+        Reads several files concurrently. File reads release the GIL, so a thread pool
+        keeps multiple requests in flight to the storage device.
+        複数のファイルを並行して読み込みます。ファイル読み込みは GIL を解放するため、
+        スレッドプールによりストレージデバイスへ複数のリクエストを同時に発行できます。
+
+        Args:
+            file_paths (List[Path]): The files to read.
+                                     読み込むファイル。
+            max_workers (int, optional): Upper bound on reader threads. Defaults to 32.
+                                         読み込みスレッド数の上限。デフォルトは 32。
+
+        Returns:
+            Dict[Path, Optional[bytes]]: The content per path; None for files that could not be read.
+                                         パスごとの内容。読み込めなかったファイルは None。
+        """
+        def _read(path: Path) -> Optional[bytes]:
+            try:
+                return path.read_bytes()
+            except OSError as e:
+                logger.warning(f"Could not preload {path}: {e}")
+                return None
+
+        if not file_paths:
+            return {}
+        if len(file_paths) == 1:
+            return {file_paths[0]: _read(file_paths[0])}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(file_paths))) as executor:
+            return dict(zip(file_paths, executor.map(_read, file_paths)))
+
+    def scan_directory(self, dir_path: Path | str,
+                       ignore_func: Callable[[Path], bool] | None = None,
+                       ignore_dir_func: Callable[[Path], bool] | None = None,
+                       max_workers: int = 8) -> Iterator[FileInfo]:
         """
         Recursively scans a directory and yields FileInfo objects for each file found.
-        Optionally applies an ignore function to skip certain files or directories.
+        Ignored directories are pruned before descending, so their contents are never listed.
+        The top-level subdirectories are walked concurrently (directory reads and stats release
+        the GIL), while files are still yielded in directory order; the ignore functions must
+        therefore be thread-safe. Each subtree is streamed through a bounded queue, and walkers
+        stop at the next directory level once the consumer stops iterating.
         ディレクトリを再帰的にスキャンし、見つかった各ファイルのFileInfoオブジェクトをyieldします。
-        オプションで無視関数を適用して、特定のファイルやディレクトリをスキップします。
+        無視されたディレクトリは降下前に枝刈りされるため、その中身は列挙されません。
+        最上位のサブディレクトリは並行して走査されます（ディレクトリの読み込みと stat は GIL を解放します）が、
+        ファイルは引き続きディレクトリ順に yield されます。そのため無視関数はスレッドセーフである必要があります。
+        各サブツリーは上限付きのキューを通して逐次渡され、利用側が反復を止めると走査スレッドは次の階層で停止します。
 
         Args:
             dir_path (Path | str): The path to the directory to scan.
@@ -81,14 +170,23 @@ class FileSystemAccessor:
                 Defaults to None (no ignoring).
                 Pathオブジェクトを受け取り、無視すべき場合にTrueを返す関数。
                 デフォルトは None (無視しない)。
+            ignore_dir_func (Callable[[Path], bool] | None, optional):
+                A function used for directories only (e.g. evaluating patterns like 'build/').
+                Defaults to None, in which case ignore_func is used for directories too.
+                ディレクトリ専用の関数（'build/' のようなパターンの評価など）。
+                デフォルトは None で、その場合はディレクトリにも ignore_func が使われます。
+            max_workers (int, optional): Upper bound on threads walking top-level subdirectories;
+                                         1 walks sequentially. Defaults to 8.
+                                         最上位サブディレクトリを走査するスレッド数の上限。
+                                         1 の場合は逐次走査します。デフォルトは 8。
 
         Yields:
             Iterator[FileInfo]: An iterator yielding FileInfo objects for non-ignored files.
                                 無視されなかったファイルのFileInfoオブジェクトをyieldするイテレータ。
 
         Raises:
-            FileNotFoundError: If the directory does not exist.
-                               ディレクトリが存在しない場合。
+            FileSystemError: If the directory does not exist.
+                             ディレクトリが存在しない場合。
         """
         abs_dir_path = self.path_resolver.resolve_absolute(dir_path)
         if not abs_dir_path.is_dir():
@@ -96,36 +194,194 @@ class FileSystemAccessor:
             # ディレクトリが見つからない場合にカスタム FileSystemError を発生させます
             raise FileSystemError(f"Directory not found: {abs_dir_path}")
 
-        for root, dirs, files in os.walk(abs_dir_path, topdown=True):
-            root_path = Path(root)
+        dir_check = ignore_dir_func or ignore_func
+        top_level = self._scan_level(abs_dir_path, ignore_func, dir_check)
+        subdirs = [item for item in top_level if not isinstance(item, FileInfo)]
+        if max_workers <= 1 or len(subdirs) < 2:
+            for item in top_level:
+                if isinstance(item, FileInfo):
+                    yield item
+                else:
+                    yield from self._scan_tree(item, ignore_func, dir_check)
+            return
+
+        stop_event = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(subdirs)))
+        try:
+            subtrees: Dict[Path, tuple] = {}
+            for subdir in subdirs:
+                subtree_queue: queue.Queue = queue.Queue(maxsize=self.SCAN_QUEUE_SIZE)
+                future = executor.submit(self._stream_tree, subdir, ignore_func, dir_check, subtree_queue, stop_event)
+                subtrees[subdir] = (subtree_queue, future)
+            for item in top_level:
+                if isinstance(item, FileInfo):
+                    yield item
+                    continue
+                subtree_queue, future = subtrees[item]
+                while (queued := subtree_queue.get()) is not _SCAN_DONE:
+                    yield queued
+                # Re-raise an error from the walker, if any
+                # 走査スレッドでエラーが発生していれば再送出します
+                future.result()
+        finally:
+            # A consumer that stops early does not wait for the remaining subtrees; running walkers
+            # see the stop flag at their next directory level (or while blocked on a full queue)
+            # 途中で停止した利用側は残りのサブツリーを待ちません。実行中の走査スレッドは次の階層で
+            # （または満杯のキューでブロック中に）停止フラグを確認します
+            stop_event.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _stream_tree(self, dir_path: Path,
+                     ignore_func: Callable[[Path], bool] | None,
+                     ignore_dir_func: Callable[[Path], bool] | None,
+                     subtree_queue: queue.Queue,
+                     stop_event: threading.Event) -> None:
+        """
+        Walks a subtree on a worker thread, putting each file into the bounded queue and
+        _SCAN_DONE at the end. Returns early once the stop flag is set.
+        ワーカースレッドでサブツリーを走査し、各ファイルを上限付きキューに入れ、最後に _SCAN_DONE を入れます。
+        停止フラグが設定されると早期に戻ります。
+        """
+        try:
+            for file_info in self._scan_tree(dir_path, ignore_func, ignore_dir_func, stop_event):
+                if not self._put_unless_stopped(subtree_queue, file_info, stop_event):
+                    return
+        finally:
+            self._put_unless_stopped(subtree_queue, _SCAN_DONE, stop_event)
+
+    def _put_unless_stopped(self, subtree_queue: queue.Queue, item: Any, stop_event: threading.Event) -> bool:
+        """
+        Puts an item into a bounded queue, giving up if the stop flag is set while it is full.
+        上限付きキューに項目を入れます。満杯の間に停止フラグが設定された場合は諦めます。
+
+        Returns:
+            bool: True if the item was queued. / 項目がキューに入った場合は True。
+        """
+        while not stop_event.is_set():
+            try:
+                subtree_queue.put(item, timeout=self.SCAN_QUEUE_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
 
-            # Apply ignore function to directories
-            # ディレクトリに無視関数を適用する
-            if ignore_func:
-                # Filter dirs in-place to prevent descending into ignored directories
-                # 無視されたディレクトリへの降下を防ぐために、dirsをインプレースでフィルタリングする
-                dirs[:] = [d for d in dirs if not ignore_func(root_path / d)]
+    def _scan_tree(self, dir_path: Path,
+                   ignore_func: Callable[[Path], bool] | None,
+                   ignore_dir_func: Callable[[Path], bool] | None,
+                   stop_event: Optional[threading.Event] = None) -> Iterator[FileInfo]:
+        """
+        Walks a directory tree depth-first, in directory order. If a stop flag is given,
+        the walk ends before listing the next directory level once it is set.
+        ディレクトリツリーをディレクトリ順に深さ優先で走査します。停止フラグが渡された場合、
+        それが設定されると次の階層を列挙する前に走査を終了します。
+        """
+        # An explicit stack of level iterators instead of nested `yield from` generators: each file is
+        # handed out by this one frame, however deep the tree is
+        # ネストした `yield from` ジェネレータの代わりに階層イテレータの明示的なスタックを使います。
+        # ツリーがどれほど深くても、各ファイルはこの1つのフレームから渡されます
+        stack = [iter(self._scan_level(dir_path, ignore_func, ignore_dir_func))]
+        while stack:
+            for item in stack[-1]:
+                if isinstance(item, FileInfo):
+                    yield item
+                else:
+                    if stop_event is not None and stop_event.is_set():
+                        return
+                    stack.append(iter(self._scan_level(item, ignore_func, ignore_dir_func)))
+                    break
+            else:
+                stack.pop()
 
-            for file_name in files:
-                file_path = root_path / file_name
+    def _scan_level(self, dir_path: Path,
+                    ignore_func: Callable[[Path], bool] | None,
+                    ignore_dir_func: Callable[[Path], bool] | None) -> List[Union[FileInfo, Path]]:
+        """
+        Lists one directory level with os.scandir: a FileInfo for each non-ignored file
+        and the path of each non-ignored subdirectory, in directory order.
+        os.scandir で1階層を列挙します。無視されていない各ファイルの FileInfo と、
+        無視されていない各サブディレクトリのパスをディレクトリ順に返します。
+        """
+        items: List[Union[FileInfo, Path]] = []
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError as e:
+            logger.warning(f"Could not list directory {dir_path}: {e}")
+            return items
 
-                # Apply ignore function to files
-                # ファイルに無視関数を適用する
-                if ignore_func and ignore_func(file_path):
+        for entry in entries:
+            entry_path = dir_path / entry.name
+            try:
+                # d_type from getdents answers these without an extra stat call
+                # getdents の d_type により追加の stat 呼び出しなしで判定できます
+                if entry.is_dir(follow_symlinks=False):
+                    # Prune ignored directories before descending
+                    # 降下する前に無視されたディレクトリを枝刈りします
+                    if ignore_dir_func and ignore_dir_func(entry_path):
+                        continue
+                    items.append(entry_path)
+                    continue
+                if not entry.is_file():
                     continue
+            except OSError as e:
+                logger.warning(f"Could not access file info for {entry_path}: {e}")
+                continue
 
-                try:
-                    stat_result = file_path.stat()
-                    mtime = datetime.datetime.fromtimestamp(stat_result.st_mtime, tz=datetime.timezone.utc)
-                    size = stat_result.st_size
-                    yield FileInfo(path=file_path, mtime=mtime, size=size)
-                except OSError as e:
-                    # Handle potential errors like permission denied during stat
-                    # stat中の権限拒否などの潜在的なエラーを処理する
-                    logger.warning(f"Could not access file info for {file_path}: {e}")
-                    # Optionally raise FileSystemError here? Decide based on desired strictness.
-                    # オプションでここで FileSystemError を発生させますか？望ましい厳格さに基づいて決定します。
-                    continue # Skip yielding this file if stat fails
+            # Apply ignore function to files
+            # ファイルに無視関数を適用する
+            if ignore_func and ignore_func(entry_path):
+                continue
+
+            try:
+                # DirEntry caches its stat result (and on Windows already has it from the directory read)
+                # DirEntry は stat の結果をキャッシュします（Windows ではディレクトリ読み込み時点で取得済みです）
+                stat_result = entry.stat()
+                items.append(self._file_info_from_stat(entry_path, stat_result))
+            except OSError as e:
+                # Handle potential errors like permission denied during stat
+                # stat中の権限拒否などの潜在的なエラーを処理する
+                logger.warning(f"Could not access file info for {entry_path}: {e}")
+                continue # Skip this file if stat fails
+        return items
+
+    @staticmethod
+    def _file_info_from_stat(file_path: Path, stat_result: os.stat_result) -> FileInfo:
+        """
+        Builds a basic FileInfo (path, mtime, size) from a stat result.
+        stat の結果から基本的な FileInfo (path, mtime, size) を構築します。
+        """
+        return FileInfo(path=file_path, mtime_ns=stat_result.st_mtime_ns, size=stat_result.st_size)
+
+    def get_file_info(self, file_path: Path | str) -> Optional[FileInfo]:
+        """
+        Gets basic metadata (mtime, size) for a single file.
+        単一ファイルの基本的なメタデータ (mtime, size) を取得します。
+
+        Args:
+            file_path (Path | str): The path to the file.
+                                    ファイルへのパス。
+
+        Returns:
+            Optional[FileInfo]: A FileInfo with path, mtime and size, or None if the path
+                                does not exist or is not a regular file.
+                                path, mtime, size を持つ FileInfo。パスが存在しないか
+                                通常のファイルでない場合は None。
+
+        Raises:
+            FileSystemError: If the file exists but its metadata cannot be read.
+                             ファイルは存在するがメタデータを読み取れない場合。
+        """
+        abs_path = self.path_resolver.resolve_absolute(file_path)
+        try:
+            stat_result = os.stat(abs_path)
+        except FileNotFoundError:
+            logger.debug(f"File not found while getting file info: {abs_path}")
+            return None
+        except OSError as e:
+            raise FileSystemError(f"Could not access file info for {abs_path}: {e}") from e
+        if not stat.S_ISREG(stat_result.st_mode):
+            return None
+        return self._file_info_from_stat(abs_path, stat_result)
 
     def exists(self, file_path: Path | str) -> bool:
         """
@@ -143,6 +399,41 @@ class FileSystemAccessor:
         abs_path = self.path_resolver.resolve_absolute(file_path)
         return abs_path.exists()
 
+    def write_bytes(self, data: bytes, file_path: Path | str) -> None:
+        """
+        Writes bytes to a file atomically: the data goes to a uniquely named temporary file in the
+        same directory, which then replaces the target, so readers never see a partial file and
+        concurrent writers (threads or processes) never share a temporary file.
+        バイト列をアトミックにファイルへ書き込みます。データは同じディレクトリの一意な名前の一時ファイルに
+        書き込まれてから対象を置き換えるため、読み取り側が書きかけのファイルを見ることはなく、
+        並行する書き込み側（スレッドやプロセス）が一時ファイルを共有することもありません。
+
+        Args:
+            data (bytes): The content to write.
+                          書き込む内容。
+            file_path (Path | str): The path to the output file.
+                                    出力ファイルのパス。
+
+        Raises:
+            FileSystemError: If the file cannot be written.
+                             ファイルを書き込めない場合。
+        """
+        abs_path = self.path_resolver.resolve_absolute(file_path)
+        temp_name: Optional[str] = None
+        try:
+            abs_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_name = tempfile.mkstemp(dir=abs_path.parent, prefix=f".{abs_path.name}.", suffix=".tmp")
+            with open(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_name, abs_path)
+            temp_name = None
+        except OSError as e:
+            raise FileSystemError(f"Error writing file {abs_path}: {e}") from e
+        finally:
+            if temp_name is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(temp_name)
+
     def write_pickle(self, obj: Any, file_path: Union[Path, str], project_root: Path) -> None:
         """
         Serializes an object using pickle and writes it to a file.
@@ -165,7 +456,7 @@ class FileSystemAccessor:
             # ディレクトリが存在することを確認します
             absolute_path.parent.mkdir(parents=True, exist_ok=True)
             with open(absolute_path, 'wb') as f:
-                pickle.dump(obj, f)
+                pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
             logger.debug(f"Successfully pickled object to {absolute_path}")
         except (IOError, pickle.PicklingError) as e:
             logger.error(f"Error writing pickle file {absolute_path}: {e}")
@@ -120,26 +120,32 @@ class GitignoreReader:
                                          gitignore ルールからコンパイルされた PathSpec オブジェクト。
                                          ファイルが見つからないか空の場合は None。
         """
-        if not gitignore_path.is_file():
-            logger.debug(f".gitignore file not found at {gitignore_path}")
+        # One read and one decode; a missing file is reported by the read itself instead of a separate stat
+        # 1回の読み込みと1回のデコード。ファイルが存在しないことは別途の stat ではなく読み込み自体で検出します
+        try:
+            data = gitignore_path.read_bytes()
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            logger.debug(".gitignore file not found at %s", gitignore_path)
+            return None
+        except OSError as e:
+            logger.warning("Error reading .gitignore file at %s: %s", gitignore_path, e)
             return None
 
         try:
-            with gitignore_path.open('r', encoding='utf-8') as f:
-                patterns = f.readlines()
             # Filter out empty lines and comments
             # 空行とコメントを除外する
-            patterns = [p.strip() for p in patterns if p.strip() and not p.strip().startswith('#')]
+            patterns = [pattern for line in data.decode('utf-8').splitlines()
+                        if (pattern := line.strip()) and not pattern.startswith('#')]
             if not patterns:
-                logger.debug(f".gitignore file at {gitignore_path} is empty or contains only comments.")
+                logger.debug(".gitignore file at %s is empty or contains only comments.", gitignore_path)
                 return None
             # pathspec uses the directory of the gitignore file as the root for pattern matching
             # pathspec は gitignore ファイルのディレクトリをパターンマッチングのルートとして使用します
             spec = pathspec.PathSpec.from_lines('gitwildmatch', patterns)
-            logger.debug(f"Successfully read and compiled .gitignore from {gitignore_path}")
+            logger.debug("Successfully read and compiled .gitignore from %s", gitignore_path)
             return spec
         except Exception as e:
-            logger.warning(f"Error reading or parsing .gitignore file at {gitignore_path}: {e}", exc_info=True)
+            logger.warning("Error reading or parsing .gitignore file at %s: %s", gitignore_path, e, exc_info=True)
             return None
 
     @staticmethod
@@ -8,56 +8,86 @@ from ..domain.dependency_info import DependencyInfo
 
 logger = logging.getLogger(__name__)
 
-class _ImportVisitor(ast.NodeVisitor):
+# Statement fields that can hold nested statements (If/For/While/With/Try/ClassDef/Match bodies).
+# ネストされた文を保持しうるフィールド（If/For/While/With/Try/ClassDef/Match の本体）。
+_BODY_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+
+# Function bodies are not scanned for imports.
+# 関数本体はインポートの走査対象外です。
+_SKIPPED_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+_PROJECT_NAME = "kotemari"
+
+def _may_contain_imports(content: str | bytes) -> bool:
     """
-    An AST NodeVisitor that collects imported module names.
-    インポートされたモジュール名を収集する AST NodeVisitor。
+    Cheap substring pre-check: every import statement contains the keyword 'import'.
+    Python source encodings are ASCII-compatible, so the check also works on raw bytes.
+    安価な部分文字列の事前チェック: すべてのインポート文はキーワード 'import' を含みます。
+    Python ソースのエンコーディングは ASCII 互換のため、生のバイト列でも機能します。
     """
-    def __init__(self, file_path: Path):
-        self.imports: Set[str] = set()
-        self.file_path = file_path # Needed for potential relative import resolution later
+    if isinstance(content, bytes):
+        return b"import" in content
+    return "import" in content
 
-    def visit_Import(self, node: ast.Import):
-        """
-        Visits ast.Import nodes (e.g., import os, sys).
-        ast.Import ノード（例: import os, sys）を訪問します。
-        """
-        for alias in node.names:
-            self.imports.add(alias.name)
-
-    def visit_ImportFrom(self, node: ast.ImportFrom):
-        """
-        Visits ast.ImportFrom nodes (e.g., from os import path).
-        ast.ImportFrom ノード（例: from os import path）を訪問します。
+def _import_from_name(node: ast.ImportFrom) -> str:
+    """
+    Builds the module name for an ast.ImportFrom node (e.g., from os import path).
+    ast.ImportFrom ノード（例: from os import path）のモジュール名を構築します。
 
-        Handles both absolute and relative imports. Level indicates relative level:
-        0 for absolute, 1 for '.', 2 for '..', etc.
-        絶対インポートと相対インポートの両方を処理します。level は相対レベルを示します:
-        0 は絶対、1 は '.'、2 は '..' など。
-        """
-        module_name = ""
-        if node.module:
-            if node.level == 0:
-                module_name = node.module
-            else:
-                relative_prefix = "." * node.level
-                module_name = relative_prefix + (node.module if node.module else "")
-        else:
-            # When no module is specified, use plain relative import (e.g. "from . import helper")
-            module_name = "." * node.level
-        if module_name:
-            logger.debug(f"Adding import: {module_name}")  # Debug: log the dependency being added
-            self.imports.add(module_name)
+    Handles both absolute and relative imports. Level indicates relative level:
+    0 for absolute, 1 for '.', 2 for '..', etc.
+    絶対インポートと相対インポートの両方を処理します。level は相対レベルを示します:
+    0 は絶対、1 は '.'、2 は '..' など。
+    """
+    if node.module:
+        if node.level == 0:
+            return node.module
+        return "." * node.level + node.module
+    # When no module is specified, use plain relative import (e.g. "from . import helper")
+    return "." * node.level
 
-    def visit_FunctionDef(self, node: ast.FunctionDef):
-        # Do not call self.generic_visit(node) to prevent visiting inside functions
-        # 関数内部への訪問を防ぐために self.generic_visit(node) を呼び出さない
-        pass
+def _collect_imports(tree: ast.Module) -> Set[str]:
+    """
+    Collects imported module names by walking statement lists only.
+    Expressions are never visited, which is far cheaper than a full NodeVisitor pass.
+    文のリストのみを走査して、インポートされたモジュール名を収集します。
+    式は訪問しないため、NodeVisitor による全ノード走査よりもはるかに低コストです。
+    """
+    imports: Set[str] = set()
+    stack = list(tree.body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.add(alias.name)
+        elif isinstance(node, ast.ImportFrom):
+            module_name = _import_from_name(node)
+            if module_name:
+                imports.add(module_name)
+        elif not isinstance(node, _SKIPPED_NODES):
+            for field in _BODY_FIELDS:
+                children = getattr(node, field, None)
+                if children:
+                    stack.extend(children)
+    return imports
 
-    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
-        # Do not call self.generic_visit(node) to prevent visiting inside async functions
-        # 非同期関数内部への訪問を防ぐために self.generic_visit(node) を呼び出さない
-        pass
+def _sort_key(module_name: str):
+    """
+    Sort key placing relative imports first, then internal absolute imports, then external ones.
+    相対インポート、内部の絶対インポート、外部インポートの順に並べるためのソートキー。
+    """
+    if module_name.startswith('.'):
+        suffix = module_name.lstrip('.')
+        if not suffix:
+            # Plain relative import: key = (0, 0, num_dots, "")
+            return (0, 0, len(module_name), "")
+        # Relative import with module name: key = (0, 1, suffix, 0)
+        return (0, 1, suffix, 0)
+    if module_name.startswith(_PROJECT_NAME):
+        # Internal absolute import: key = (0, 2, module_name, "")
+        return (0, 2, module_name, "")
+    # External absolute import: key = (1, 0, module_name, "")
+    return (1, 0, module_name, "")
 
 class AstParser:
     """
@@ -66,14 +96,14 @@ class AstParser:
     'ast' モジュールを使用して Python ソースコードを解析し、依存関係（インポート）などの情報を抽出します。
     """
 
-    def parse_dependencies(self, content: str, file_path: Path) -> List[DependencyInfo]:
+    def parse_dependencies(self, content: str | bytes, file_path: Path) -> List[DependencyInfo]:
         """
         Parses the given Python code content to extract module dependencies.
         指定された Python コードの内容を解析し、モジュールの依存関係を抽出します。
 
         Args:
-            content: The Python source code as a string.
-                     文字列としての Python ソースコード。
+            content: The Python source code as a string, or raw bytes (encoding declarations are honoured).
+                     文字列としての Python ソースコード、または生のバイト列（エンコーディング宣言が考慮されます）。
             file_path: The path to the file being parsed (used for context, e.g., error messages).
                        解析対象ファイルのパス（コンテキスト、例: エラーメッセージに使用）。
 
@@ -84,40 +114,20 @@ class AstParser:
             解析に失敗した場合やインポートが見つからない場合は空のリストを返します。
 
         Raises:
-            SyntaxError: If the content has syntax errors that prevent parsing.
-                         内容に解析を妨げる構文エラーがある場合。
+            SyntaxError: If the content has syntax errors that prevent parsing. Content without
+                         the word 'import' is not parsed at all, so its syntax errors go unnoticed.
+                         内容に解析を妨げる構文エラーがある場合。'import' という語を含まない内容は
+                         解析されないため、その構文エラーは検出されません。
         """
+        if not _may_contain_imports(content):
+            # No import statement possible: skip building the AST
+            # インポート文があり得ないため、AST の構築を省略します
+            return []
         try:
-            tree = ast.parse(content, filename=str(file_path))
-            visitor = _ImportVisitor(file_path)
-            visitor.visit(tree)
-            
-            # Updated sorting logic considering internal vs external dependencies
-            def sort_key(module_name: str):
-                PROJECT_NAME = "kotemari"
-                if module_name.startswith('.'):
-                    num_dots = 0
-                    for c in module_name:
-                        if c == '.':
-                            num_dots += 1
-                        else:
-                            break
-                    suffix = module_name[num_dots:]
-                    if not suffix:
-                        # Plain relative import: key = (0, 0, num_dots, "")
-                        return (0, 0, num_dots, "")
-                    else:
-                        # Relative import with module name: key = (0, 1, suffix, 0)
-                        return (0, 1, suffix, 0)
-                else:
-                    if module_name.startswith(PROJECT_NAME):
-                        # Internal absolute import: key = (0, 2, module_name, "")
-                        return (0, 2, module_name, "")
-                    else:
-                        # External absolute import: key = (1, 0, module_name, "")
-                        return (1, 0, module_name, "")
-            
-            sorted_imports = sorted(list(visitor.imports), key=sort_key)
+            # Only imports are needed, so skip type comment handling explicitly
+            # 必要なのはインポートのみなので、型コメントの処理は明示的に省略します
+            tree = ast.parse(content, filename=str(file_path), type_comments=False)
+            sorted_imports = sorted(_collect_imports(tree), key=_sort_key)
             dependencies = [DependencyInfo(module_name=name) for name in sorted_imports]
             return dependencies
         except SyntaxError as e:
@@ -30,11 +30,16 @@ class _EventHandler(FileSystemEventHandler):
     def __init__(self,
                  callback: FileSystemEventCallback,
                  ignore_processor: IgnoreRuleProcessor,
-                 project_root: Path):
+                 project_root: Path,
+                 ignore_func: Optional[Callable[[Path], bool]] = None,
+                 ignore_dir_func: Optional[Callable[[Path], bool]] = None):
         self.callback = callback
-        # Get the ignore check function once during initialization
-        # 初期化中に一度だけ無視チェック関数を取得します
-        self.is_path_ignored: Callable[[Path], bool] = ignore_processor.get_ignore_function()
+        # Get the ignore check function once during initialization, unless the owner supplies its own
+        # 所有者が独自の関数を渡さない限り、初期化中に一度だけ無視チェック関数を取得します
+        self.is_path_ignored: Callable[[Path], bool] = ignore_func or ignore_processor.get_ignore_function()
+        # Directory events are matched as directories, so directory-only patterns (e.g. 'build/') apply
+        # ディレクトリのイベントはディレクトリとして照合し、ディレクトリ専用パターン（例: 'build/'）を適用します
+        self.is_dir_ignored: Callable[[Path], bool] = ignore_dir_func or ignore_processor.get_dir_ignore_function()
         self.project_root = project_root
 
     # English comment:
@@ -51,28 +56,31 @@ class _EventHandler(FileSystemEventHandler):
                 return
 
             path_to_check = Path(event.src_path)
+            is_ignored = self.is_dir_ignored if event.is_directory else self.is_path_ignored
 
             # Check if the absolute path should be ignored using the function obtained earlier
             # 以前取得した関数を使用して絶対パスが無視されるべきかチェックします
-            if self.is_path_ignored(path_to_check):
-                logger.debug(f"Ignoring event for ignored path: {path_to_check}")
-                return
+            src_ignored = is_ignored(path_to_check)
 
-            # For move events, also check the destination path
-            # 移動イベントの場合、移動先のパスもチェックします
             dest_path: Optional[Path] = None
             event_type: FileSystemEventType = event.event_type # type: ignore because watchdog types differ slightly
 
             if event.event_type == 'moved':
-                dest_path_abs = Path(event.dest_path)
-                if self.is_path_ignored(dest_path_abs):
-                    logger.debug(f"Ignoring move event due to ignored destination: {dest_path_abs}")
+                # A move is dropped only when both ends are ignored: moving out of an ignored path
+                # creates the destination, and moving into one deletes the source
+                # 移動は両端が無視される場合のみ破棄します。無視パスからの移動は移動先の作成に、
+                # 無視パスへの移動は移動元の削除にあたります
+                dest_path = Path(event.dest_path)
+                if src_ignored and is_ignored(dest_path):
+                    logger.debug("Ignoring move event between ignored paths: %s -> %s", path_to_check, dest_path)
                     return
-                dest_path = dest_path_abs
+            elif src_ignored:
+                logger.debug("Ignoring event for ignored path: %s", path_to_check)
+                return
             elif event.event_type not in {'created', 'modified', 'deleted'}:
                  # Should not happen based on outer if, but good for safety
                  # 外側のifに基づけば発生しないはずですが、安全のため
-                 logger.warning(f"Unhandled event type in dispatch: {event.event_type}")
+                 logger.warning("Unhandled event type in dispatch: %s", event.event_type)
                  return
 
             # Create our domain event object
@@ -83,7 +91,7 @@ class _EventHandler(FileSystemEventHandler):
                 is_directory=event.is_directory,
                 dest_path=dest_path
             )
-            logger.info(f"Detected file system event: {fs_event}")
+            logger.info("Detected file system event: %s", fs_event)
             self.callback(fs_event)
         else:
             # Pass through other event types (like DirModified which we explicitly ignore above)
@@ -99,9 +107,24 @@ class _EventHandler(FileSystemEventHandler):
 # watchdog オブザーバーとイベントハンドラを初期化および管理し、
 # 無視ルールに基づいてイベントをフィルタリングします。
 class FileSystemEventMonitor:
-    def __init__(self, project_root: Path, ignore_processor: IgnoreRuleProcessor):
+    def __init__(self, project_root: Path, ignore_processor: IgnoreRuleProcessor,
+                 ignore_func: Optional[Callable[[Path], bool]] = None,
+                 ignore_dir_func: Optional[Callable[[Path], bool]] = None):
+        """
+        Args:
+            project_root (Path): The directory to watch recursively.
+                                 再帰的に監視するディレクトリ。
+            ignore_processor (IgnoreRuleProcessor): Supplies the ignore checks that are not given.
+                                                    渡されなかった無視チェックを提供します。
+            ignore_func (Optional[Callable[[Path], bool]]): Ignore check for file events, e.g. the owner's cached matcher.
+                                                            ファイルイベント用の無視チェック（所有者のキャッシュ済み判定関数など）。
+            ignore_dir_func (Optional[Callable[[Path], bool]]): Ignore check for directory events.
+                                                                ディレクトリイベント用の無視チェック。
+        """
         self.project_root = project_root
         self.ignore_processor = ignore_processor
+        self._ignore_func = ignore_func
+        self._ignore_dir_func = ignore_dir_func
         self._observer: Optional[Observer] = None
         self._event_handler: Optional[_EventHandler] = None
         self._callback: Optional[FileSystemEventCallback] = None
@@ -118,7 +141,8 @@ class FileSystemEventMonitor:
             return
 
         self._callback = callback if callback else self._default_callback
-        self._event_handler = _EventHandler(self._callback, self.ignore_processor, self.project_root)
+        self._event_handler = _EventHandler(self._callback, self.ignore_processor, self.project_root,
+                                            ignore_func=self._ignore_func, ignore_dir_func=self._ignore_dir_func)
         self._observer = Observer()
         self._observer.schedule(self._event_handler, str(self.project_root), recursive=True)
 
@@ -1,5 +1,6 @@
 from pathlib import Path
-from typing import List, Callable, Union
+from typing import Dict, List, Callable, Union
+import functools
 import pathspec
 import logging
 import os
@@ -10,6 +11,24 @@ from ..utility.path_resolver import PathResolver
 
 logger = logging.getLogger(__name__)
 
+def _combine_specs(specs: List[pathspec.PathSpec]) -> List[pathspec.PathSpec]:
+    """
+    Merges the patterns of several .gitignore specs into one PathSpec, so each check is a single
+    match_file call. A path is ignored if any spec matches it, which equals matching the union of
+    the patterns as long as no spec negates ('!pattern'); otherwise the specs are kept separate so a
+    negation only applies within its own file.
+    複数の .gitignore スペックのパターンを1つの PathSpec にまとめ、各チェックを1回の match_file 呼び出しにします。
+    いずれかのスペックに一致すればパスは無視されますが、これはどのスペックも否定（'!pattern'）を含まない限り
+    パターンの和集合との照合と等しくなります。否定を含む場合は、否定がそのファイル内にのみ適用されるよう
+    スペックを分けたままにします。
+    """
+    if len(specs) < 2:
+        return specs
+    patterns = [pattern for spec in specs for pattern in spec.patterns]
+    if any(pattern.include is False for pattern in patterns):
+        return specs
+    return [pathspec.PathSpec(patterns)]
+
 class IgnoreRuleProcessor:
     """
     Processes ignore rules from .gitignore files and potentially project configuration.
@@ -18,6 +37,10 @@ class IgnoreRuleProcessor:
     パスが無視されるべきかどうかをチェックする関数を提供します。
     """
 
+    # Number of per-path ignore decisions remembered by each matcher.
+    # 各判定関数が記憶するパスごとの無視判定の数。
+    IGNORE_CACHE_SIZE = 65536
+
     def __init__(self, project_root: Path, config: ProjectConfig, path_resolver: PathResolver):
         """
         Initializes the IgnoreRuleProcessor.
@@ -34,9 +57,15 @@ class IgnoreRuleProcessor:
                                           PathResolver のインスタンス。
         """
         self.project_root = path_resolver.resolve_absolute(project_root)
+        # Prefix of every absolute path inside the project, for relative paths by string slicing
+        # プロジェクト内のすべての絶対パスの接頭辞。文字列のスライスで相対パスを得るために使用します
+        self._root_prefix = os.path.join(str(self.project_root), "")
         self.config = config
         self.path_resolver = path_resolver
         self._gitignore_specs: List[pathspec.PathSpec] = self._load_gitignore_specs()
+        # Memoized matchers keyed by 'directory' mode; rebuilt by reload_rules()
+        # 'directory' モードをキーとするメモ化済み判定関数。reload_rules() で再構築されます
+        self._matchers: Dict[bool, Callable[[Union[str, Path]], bool]] = {}
         # TODO: Load ignore rules from self.config as well
         # TODO: self.config からも無視ルールを読み込む
 
@@ -66,77 +95,101 @@ class IgnoreRuleProcessor:
             return []
         return specs
 
-    def get_ignore_function(self) -> Callable[[Union[str, Path]], bool]:
+    def _relative_posix(self, path_str_or_path: Union[str, Path]) -> Union[str, None]:
         """
-        Returns a function that checks if a given path should be ignored based on all rules.
-        すべてのルールに基づいて、指定されたパスを無視すべきかどうかをチェックする関数を返します。
+        Converts a path to a POSIX path relative to the project root for pathspec matching.
+        pathspec マッチング用に、パスをプロジェクトルートからの相対 POSIX パスに変換します。
 
         Returns:
-            Callable[[Union[str, Path]], bool]: A function that takes a path string or Path object and returns True if it should be ignored.
-                                               パス文字列または Path オブジェクトを受け取り、無視すべき場合に True を返す関数。
+            Union[str, None]: The relative POSIX path, or None if the path is outside the project root.
+                              相対 POSIX パス。プロジェクトルート外の場合は None。
         """
-        # Use the pre-compiled specs from __init__
-        # __init__ から事前にコンパイルされたスペックを使用します
-        compiled_specs = self._gitignore_specs
+        # Fast path: a normalized absolute path under the root (as scans and watcher events produce)
+        # needs no resolve() and no Path objects; normpath is pure string work
+        # 高速経路: ルート配下の正規化された絶対パス（スキャンや監視イベントが生成するもの）には
+        # resolve() も Path オブジェクトも不要です。normpath は文字列処理のみです
+        path_str = os.path.normpath(os.fspath(path_str_or_path))
+        if path_str.startswith(self._root_prefix):
+            relative_path_str = path_str[len(self._root_prefix):]
+            return relative_path_str.replace(os.sep, "/") if os.sep != "/" else relative_path_str
+
         project_root_str = str(self.project_root)
+        input_path = Path(path_str_or_path)
+
+        # 1. Ensure the path is absolute
+        # パスが絶対であることを確認します
+        if not input_path.is_absolute():
+            # Attempt to resolve relative to project root, but log a warning
+            # プロジェクトルートからの相対で解決を試みますが、警告をログに記録します
+            logger.warning(
+                f"Received non-absolute path '{input_path}'. "
+                f"Resolving relative to project root '{project_root_str}'. "
+                f"Pass absolute paths for predictable behavior."
+            )
+            absolute_path = (self.project_root / input_path).resolve()
+        else:
+            absolute_path = input_path.resolve() # Normalize even if absolute
+
+        # 2. Check if the path is within the project root
+        # パスがプロジェクトルート内にあるかを確認します
+        try:
+            # This will raise ValueError if path is not under project_root
+            # パスが project_root 配下にない場合、ValueError が発生します
+            relative_path_str = os.path.relpath(absolute_path, project_root_str)
+            # Check if the path is actually outside (e.g., starts with '..')
+            # パスが実際に外にあるかを確認します (例: '..' で始まる)
+            if relative_path_str.startswith('..') or relative_path_str == '.': # Added '.' check for safety
+                 logger.debug(f"Path '{absolute_path}' is outside the project root '{project_root_str}'. Not ignoring.")
+                 return None # Explicitly don't ignore paths outside the root
+        except ValueError:
+            # This exception confirms the path is outside the project root
+            # この例外は、パスがプロジェクトルート外にあることを確認します
+            logger.debug(f"Path '{absolute_path}' is outside the project root '{project_root_str}' (ValueError on relpath). Not ignoring.")
+            return None
+
+        # 3. Use forward slashes for pathspec matching consistency
+        # pathspec マッチングの一貫性のためにスラッシュを使用します
+        return Path(relative_path_str).as_posix()
+
+    def _build_matcher(self, directory: bool) -> Callable[[Union[str, Path]], bool]:
+        """
+        Builds the ignore predicate shared by get_ignore_function and get_dir_ignore_function.
+        get_ignore_function と get_dir_ignore_function で共有される無視判定関数を構築します。
+
+        Args:
+            directory (bool): If True, paths are matched as directories (with a trailing '/'),
+                              so directory-only patterns such as 'build/' apply.
+                              True の場合、パスはディレクトリとして（末尾 '/' 付きで）照合され、
+                              'build/' のようなディレクトリ専用パターンが適用されます。
+        """
+        # Use the pre-compiled specs from __init__, merged where that keeps the same result
+        # __init__ から事前にコンパイルされたスペックを、結果が変わらない範囲でまとめて使用します
+        compiled_specs = _combine_specs(self._gitignore_specs)
 
         if not compiled_specs:
             logger.debug("No ignore specs found or configured.")
             return lambda _: False # No specs means ignore nothing
 
         logger.debug(f"Using {len(compiled_specs)} compiled PathSpec object(s) for ignore checks.")
+        suffix = "/" if directory else ""
 
         # The function returned will perform the check using PathSpec
         # 返される関数は PathSpec を使用してチェックを実行します
         def should_ignore_path(path_str_or_path: Union[str, Path]) -> bool:
             try:
-                input_path = Path(path_str_or_path)
-
-                # 1. Ensure the path is absolute
-                # パスが絶対であることを確認します
-                if not input_path.is_absolute():
-                    # Attempt to resolve relative to project root, but log a warning
-                    # プロジェクトルートからの相対で解決を試みますが、警告をログに記録します
-                    logger.warning(
-                        f"Received non-absolute path '{input_path}'. "
-                        f"Resolving relative to project root '{project_root_str}'. "
-                        f"Pass absolute paths for predictable behavior."
-                    )
-                    absolute_path = (self.project_root / input_path).resolve()
-                else:
-                    absolute_path = input_path.resolve() # Normalize even if absolute
-
-                # 2. Check if the path is within the project root
-                # パスがプロジェクトルート内にあるかを確認します
-                try:
-                    # This will raise ValueError if path is not under project_root
-                    # パスが project_root 配下にない場合、ValueError が発生します
-                    relative_path_str = os.path.relpath(absolute_path, project_root_str)
-                    # Check if the path is actually outside (e.g., starts with '..')
-                    # パスが実際に外にあるかを確認します (例: '..' で始まる)
-                    if relative_path_str.startswith('..') or relative_path_str == '.': # Added '.' check for safety
-                         logger.debug(f"Path '{absolute_path}' is outside the project root '{project_root_str}'. Not ignoring.")
-                         return False # Explicitly don't ignore paths outside the root
-                except ValueError:
-                    # This exception confirms the path is outside the project root
-                    # この例外は、パスがプロジェクトルート外にあることを確認します
-                    logger.debug(f"Path '{absolute_path}' is outside the project root '{project_root_str}' (ValueError on relpath). Not ignoring.")
+                relative_path_posix = self._relative_posix(path_str_or_path)
+                if relative_path_posix is None:
                     return False
-
-                # 3. Path is absolute and inside the project root, proceed with pathspec check
-                # パスは絶対でプロジェクトルート内にあります。pathspec チェックに進みます
-                # Use forward slashes for pathspec matching consistency
-                # pathspec マッチングの一貫性のためにスラッシュを使用します
-                relative_path_posix = Path(relative_path_str).as_posix()
+                relative_path_posix += suffix
 
                 # Check against all loaded PathSpec objects
                 # ロードされたすべての PathSpec オブジェクトに対してチェックします
                 for spec in compiled_specs:
                     if spec.match_file(relative_path_posix):
-                        logger.debug(f"Path '{absolute_path}' (relative: '{relative_path_posix}') matched ignore spec.")
+                        logger.debug("Path '%s' (relative: '%s') matched ignore spec.", path_str_or_path, relative_path_posix)
                         return True # Ignored if any spec matches
 
-                logger.debug(f"Path '{absolute_path}' did not match any ignore specs.")
+                logger.debug("Path '%s' did not match any ignore specs.", path_str_or_path)
                 return False # Not ignored if no specs match
 
             except Exception as e:
@@ -147,7 +200,68 @@ class IgnoreRuleProcessor:
 
         return should_ignore_path
 
-    def should_ignore(self, file_path: Path) -> bool:
+    def get_ignore_function(self) -> Callable[[Union[str, Path]], bool]:
+        """
+        Returns a function that checks if a given path should be ignored based on all rules.
+        すべてのルールに基づいて、指定されたパスを無視すべきかどうかをチェックする関数を返します。
+
+        Returns:
+            Callable[[Union[str, Path]], bool]: A function that takes a path string or Path object and returns True if it should be ignored.
+                                               パス文字列または Path オブジェクトを受け取り、無視すべき場合に True を返す関数。
+        """
+        return self._get_matcher(directory=False)
+
+    def get_dir_ignore_function(self) -> Callable[[Union[str, Path]], bool]:
+        """
+        Returns a function that checks if a directory should be pruned, honouring directory-only
+        patterns (trailing '/'), e.g. 'node_modules/', '.venv/', 'dist/'.
+        ディレクトリを枝刈りすべきかどうかをチェックする関数を返します。
+        ディレクトリ専用パターン（末尾 '/'、例: 'node_modules/', '.venv/', 'dist/'）を考慮します。
+
+        Returns:
+            Callable[[Union[str, Path]], bool]: A function that takes a directory path and returns True if it should be ignored.
+                                               ディレクトリパスを受け取り、無視すべき場合に True を返す関数。
+        """
+        return self._get_matcher(directory=True)
+
+    def _get_matcher(self, directory: bool) -> Callable[[Union[str, Path]], bool]:
+        """
+        Returns the matcher for the given mode, wrapped in an LRU cache so repeated checks
+        of the same path (e.g. a file saved again and again) skip resolution and pattern matching.
+        指定されたモードの判定関数を返します。同じパスの繰り返しチェック（何度も保存されるファイルなど）で
+        パス解決とパターンマッチングを省略できるよう、LRU キャッシュでラップされています。
+        """
+        matcher = self._matchers.get(directory)
+        if matcher is None:
+            matcher = functools.lru_cache(maxsize=self.IGNORE_CACHE_SIZE)(self._build_matcher(directory))
+            self._matchers[directory] = matcher
+        return matcher
+
+    def reload_rules(self) -> None:
+        """
+        Reloads the .gitignore files and drops all cached ignore decisions.
+        .gitignore ファイルを再読み込みし、キャッシュされたすべての無視判定を破棄します。
+        """
+        self._gitignore_specs = self._load_gitignore_specs()
+        self._matchers = {}
+        logger.info(f"Reloaded ignore rules: {len(self._gitignore_specs)} .gitignore spec(s).")
+
+    def is_ignored_dir(self, dir_path: Path) -> bool:
+        """
+        Checks if a directory (and therefore its whole subtree) should be ignored.
+        ディレクトリ（したがってそのサブツリー全体）を無視すべきかどうかをチェックします。
+
+        Args:
+            dir_path (Path): The directory path to check.
+                             チェックするディレクトリのパス。
+
+        Returns:
+            bool: True if the directory should be ignored, False otherwise.
+                  ディレクトリを無視すべき場合は True、そうでない場合は False。
+        """
+        return self.get_dir_ignore_function()(dir_path)
+
+    def should_ignore(self, file_path: Path, is_dir: bool = False) -> bool:
         """
         Checks if a given file path should be ignored.
         指定されたファイルパスを無視すべきかどうかをチェックします。
@@ -155,28 +269,19 @@ class IgnoreRuleProcessor:
         Args:
             file_path (Path): The path to the file to check (can be relative or absolute).
                               チェックするファイルへのパス (相対パスまたは絶対パス)。
+            is_dir (bool, optional): Whether the path is a directory, so directory-only patterns
+                                     (e.g. '__pycache__/') apply to it. Defaults to False.
+                                     パスがディレクトリかどうか。True の場合、ディレクトリ専用パターン
+                                     （例: '__pycache__/'）が適用されます。デフォルトは False。
 
         Returns:
             bool: True if the file should be ignored, False otherwise.
                   ファイルを無視すべき場合は True、そうでない場合は False。
         """
-        # Resolve the path to ensure it's absolute and normalized BEFORE passing
-        # 渡す前にパスが絶対パスで正規化されていることを確認するために解決します
-        # This simplifies the logic inside should_ignore_path
-        # これにより should_ignore_path 内のロジックが簡素化されます
-        # absolute_path = file_path.resolve()
-
-        # Get the ignore function and call it with the original path
-        # (it handles absolute/relative resolution internally now)
-        # 無視関数を取得し、元のパスで呼び出します
-        # (現在は内部で絶対/相対解決を処理します)
-        ignore_func = self.get_ignore_function()
-        is_ignored = ignore_func(file_path)
-
-        # Use resolved path for logging consistency
-        # ロギングの一貫性のために解決されたパスを使用します
-        log_path = file_path.resolve() if not file_path.is_absolute() else file_path
-        logger.debug(f"Ignore check for {log_path}: {'Ignored' if is_ignored else 'Not Ignored'}")
+        # The memoized matcher resolves relative paths itself; nothing is formatted unless DEBUG is on
+        # メモ化された判定関数が相対パスを自身で解決します。DEBUG でない限りメッセージは整形されません
+        is_ignored = self._get_matcher(directory=is_dir)(file_path)
+        logger.debug("Ignore check for %s: %s", file_path, "Ignored" if is_ignored else "Not Ignored")
         return is_ignored
 
 # Example usage (for testing or demonstration)
@@ -1,4 +1,5 @@
-from pathlib import Path
+from functools import lru_cache
+from pathlib import Path, PurePath
 from typing import Dict, Optional
 
 # Simple mapping from file extensions to language names
@@ -48,6 +49,10 @@ class LanguageDetector:
     ファイルの拡張子に基づいてプログラミング言語を検出します。
     """
 
+    # Number of distinct file names whose detected language is memoized.
+    # 検出された言語をメモ化する、異なるファイル名の数。
+    NAME_CACHE_SIZE = 4096
+
     def __init__(self, extension_map: Dict[str, str] = DEFAULT_EXTENSION_TO_LANGUAGE_MAP):
         """
         Initializes the LanguageDetector.
@@ -63,6 +68,9 @@ class LanguageDetector:
         # Convert keys to lowercase for case-insensitive matching
         # 大文字小文字を区別しないマッチングのためにキーを小文字に変換します
         self.extension_map = {k.lower(): v for k, v in extension_map.items()}
+        # Files sharing a name (e.g., __init__.py) resolve with a single dict hit
+        # 同じ名前のファイル（例: __init__.py）は1回の辞書参照で解決されます
+        self._detect_by_name = lru_cache(maxsize=self.NAME_CACHE_SIZE)(self._lookup_name)
 
     def detect_language(self, file_path: Path) -> Optional[str]:
         """
@@ -77,8 +85,14 @@ class LanguageDetector:
             Optional[str]: The detected language name, or None if not recognized.
                            検出された言語名。認識されない場合は None。
         """
-        file_name_lower = file_path.name.lower()
-        file_suffix_lower = file_path.suffix.lower()
+        return self._detect_by_name(file_path.name)
+
+    def _lookup_name(self, file_name: str) -> Optional[str]:
+        """
+        Looks up the language for a file name in the extension map.
+        拡張子マッピングからファイル名に対応する言語を検索します。
+        """
+        file_name_lower = file_name.lower()
 
         # Check full filename first (e.g., Dockerfile)
         # 最初に完全なファイル名を確認します（例: Dockerfile）
@@ -87,8 +101,9 @@ class LanguageDetector:
 
         # Then check extension
         # 次に拡張子を確認します
+        file_suffix_lower = PurePath(file_name_lower).suffix
         if file_suffix_lower in self.extension_map:
             return self.extension_map[file_suffix_lower]
 
         return None # Language not recognized based on extension/name
-                    # 拡張子/名前に基づいて言語が認識されません 
\ No newline at end of file
+                    # 拡張子/名前に基づいて言語が認識されません
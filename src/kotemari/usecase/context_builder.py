@@ -1,7 +1,7 @@
 from pathlib import Path
 from typing import List, Dict, Optional
 import logging
-from ..domain.exceptions import ContextGenerationError, FileNotFoundErrorInAnalysis
+from ..domain.exceptions import ContextGenerationError, FileNotFoundErrorInAnalysis, FileSystemError
 from ..domain.file_content_formatter import FileContentFormatter, BasicFileContentFormatter
 from ..domain.context_data import ContextData
 from ..gateway.file_system_accessor import FileSystemAccessor
@@ -61,10 +61,8 @@ class ContextBuilder:
             フォーマットされたコンテキスト文字列と関連情報を含むContextDataオブジェクト。
 
         Raises:
-            FileNotFoundError: If any of the target files do not exist.
-                               ターゲットファイルのいずれかが存在しない場合。
-            IOError: If there is an error reading any of the files.
-                     ファイルの読み取り中にエラーが発生した場合。
+            ContextGenerationError: If any of the target files is missing or cannot be read.
+                                    ターゲットファイルのいずれかが存在しないか読み取れない場合。
         """
         logger.debug(f"ContextBuilder.build_context called with target_files: {target_files}") # DEBUG LOGGING ADDED
 
@@ -96,16 +94,13 @@ class ContextBuilder:
                 # Corrected call: project_root is not needed here as PathResolver handles it.
                 # 修正後の呼び出し: PathResolver が処理するため、ここでは project_root は不要です。
                 file_contents[file_path] = self.file_accessor.read_file(str(file_path))
-        except FileNotFoundError as e: # Error from file_accessor.read_file
+        except FileSystemError as e: # Error from file_accessor.read_file (missing or unreadable file)
             # This indicates a problem accessing a file that *should* exist based on earlier checks or analysis results.
             # これは、以前のチェックまたは分析結果に基づいて存在する*はず*のファイルへのアクセスに問題があることを示します。
-            logger.error(f"Error reading file, should have existed: {e}")
+            logger.error("Error reading file, should have existed: %s", e)
             # Wrap in ContextGenerationError
             # ContextGenerationError でラップします
             raise ContextGenerationError(f"Error accessing file content: {e}") from e
-        except IOError as e: # Error from file_accessor.read_file
-            logger.error(f"IOError reading file content: {e}")
-            raise ContextGenerationError(f"Error reading file content: {e}") from e
         except Exception as e: # Catch any other unexpected errors during file reading
             logger.exception(f"Unexpected error reading files for context: {e}")
             raise ContextGenerationError(f"Unexpected error during file reading: {e}") from e
@@ -1,10 +1,16 @@
 from pathlib import Path
-from typing import List, Optional
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from multiprocessing.context import BaseContext
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import contextlib
 import logging
+import multiprocessing
+import os
+import threading
 
 from ..domain.file_info import FileInfo
-# DependencyInfo は FileInfo 経由で利用されるため、直接インポートは必須ではない
-# from ..domain.dependency_info import DependencyInfo
+from ..domain.dependency_info import DependencyInfo
 from ..domain.project_config import ProjectConfig
 from ..gateway.file_system_accessor import FileSystemAccessor
 from ..service.ignore_rule_processor import IgnoreRuleProcessor
@@ -13,10 +19,37 @@ from ..service.language_detector import LanguageDetector
 from ..service.ast_parser import AstParser # AstParser をインポート
 from ..utility.path_resolver import PathResolver
 from ..usecase.config_manager import ConfigManager
-from ..domain.exceptions import AnalysisError, ParsingError, FileSystemError # カスタム例外をインポート
+from ..domain.exceptions import AnalysisError, AnalysisCancelledError, ParsingError, FileSystemError # カスタム例外をインポート
 
 logger = logging.getLogger(__name__)
 
+def _batched(iterable: Iterable[FileInfo], size: int) -> Iterator[List[FileInfo]]:
+    """
+    Yields lists of up to `size` items from an iterable.
+    イテラブルから最大 `size` 件ずつのリストを生成します。
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def _parse_dependencies_in_subprocess(item: Tuple[Path, bytes]) -> Optional[List[DependencyInfo]]:
+    """
+    Parses the dependencies of one Python file in a worker process.
+    ワーカープロセスで1つの Python ファイルの依存関係を解析します。
+
+    Returns:
+        Optional[List[DependencyInfo]]: The dependencies, or None if the file has syntax errors.
+                                        依存関係。構文エラーがある場合は None。
+    """
+    file_path, content = item
+    try:
+        return AstParser().parse_dependencies(content, file_path)
+    except SyntaxError:
+        return None
+
 class ProjectAnalyzer:
     """
     Analyzes a software project by scanning its files, applying ignore rules,
@@ -25,6 +58,25 @@ class ProjectAnalyzer:
     ハッシュを計算し、言語を検出し、依存関係を抽出します（Pythonなどのサポートされている言語の場合）。
     """
 
+    # Number of files whose contents are read concurrently before analysis.
+    # 分析前に内容を並行して読み込むファイル数。
+    PRELOAD_BATCH_SIZE = 64
+    # Larger files are not preloaded: they are hashed by streaming from disk, so a batch holds at most
+    # this many bytes per file however large the files of the project are (datasets, model weights).
+    # これより大きなファイルは事前に読み込まず、ディスクからストリーミングしてハッシュを計算します。
+    # これにより、プロジェクトのファイル（データセットやモデルの重みなど）がどれほど大きくても、
+    # バッチが保持するのはファイルあたり最大でこのバイト数です。
+    PRELOAD_MAX_FILE_SIZE = 2 * 1024 * 1024
+    # Worker threads that hash and parse the files of a batch concurrently.
+    # バッチ内のファイルを並行してハッシュ計算・解析するワーカースレッド数。
+    ANALYSIS_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+    # With parse_in_processes, once more files than this have been seen, Python files are parsed in
+    # worker processes, so AST parsing is not serialized by the GIL. Smaller projects never start the pool.
+    # parse_in_processes が有効な場合、これを超える数のファイルを処理した後は、AST 解析が GIL で
+    # 直列化されないよう Python ファイルをワーカープロセスで解析します。小さなプロジェクトではプールを起動しません。
+    PROCESS_POOL_MIN_FILES = 64
+    PROCESS_POOL_CHUNKSIZE = 32
+
     def __init__(self,
                  project_root: Path | str,
                  path_resolver: Optional[PathResolver] = None,
@@ -33,7 +85,9 @@ class ProjectAnalyzer:
                  ignore_processor: Optional[IgnoreRuleProcessor] = None,
                  hash_calculator: Optional[HashCalculator] = None,
                  language_detector: Optional[LanguageDetector] = None,
-                 ast_parser: Optional[AstParser] = None): # ast_parser を追加
+                 ast_parser: Optional[AstParser] = None, # ast_parser を追加
+                 parse_in_processes: bool = False,
+                 mp_context: Optional[BaseContext] = None):
         """
         Initializes the ProjectAnalyzer.
         Dependencies can be injected or created internally if not provided.
@@ -51,6 +105,19 @@ class ProjectAnalyzer:
             language_detector (Optional[LanguageDetector]): LanguageDetector instance.
             ast_parser (Optional[AstParser]): AstParser instance for Python dependency analysis. # 説明を追加
                                                 Python 依存関係分析用の AstParser インスタンス。
+            parse_in_processes (bool): Parse Python files of larger projects in worker processes. Opt-in:
+                                       with the 'spawn' and 'forkserver' start methods the workers re-import
+                                       the calling program's __main__, so its entry point must be guarded by
+                                       `if __name__ == "__main__":`. Defaults to False (threads only).
+                                       大きなプロジェクトの Python ファイルをワーカープロセスで解析します。オプトインです。
+                                       'spawn' と 'forkserver' の起動方式ではワーカーが呼び出し元プログラムの __main__ を
+                                       再インポートするため、そのエントリポイントは `if __name__ == "__main__":` で
+                                       保護されている必要があります。デフォルトは False（スレッドのみ）。
+            mp_context (Optional[BaseContext]): The multiprocessing context of the worker pool.
+                                                Defaults to the 'spawn' context, which never forks the
+                                                threads of the running analysis.
+                                                ワーカープールの multiprocessing コンテキスト。デフォルトは
+                                                実行中の分析のスレッドを fork しない 'spawn' コンテキストです。
         """
         self.path_resolver = path_resolver or PathResolver()
         self.project_root = self.path_resolver.resolve_absolute(project_root)
@@ -63,71 +130,107 @@ class ProjectAnalyzer:
         self.hash_calculator = hash_calculator or HashCalculator()
         self.language_detector = language_detector or LanguageDetector()
         self.ast_parser = ast_parser or AstParser() # ast_parser を初期化
+        self.parse_in_processes = parse_in_processes
+        self._mp_context = mp_context or multiprocessing.get_context("spawn")
+        # One worker pool per analyzer, started on first use and kept until close()
+        # アナライザーごとに1つのワーカープール。初回使用時に起動し、close() まで保持します
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._process_pool_lock = threading.Lock()
 
         logger.info(f"ProjectAnalyzer initialized for: {self.project_root}")
 
-    def analyze(self) -> List[FileInfo]:
+    def analyze(self, cancel_event: Optional[threading.Event] = None,
+                previous_results: Optional[Dict[str, FileInfo]] = None,
+                trust_mtime: bool = True) -> List[FileInfo]:
         """
         Performs the project analysis: scans files, filters ignored files,
         calculates hashes, detects languages, and extracts dependencies for Python files.
         プロジェクト分析を実行します: ファイルをスキャンし、無視されたファイルをフィルタリングし、
         ハッシュを計算し、言語を検出し、Python ファイルの依存関係を抽出します。
 
+        Args:
+            cancel_event (Optional[threading.Event], optional): When set, the analysis stops before the next batch.
+                                                                 設定されると、次のバッチの前に分析を停止します。
+            previous_results (Optional[Dict[str, FileInfo]], optional):
+                Results of an earlier analysis keyed by str(FileInfo.path). A scanned file whose size and
+                mtime_ns match its previous entry reuses that entry instead of being hashed and parsed again;
+                one whose content hash still matches skips language detection and dependency parsing.
+                str(FileInfo.path) をキーとする以前の分析結果。サイズと mtime_ns が以前のエントリと一致する
+                スキャン済みファイルは、再度ハッシュ計算・解析せずにそのエントリを再利用します。
+                内容のハッシュが一致するファイルは、言語検出と依存関係の解析を省略します。
+            trust_mtime (bool, optional): When False, files are re-hashed even if their size and mtime_ns match
+                                          previous_results; a matching hash still skips parsing. Defaults to True.
+                                          False の場合、サイズと mtime_ns が previous_results と一致しても再ハッシュします。
+                                          ハッシュが一致すれば解析は省略されます。デフォルトは True。
+
         Returns:
             List[FileInfo]: A list of FileInfo objects for the analyzed files.
                             分析されたファイルの FileInfo オブジェクトのリスト。
+
+        Raises:
+            AnalysisCancelledError: If cancel_event was set during the analysis.
+                                    分析中に cancel_event が設定された場合。
+            AnalysisError: If the project could not be scanned.
+                           プロジェクトをスキャンできなかった場合。
         """
         logger.info(f"Starting analysis of project: {self.project_root}")
         analyzed_files: List[FileInfo] = []
         ignore_func = self.ignore_processor.get_ignore_function()
+        # Directories are pruned with directory semantics so ignored subtrees are never listed
+        # 無視されたサブツリーが列挙されないよう、ディレクトリはディレクトリの意味論で枝刈りされます
+        ignore_dir_func = self.ignore_processor.get_dir_ignore_function()
 
         try:
-            for file_info in self.fs_accessor.scan_directory(self.project_root, ignore_func=ignore_func):
-                # --- ハッシュ計算 ---
-                try:
-                    file_hash = self.hash_calculator.calculate_file_hash(file_info.path)
-                    file_info.hash = file_hash
-                except Exception as e:
-                    logger.warning(f"Could not calculate hash for {file_info.path}: {e}")
-                    file_info.hash = None # Ensure hash is None on error
-
-                # --- 言語検出 ---
-                try:
-                    language = self.language_detector.detect_language(file_info.path)
-                    file_info.language = language
-                    log_msg = f"Language for {file_info.path.name}: {language}" if language else f"Language not detected for: {file_info.path.name}"
-                    logger.debug(log_msg)
-                except Exception as e:
-                    logger.warning(f"Could not detect language for {file_info.path}: {e}")
-                    file_info.language = None # Ensure language is None on error
-
-
-                # --- 依存関係抽出 (Python) ---
-                if file_info.language == 'Python':
-                    try:
-                        content = self.fs_accessor.read_file(file_info.path)
-                        if content is not None: # Check if file reading was successful
-                             dependencies = self.ast_parser.parse_dependencies(content, file_info.path)
-                             file_info.dependencies = dependencies
-                             logger.debug(f"Found {len(dependencies)} dependencies in {file_info.path.name}")
-                        else:
-                             logger.warning(f"Could not read content of {file_info.path} to parse dependencies.")
-
-                    except SyntaxError:
-                        # AstParser already logs the detailed error
-                        logger.warning(f"Skipping dependency parsing for {file_info.path.name} due to syntax errors.")
-                        # dependencies will remain the default empty list
-                    except Exception as e:
-                        logger.error(f"Unexpected error parsing dependencies for {file_info.path}: {e}", exc_info=True)
-                        # Optionally re-raise as AnalysisError or ParsingError?
-                        # For now, log and continue, keeping dependencies empty.
-                        # オプションで AnalysisError または ParsingError として再発生させますか？
-                        # 今のところ、ログに記録して続行し、依存関係を空のままにします。
-                        pass # Keep dependencies empty
-
-                analyzed_files.append(file_info)
-                logger.debug(f"Processed file: {file_info.path.relative_to(self.project_root)}")
+            scanned_files = self.fs_accessor.scan_directory(self.project_root, ignore_func=ignore_func,
+                                                            ignore_dir_func=ignore_dir_func)
+            if previous_results and trust_mtime:
+                scanned_files = self._skip_unchanged(scanned_files, previous_results, analyzed_files)
+            # Read each batch of files concurrently, then analyze the batch from the preloaded bytes
+            # on a thread pool; hashing releases the GIL, so it overlaps with parsing of other files
+            # 各バッチのファイルを並行して読み込み、事前に読み込んだバイト列からスレッドプールでバッチを分析します。
+            # ハッシュ計算は GIL を解放するため、他のファイルの解析と並行して進みます
+            # A replaced (e.g., mocked) parser cannot be shipped to worker processes
+            # 差し替えられた（例: モックの）パーサーはワーカープロセスに渡せません
+            use_processes = self.parse_in_processes and type(self.ast_parser) is AstParser
+            batches = _batched(scanned_files, self.PRELOAD_BATCH_SIZE)
 
+            def read_next_batch() -> Tuple[Optional[List[FileInfo]], Dict[Path, Optional[bytes]]]:
+                batch = next(batches, None)
+                if batch is None:
+                    return None, {}
+                return batch, self.fs_accessor.read_many_bytes(
+                    [file_info.path for file_info in batch if file_info.size <= self.PRELOAD_MAX_FILE_SIZE])
+
+            with contextlib.ExitStack() as stack:
+                executor = stack.enter_context(ThreadPoolExecutor(max_workers=self.ANALYSIS_MAX_WORKERS))
+                # Scans and reads the next batch while the current one is analyzed, so I/O latency
+                # (e.g. on network mounts) overlaps with hashing and parsing
+                # 現在のバッチを分析している間に次のバッチをスキャン・読み込みし、I/O の待ち時間
+                # （例: ネットワークマウント上）をハッシュ計算や解析と重ねます
+                reader = stack.enter_context(ThreadPoolExecutor(max_workers=1))
+                next_read: Optional[Future] = None
+                while True:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise AnalysisCancelledError(f"Analysis of {self.project_root} was cancelled.")
+                    batch, contents = (next_read or reader.submit(read_next_batch)).result()
+                    if batch is None:
+                        break
+                    next_read = reader.submit(read_next_batch)
+                    defer_parsing = use_processes and len(analyzed_files) + len(batch) > self.PROCESS_POOL_MIN_FILES
+                    deferred = list(executor.map(lambda file_info: self._analyze_file_info(
+                                                     file_info, contents.get(file_info.path),
+                                                     previous_results.get(str(file_info.path)) if previous_results else None,
+                                                     parse_dependencies=not defer_parsing),
+                                                 batch))
+                    pending = [file_info for file_info, is_deferred in zip(batch, deferred) if is_deferred]
+                    if pending:
+                        use_processes = self._parse_in_processes(self._get_process_pool(), pending, contents, executor)
+                    analyzed_files.extend(batch)
+                    logger.debug(f"Processed {len(batch)} files ({len(analyzed_files)} so far).")
+
+        except AnalysisCancelledError:
+            logger.info(f"Analysis of {self.project_root} cancelled after {len(analyzed_files)} files.")
+            raise
         except FileNotFoundError as e:
             # This case should ideally be caught by fs_accessor.scan_directory raising FileSystemError
             # このケースは理想的には fs_accessor.scan_directory が FileSystemError を発生させることで捕捉されるべきです
@@ -149,6 +252,156 @@ class ProjectAnalyzer:
         logger.info(f"Analysis complete. Found {len(analyzed_files)} non-ignored files.")
         return analyzed_files
 
+    @staticmethod
+    def _skip_unchanged(scanned_files: Iterable[FileInfo], previous_results: Dict[str, FileInfo],
+                        reused: List[FileInfo]) -> Iterator[FileInfo]:
+        """
+        Yields the scanned files that need analysis, appending unchanged previous entries to `reused`.
+        分析が必要なスキャン済みファイルを生成し、変更のない以前のエントリは `reused` に追加します。
+        """
+        reused_count = 0
+        for file_info in scanned_files:
+            previous = previous_results.get(str(file_info.path))
+            if (previous is not None and previous.hash is not None
+                    and previous.mtime_ns == file_info.mtime_ns
+                    and previous.size == file_info.size):
+                reused.append(previous)
+                reused_count += 1
+            else:
+                yield file_info
+        logger.info("Reused %d unchanged files from the previous analysis.", reused_count)
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        """
+        Returns the analyzer's worker pool, starting it on first use.
+        アナライザーのワーカープールを返します。初回使用時に起動します。
+        """
+        with self._process_pool_lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=self._mp_context)
+            return self._process_pool
+
+    def close(self) -> None:
+        """
+        Shuts down the worker pool, if one was started. A later analysis starts a new one.
+        ワーカープールが起動されていればシャットダウンします。後の分析では新しいプールが起動されます。
+        """
+        with self._process_pool_lock:
+            process_pool, self._process_pool = self._process_pool, None
+        if process_pool is not None:
+            process_pool.shutdown(wait=True, cancel_futures=True)
+
+    def _parse_in_processes(self, process_pool: Executor, pending: List[FileInfo],
+                            contents: Dict[Path, Optional[bytes]], executor: Executor) -> bool:
+        """
+        Parses the dependencies of preloaded Python files in worker processes.
+        If the pool cannot be used, the files are parsed on the thread pool instead.
+        事前に読み込まれた Python ファイルの依存関係をワーカープロセスで解析します。
+        プールが使用できない場合は、代わりにスレッドプールで解析します。
+
+        Returns:
+            bool: False if the process pool failed and should not be used again.
+                  プロセスプールが失敗し、今後使用すべきでない場合は False。
+        """
+        items = [(file_info.path, contents[file_info.path]) for file_info in pending]
+        try:
+            results = list(process_pool.map(_parse_dependencies_in_subprocess, items,
+                                            chunksize=self.PROCESS_POOL_CHUNKSIZE))
+        except Exception as e:
+            logger.warning("Parsing in worker processes failed (%s); parsing on threads instead.", e)
+            self.close() # A broken pool cannot be reused
+            list(executor.map(lambda file_info: self._parse_file_dependencies(file_info, contents[file_info.path]),
+                              pending))
+            return False
+        for file_info, dependencies in zip(pending, results):
+            if dependencies is None:
+                logger.warning("Skipping dependency parsing for %s due to syntax errors.", file_info.path.name)
+            else:
+                file_info.dependencies = dependencies
+        return True
+
+    def _analyze_file_info(self, file_info: FileInfo, content: Optional[bytes] = None,
+                           previous: Optional[FileInfo] = None, parse_dependencies: bool = True) -> bool:
+        """
+        Fills in hash, language and (for Python) dependencies of a scanned FileInfo.
+        スキャンされた FileInfo のハッシュ、言語、（Python の場合）依存関係を設定します。
+
+        Args:
+            file_info (FileInfo): The FileInfo to complete in place.
+                                  その場で補完する FileInfo。
+            content (Optional[bytes]): The preloaded file content, if available. When None,
+                                       the file is read from disk as needed.
+                                       事前に読み込まれたファイル内容（利用可能な場合）。None の場合は
+                                       必要に応じてディスクから読み込みます。
+            previous (Optional[FileInfo]): An earlier analysis of the same path. When the new content hash
+                                           matches it, its language and dependencies are reused without parsing.
+                                           同じパスの以前の分析結果。新しい内容のハッシュが一致する場合、
+                                           解析せずにその言語と依存関係を再利用します。
+            parse_dependencies (bool): When False, parsing of a Python file with preloaded content is
+                                       left to the caller.
+                                       False の場合、内容が事前に読み込まれた Python ファイルの解析は呼び出し元に任せます。
+
+        Returns:
+            bool: True if dependency parsing was left to the caller.
+                  依存関係の解析が呼び出し元に任された場合は True。
+        """
+        # --- ハッシュ計算 ---
+        try:
+            if content is not None:
+                file_info.hash = self.hash_calculator.calculate_file_hash(file_info.path, data=content)
+            else:
+                file_info.hash = self.hash_calculator.calculate_file_hash(file_info.path)
+        except Exception as e:
+            logger.warning(f"Could not calculate hash for {file_info.path}: {e}")
+            file_info.hash = None # Ensure hash is None on error
+
+        # Touched but unchanged content (e.g., a branch switch): keep the earlier parse
+        # 内容が変わらず更新時刻だけが変わった場合（例: ブランチ切り替え）は以前の解析結果を保持します
+        if previous is not None and file_info.hash is not None and previous.hash == file_info.hash:
+            file_info.language = previous.language
+            file_info.dependencies = previous.dependencies
+            return False
+
+        # --- 言語検出 ---
+        try:
+            language = self.language_detector.detect_language(file_info.path)
+            file_info.language = language
+            log_msg = f"Language for {file_info.path.name}: {language}" if language else f"Language not detected for: {file_info.path.name}"
+            logger.debug(log_msg)
+        except Exception as e:
+            logger.warning(f"Could not detect language for {file_info.path}: {e}")
+            file_info.language = None # Ensure language is None on error
+
+        # --- 依存関係抽出 (Python) ---
+        if file_info.language == 'Python':
+            if not parse_dependencies and content is not None:
+                return True
+            self._parse_file_dependencies(file_info, content)
+        return False
+
+    def _parse_file_dependencies(self, file_info: FileInfo, content: Optional[bytes] = None) -> None:
+        """
+        Parses the dependencies of a Python file in this process.
+        このプロセスで Python ファイルの依存関係を解析します。
+        """
+        try:
+            source = content if content is not None else self.fs_accessor.read_file(file_info.path)
+            if source is not None: # Check if file reading was successful
+                 dependencies = self.ast_parser.parse_dependencies(source, file_info.path)
+                 file_info.dependencies = dependencies
+                 logger.debug(f"Found {len(dependencies)} dependencies in {file_info.path.name}")
+            else:
+                 logger.warning(f"Could not read content of {file_info.path} to parse dependencies.")
+
+        except SyntaxError:
+            # AstParser already logs the detailed error
+            logger.warning(f"Skipping dependency parsing for {file_info.path.name} due to syntax errors.")
+            # dependencies will remain the default empty list
+        except Exception as e:
+            logger.error(f"Unexpected error parsing dependencies for {file_info.path}: {e}", exc_info=True)
+            # For now, log and continue, keeping dependencies empty.
+            # 今のところ、ログに記録して続行し、依存関係を空のままにします。
+
     def analyze_single_file(self, file_path: Path) -> Optional[FileInfo]:
         """
         Analyzes a single file: checks if ignored, gets metadata, calculates hash,
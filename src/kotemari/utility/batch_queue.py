@@ -0,0 +1,180 @@
+from collections import deque
+import threading
+import time
+from typing import Callable, Deque, Dict, Generic, Hashable, Iterable, List, Optional, TypeVar
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class BatchQueue(Generic[T]):
+    """
+    A bounded, thread-safe FIFO queue that hands items over in batches.
+    Producers push one item or a list at a time; the consumer drains everything
+    that is queued with a single lock acquisition.
+    Items sharing a key are coalesced in place, so a burst of updates for the same
+    key occupies a single slot. When the queue is full the oldest slot is dropped
+    and the overflow is reported to the consumer through take_overflow().
+    バッチ単位で要素を受け渡す、上限付きのスレッドセーフな FIFO キュー。
+    プロデューサーは1件またはリスト単位で追加し、コンシューマーは
+    キューにあるすべての要素を1回のロック取得で取り出します。
+    同じキーを持つ要素はその場で統合されるため、同一キーへの連続した更新は1スロットのみを占有します。
+    キューが満杯の場合は最も古いスロットが破棄され、そのことは take_overflow() でコンシューマーに通知されます。
+    """
+
+    def __init__(self,
+                 maxsize: int = 0,
+                 key_func: Optional[Callable[[T], Optional[Hashable]]] = None,
+                 merge_func: Optional[Callable[[T, T], T]] = None):
+        """
+        Initializes an empty BatchQueue.
+        空の BatchQueue を初期化します。
+
+        Args:
+            maxsize (int, optional): Maximum number of pending slots. 0 means unbounded.
+                                     保留中スロットの最大数。0 は無制限。
+            key_func (Optional[Callable[[T], Optional[Hashable]]], optional):
+                Returns the coalescing key of an item, or None for items that must never be
+                coalesced. An un-keyed item also acts as a barrier: later items are not merged
+                into slots queued before it.
+                要素の統合キーを返す関数。統合してはならない要素には None を返します。
+                キーのない要素は境界としても機能し、それ以降の要素はそれより前のスロットに統合されません。
+            merge_func (Optional[Callable[[T, T], T]], optional):
+                Combines a pending item with a newer one for the same key. Defaults to keeping the newer item.
+                同じキーの保留中の要素と新しい要素を結合する関数。デフォルトでは新しい要素を保持します。
+        """
+        self._maxsize = maxsize
+        self._key_func = key_func
+        self._merge_func = merge_func
+        # Each slot is a [key, item] pair so coalescing can update it in place
+        # 各スロットは [key, item] の組で、統合時にその場で更新できます
+        self._slots: Deque[list] = deque()
+        self._slots_by_key: Dict[Hashable, list] = {}
+        self._overflowed = False
+        self._interrupted = False
+        self._not_empty = threading.Condition(threading.Lock())
+
+    def _append(self, item: T) -> None:
+        # Caller must hold the lock.
+        # 呼び出し元はロックを保持している必要があります。
+        key = self._key_func(item) if self._key_func else None
+        if key is not None:
+            slot = self._slots_by_key.get(key)
+            if slot is not None:
+                slot[1] = self._merge_func(slot[1], item) if self._merge_func else item
+                return
+        elif self._key_func:
+            # Barrier: do not merge later items across this one
+            # 境界: 以降の要素をこの要素をまたいで統合しません
+            self._slots_by_key.clear()
+
+        if self._maxsize and len(self._slots) >= self._maxsize:
+            dropped_slot = self._slots.popleft()
+            if self._slots_by_key.get(dropped_slot[0]) is dropped_slot:
+                del self._slots_by_key[dropped_slot[0]]
+            if not self._overflowed:
+                logger.warning(f"BatchQueue is full ({self._maxsize} pending items); dropping the oldest items.")
+            self._overflowed = True
+
+        slot = [key, item]
+        self._slots.append(slot)
+        if key is not None:
+            self._slots_by_key[key] = slot
+
+    def put(self, item: T) -> None:
+        """
+        Appends (or coalesces) a single item and wakes the consumer.
+        1件の要素を追加（または統合）し、コンシューマーを起こします。
+
+        Args:
+            item (T): The item to append.
+                      追加する要素。
+        """
+        with self._not_empty:
+            was_empty = not self._slots
+            self._append(item)
+            # A consumer only blocks while the queue is empty, so later puts need no wakeup
+            # コンシューマーがブロックするのはキューが空の間だけなので、それ以降の put は起床不要です
+            if was_empty:
+                self._not_empty.notify()
+
+    def put_many(self, items: Iterable[T]) -> None:
+        """
+        Appends several items under one lock acquisition and wakes the consumer once.
+        複数の要素を1回のロック取得で追加し、コンシューマーを1回だけ起こします。
+
+        Args:
+            items (Iterable[T]): The items to append.
+                                 追加する要素。
+        """
+        with self._not_empty:
+            was_empty = not self._slots
+            for item in items:
+                self._append(item)
+            if was_empty and self._slots:
+                self._not_empty.notify()
+
+    def drain(self, timeout: Optional[float] = None, settle: float = 0.0) -> List[T]:
+        """
+        Waits until at least one item is available (or the timeout expires) and
+        removes all queued items at once.
+        少なくとも1件の要素が利用可能になるまで（またはタイムアウトまで）待機し、
+        キューにあるすべての要素を一度に取り出します。
+
+        Args:
+            timeout (Optional[float]): Maximum seconds to wait. None waits indefinitely.
+                                       最大待機秒数。None の場合は無期限に待機します。
+            settle (float, optional): Debounce window in seconds. Once the first item arrives, the
+                                      queue keeps collecting (and coalescing) for this long before handing
+                                      the batch over, so a burst costs the consumer a single wakeup.
+                                      デバウンス時間（秒）。最初の要素が届いた後、この時間だけ収集（および統合）を
+                                      続けてからバッチを渡すため、連続したイベントでもコンシューマーの起床は1回で済みます。
+
+        Returns:
+            List[T]: The drained items in FIFO order; empty if the timeout expired.
+                     FIFO 順に取り出された要素。タイムアウトした場合は空。
+        """
+        with self._not_empty:
+            if not self._slots and not self._interrupted:
+                self._not_empty.wait_for(lambda: self._slots or self._interrupted, timeout=timeout)
+            if settle > 0 and self._slots and not self._interrupted:
+                # Only interrupt() cuts the settle window short; puts just keep accumulating
+                # settle 時間を短縮するのは interrupt() のみで、put は蓄積を続けるだけです
+                deadline = time.monotonic() + settle
+                remaining = settle
+                while remaining > 0 and not self._interrupted:
+                    self._not_empty.wait(remaining)
+                    remaining = deadline - time.monotonic()
+            self._interrupted = False
+            batch = [item for _, item in self._slots]
+            self._slots.clear()
+            self._slots_by_key.clear()
+        return batch
+
+    def interrupt(self) -> None:
+        """
+        Makes the current (or next) drain return immediately with whatever is queued,
+        skipping any remaining wait and settle time. The interrupt is consumed by that drain.
+        現在（または次）の drain を、残りの待機時間と settle 時間を省略してキュー内の要素とともに即座に返させます。
+        この割り込みはその drain で消費されます。
+        """
+        with self._not_empty:
+            self._interrupted = True
+            self._not_empty.notify_all()
+
+    def take_overflow(self) -> bool:
+        """
+        Reports whether items were dropped since the last call, and resets the flag.
+        前回の呼び出し以降に要素が破棄されたかどうかを報告し、フラグをリセットします。
+
+        Returns:
+            bool: True if the queue overflowed and items were lost.
+                  キューがあふれて要素が失われた場合は True。
+        """
+        with self._not_empty:
+            overflowed, self._overflowed = self._overflowed, False
+        return overflowed
+
+    def __len__(self) -> int:
+        return len(self._slots)
@@ -0,0 +1,66 @@
+from collections import Counter
+import logging
+import threading
+import time
+from typing import Tuple
+
+
+class ErrorLogSampler:
+    """
+    Logs repeated exceptions without formatting a traceback every time.
+    The first occurrences of each distinct error (same type and message) are logged with
+    their traceback; later repeats are logged as one line with a repeat count.
+    Counts are reset periodically so a recurring problem shows a traceback again.
+    繰り返し発生する例外を、毎回トレースバックを整形せずにログに記録します。
+    同じ種類・メッセージのエラーは最初の数回のみトレースバック付きで記録し、
+    それ以降は繰り返し回数付きの1行で記録します。
+    カウントは定期的にリセットされるため、再発した問題では再びトレースバックが表示されます。
+    """
+
+    def __init__(self, max_tracebacks: int = 3, reset_interval: float = 60.0):
+        """
+        Initializes the ErrorLogSampler.
+        ErrorLogSampler を初期化します。
+
+        Args:
+            max_tracebacks (int, optional): Occurrences per distinct error logged with a traceback.
+                                            トレースバック付きで記録する、エラーごとの回数。
+            reset_interval (float, optional): Seconds after which the counts are reset.
+                                              カウントをリセットするまでの秒数。
+        """
+        self._max_tracebacks = max_tracebacks
+        self._reset_interval = reset_interval
+        self._counts: Counter[Tuple[str, str]] = Counter()
+        self._window_start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def log(self, logger: logging.Logger, error: BaseException, msg: str, *args: object) -> None:
+        """
+        Logs an error at ERROR level, attaching the traceback only while the error is not yet frequent.
+        The exception itself is appended to the message, so msg should not include it.
+        エラーを ERROR レベルで記録します。頻発していない間のみトレースバックを添付します。
+        例外自体はメッセージの末尾に付加されるため、msg に含める必要はありません。
+
+        Args:
+            logger (logging.Logger): The logger to write to.
+                                     書き込み先のロガー。
+            error (BaseException): The caught exception.
+                                   捕捉された例外。
+            msg (str): A %-style description of what failed.
+                       何が失敗したかを表す %-style の説明。
+            *args (object): Arguments for msg, formatted lazily by the logger.
+                            msg の引数。ロガーによって遅延フォーマットされます。
+        """
+        key = (type(error).__name__, str(error))
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= self._reset_interval:
+                self._counts.clear()
+                self._window_start = now
+            self._counts[key] += 1
+            count = self._counts[key]
+
+        if count <= self._max_tracebacks:
+            logger.error(msg + ": %s", *args, error, exc_info=error)
+        else:
+            logger.error(msg + ": repeat (%d) %s: %s", *args, count, key[0], error)
@@ -0,0 +1,11 @@
+import pytest
+
+@pytest.fixture(autouse=True)
+def isolated_cache_home(tmp_path_factory, monkeypatch):
+    """
+    Points XDG_CACHE_HOME at a per-test directory outside the test's tmp_path, so persisted
+    analysis indexes never land in the developer's ~/.cache nor inside a scanned test project.
+    XDG_CACHE_HOME をテストの tmp_path の外にあるテストごとのディレクトリに向け、永続化された
+    分析インデックスが開発者の ~/.cache やスキャン対象のテストプロジェクト内に作成されないようにします。
+    """
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path_factory.mktemp("xdg_cache")))
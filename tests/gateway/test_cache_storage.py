@@ -0,0 +1,112 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from kotemari.utility.path_resolver import PathResolver
+from kotemari.gateway.file_system_accessor import FileSystemAccessor
+from kotemari.gateway.cache_storage import CacheStorage, _decode_payload, _encode_payload
+from kotemari.domain.file_info import FileInfo
+from kotemari.domain.dependency_info import DependencyInfo, DependencyType
+
+@pytest.fixture
+def storage(tmp_path: Path) -> CacheStorage:
+    project_root = tmp_path / "project"
+    project_root.mkdir()
+    return CacheStorage(project_root, FileSystemAccessor(PathResolver()), cache_dir=tmp_path / "cache")
+
+def _file_info(path: Path, mtime_ns: int) -> FileInfo:
+    return FileInfo(path=path, mtime_ns=mtime_ns, size=1, hash="abc")
+
+def test_index_round_trip_drops_entries_not_older_than_the_index(storage: CacheStorage):
+    """
+    Tests that a saved index is loaded back, except entries whose mtime is not older than the index file.
+    保存したインデックスが読み込まれ、インデックスファイルより古くない mtime のエントリは除外されることをテストします。
+    """
+    old = _file_info(storage.project_root / "old.py", 1_000_000_000)
+    racy = _file_info(storage.project_root / "racy.py", 1_000_000_000)
+    assert storage.save_analysis_index({str(old.path): old, str(racy.path): racy})
+
+    index_mtime_ns = storage.index_path.stat().st_mtime_ns
+    racy_payload = _decode_payload(storage.index_path.read_bytes())
+    next(entry for entry in racy_payload["files"] if entry["path"] == str(racy.path))["mtime_ns"] = index_mtime_ns
+    storage.index_path.write_bytes(_encode_payload(racy_payload))
+    os.utime(storage.index_path, ns=(index_mtime_ns, index_mtime_ns))
+
+    loaded = storage.load_analysis_index()
+    assert list(loaded) == [str(old.path)]
+    assert loaded[str(old.path)].hash == "abc"
+
+def test_index_round_trip_keeps_all_fields(storage: CacheStorage):
+    """
+    Tests that every FileInfo field, including dependencies, survives a save and load.
+    依存関係を含むすべての FileInfo フィールドが保存と読み込みを経ても保持されることをテストします。
+    """
+    file_info = _file_info(storage.project_root / "app.py", 1_000_000_000)
+    file_info.language = "Python"
+    file_info.dependencies = [
+        DependencyInfo("os"),
+        DependencyInfo("util", dependency_type=DependencyType.INTERNAL_RELATIVE, level=1,
+                       resolved_path=storage.project_root / "util.py"),
+    ]
+    assert storage.save_analysis_index({str(file_info.path): file_info})
+    assert not storage.index_path.read_bytes().startswith(b"\x80") # Not a pickle
+
+    assert storage.load_analysis_index() == {str(file_info.path): file_info}
+
+def test_corrupt_index_loads_as_none(storage: CacheStorage):
+    storage.index_path.parent.mkdir(parents=True)
+    storage.index_path.write_bytes(b"{not json")
+    assert storage.load_analysis_index() is None
+
+def test_index_of_another_version_is_ignored(storage: CacheStorage):
+    """
+    Tests that an index written with another format version is not used.
+    別のフォーマットバージョンで書き込まれたインデックスは使用されないことをテストします。
+    """
+    storage.index_path.parent.mkdir(parents=True)
+    storage.index_path.write_bytes(_encode_payload({"version": -1, "project_root": str(storage.project_root),
+                                                    "files": []}))
+    assert storage.load_analysis_index() is None
+
+def test_index_hashed_with_another_algorithm_is_ignored(storage: CacheStorage):
+    """
+    Tests that an index whose hashes were computed with another algorithm is not used.
+    別のアルゴリズムでハッシュが計算されたインデックスは使用されないことをテストします。
+    """
+    storage.index_path.parent.mkdir(parents=True)
+    storage.index_path.write_bytes(_encode_payload({"version": storage.CACHE_FORMAT_VERSION,
+                                                    "project_root": str(storage.project_root),
+                                                    "hash_algorithm": "md5", "files": []}))
+    assert storage.load_analysis_index() is None
+
+def test_missing_index_loads_as_none(storage: CacheStorage):
+    assert storage.load_analysis_index() is None
+
+def test_clear_analysis_index(storage: CacheStorage):
+    """
+    Tests that clearing removes the index file and tolerates a missing one.
+    クリアでインデックスファイルが削除され、存在しない場合も問題ないことをテストします。
+    """
+    assert storage.save_analysis_index({})
+    storage.clear_analysis_index()
+    assert not storage.index_path.exists()
+    storage.clear_analysis_index()
+    assert storage.load_analysis_index() is None
+
+def test_saving_evicts_the_oldest_indexes_beyond_the_limit(storage: CacheStorage, tmp_path: Path):
+    """
+    Tests that the cache directory keeps at most MAX_INDEX_FILES indexes, deleting the oldest.
+    キャッシュディレクトリが最大 MAX_INDEX_FILES 個のインデックスを保持し、古いものから削除することをテストします。
+    """
+    storage.MAX_INDEX_FILES = 2
+    cache_dir = storage.index_path.parent
+    cache_dir.mkdir(parents=True)
+    for age, name in enumerate(["newer", "older"], start=1):
+        stale = cache_dir / f"{name}{CacheStorage.INDEX_SUFFIX}"
+        stale.write_bytes(b"{}")
+        os.utime(stale, ns=(1_000_000_000 // age, 1_000_000_000 // age))
+
+    assert storage.save_analysis_index({})
+
+    assert sorted(p.name for p in cache_dir.iterdir()) == sorted([storage.index_path.name, "newer.idx"])
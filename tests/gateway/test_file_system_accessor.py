@@ -7,6 +7,7 @@ import pickle
 import io
 import logging
 import sys # Import sys for debug print
+import time
 
 from kotemari.utility.path_resolver import PathResolver
 from kotemari.gateway.file_system_accessor import FileSystemAccessor
@@ -76,12 +77,12 @@ def test_read_file_io_error(setup_test_directory: Path, accessor: FileSystemAcce
 
 # --- Tests for read_file (Error Handling) ---
 
-@patch("builtins.open", new_callable=mock_open)
-def test_read_file_unexpected_error(mock_file, setup_test_directory: Path, accessor: FileSystemAccessor, caplog):
+@patch("pathlib.Path.read_bytes")
+def test_read_file_unexpected_error(mock_read_bytes, setup_test_directory: Path, accessor: FileSystemAccessor, caplog):
     """Tests that FileSystemError is raised for unexpected errors during read."""
     file_path = setup_test_directory / "src" / "main.py"
     # Simulate an unexpected error (e.g., a custom exception or maybe MemoryError)
-    mock_file.side_effect = RuntimeError("Something really unexpected happened")
+    mock_read_bytes.side_effect = RuntimeError("Something really unexpected happened")
 
     with pytest.raises(FileSystemError, match="Unexpected error reading file"):
         accessor.read_file(file_path)
@@ -89,6 +90,16 @@ def test_read_file_unexpected_error(mock_file, setup_test_directory: Path, acces
     assert f"Unexpected error reading file {file_path.resolve()}" in caplog.text
     assert "RuntimeError: Something really unexpected happened" in caplog.text # Check original error
 
+def test_read_file_translates_newlines_and_rejects_invalid_utf8(setup_test_directory: Path, accessor: FileSystemAccessor):
+    """Tests that CRLF/CR newlines are read as in text mode and that undecodable content raises FileSystemError."""
+    file_path = setup_test_directory / "crlf.txt"
+    file_path.write_bytes(b"a\r\nb\rc\n")
+    assert accessor.read_file(file_path) == "a\nb\nc\n"
+
+    file_path.write_bytes(b"\xff\xfe")
+    with pytest.raises(FileSystemError, match="Error decoding file"):
+        accessor.read_file(file_path)
+
 # --- Tests for scan_directory --- #
 
 def test_scan_directory_no_ignore(setup_test_directory: Path, accessor: FileSystemAccessor):
@@ -169,6 +180,64 @@ def test_scan_directory_ignore_subdirectory(setup_test_directory: Path, accessor
     }
     assert found_paths == expected_paths
 
+def test_scan_directory_prunes_with_dir_ignore_func(setup_test_directory: Path, accessor: FileSystemAccessor):
+    """
+    Tests that ignore_dir_func prunes directories before descending into them.
+    ignore_dir_func がディレクトリへの降下前に枝刈りすることをテストします。
+    """
+    visited_dirs = []
+
+    def ignore_dir(path: Path) -> bool:
+        visited_dirs.append(path.relative_to(setup_test_directory).as_posix())
+        return path.name in (".git", ".hidden_dir", "tests")
+
+    found_files = list(accessor.scan_directory(setup_test_directory, ignore_dir_func=ignore_dir))
+    found_paths = {f.path.relative_to(setup_test_directory).as_posix() for f in found_files}
+
+    assert found_paths == {"src/main.py", "src/utils.py", "docs/readme.md", "ignored_file.tmp"}
+    # Only top-level directories are checked; pruned ones are never entered
+    # トップレベルのディレクトリのみチェックされ、枝刈りされたものには入りません
+    assert sorted(visited_dirs) == [".git", ".hidden_dir", "docs", "src", "tests"]
+
+def test_scan_directory_in_parallel_keeps_directory_order(setup_test_directory: Path, accessor: FileSystemAccessor):
+    """
+    Tests that walking top-level subdirectories on threads yields the same files in the same order as a sequential walk.
+    最上位サブディレクトリをスレッドで走査しても、逐次走査と同じファイルが同じ順序で yield されることをテストします。
+    """
+    sequential = [f.path for f in accessor.scan_directory(setup_test_directory, max_workers=1)]
+    parallel = [f.path for f in accessor.scan_directory(setup_test_directory, max_workers=4)]
+    assert len({p.parent for p in sequential}) > 2 # Several subdirectories are actually walked
+    assert parallel == sequential
+
+def test_scan_directory_stops_walkers_when_consumer_stops(tmp_path: Path, accessor: FileSystemAccessor, monkeypatch):
+    """
+    Tests that subtree walkers stream through bounded queues and stop once the consumer stops iterating.
+    サブツリーの走査スレッドが上限付きキューで逐次渡し、利用側が反復を止めると停止することをテストします。
+    """
+    for top in ("a", "b", "c"):
+        level = tmp_path / top
+        for depth in range(30):
+            level = level / f"d{depth}"
+            level.mkdir(parents=True)
+            (level / "file.txt").write_text("x")
+    monkeypatch.setattr(FileSystemAccessor, "SCAN_QUEUE_SIZE", 1)
+    monkeypatch.setattr(FileSystemAccessor, "SCAN_QUEUE_POLL_INTERVAL", 0.01)
+    visited_dirs = []
+    def record_dir(path: Path) -> bool:
+        visited_dirs.append(path)
+        return False
+
+    scan = accessor.scan_directory(tmp_path, ignore_dir_func=record_dir, max_workers=4)
+    first = next(scan)
+    assert first.path.name == "file.txt"
+    scan.close()
+    time.sleep(0.3) # Give the walkers time to notice the stop flag
+
+    visited_after_stop = len(visited_dirs)
+    time.sleep(0.1)
+    assert len(visited_dirs) == visited_after_stop
+    assert visited_after_stop < 3 * 30
+
 def test_scan_non_existent_directory(accessor: FileSystemAccessor):
     """
     Tests scanning a non-existent directory.
@@ -181,56 +250,43 @@ def test_scan_non_existent_directory(accessor: FileSystemAccessor):
 
 # --- Tests for scan_directory (Error Handling) ---
 
-@patch("os.stat") # Patch os.stat instead of Path.stat
-def test_scan_directory_stat_error(mock_os_stat, setup_test_directory: Path, accessor: FileSystemAccessor, caplog):
+def test_scan_directory_stat_error(setup_test_directory: Path, accessor: FileSystemAccessor, caplog):
     """Tests that files causing OSError during stat are skipped and logged."""
     file_to_error = setup_test_directory / "src" / "main.py"
     file_ok = setup_test_directory / "src" / "utils.py"
     another_ok_file = setup_test_directory / "docs" / "readme.md"
 
-    # Keep track of original os.stat if needed for non-mocked calls (though not strictly necessary here)
-    # original_os_stat = os.stat
-
-    def stat_side_effect(path, *args, **kwargs):
-        # path argument will be a string here
-        print(f"DEBUG: stat_side_effect called with path: {repr(path)} (type: {type(path)})", file=sys.stderr) # Debug log
-        # Ensure comparison is string vs string
-        if str(path) == str(file_to_error):
-            print(f"DEBUG: Raising OSError for {path}", file=sys.stderr)
-            raise OSError("Permission denied on stat")
-        else:
-            mock_stat_result = MagicMock()
-            # Avoid Path(path).is_file() to prevent recursion
-            # Determine if it's a file based on known test paths
-            known_files = {str(file_ok), str(another_ok_file)}
-            # Use str(path) for comparison here as well
-            if str(path) in known_files:
-                 # It's a known file
-                 mock_stat_result.st_mode = 0o100644 # Regular file mode
-                 mock_stat_result.st_size = 100
-            else:
-                 # Assume it's a directory otherwise (e.g., project_root, src, docs)
-                 # This simplification works for this specific test setup
-                 mock_stat_result.st_mode = 0o40755 # Directory mode
-                 mock_stat_result.st_size = 4096
-
-            mock_stat_result.st_mtime = datetime.datetime(2023, 1, 1, 12, 0, 0, tzinfo=datetime.timezone.utc).timestamp()
-            print(f"DEBUG: Returning mock os.stat for {path} (mode: {oct(mock_stat_result.st_mode)})", file=sys.stderr)
-            return mock_stat_result
-
-    mock_os_stat.side_effect = stat_side_effect
+    # The scan stats through DirEntry.stat(), so wrap the entries returned by os.scandir
+    # スキャンは DirEntry.stat() で stat するため、os.scandir が返すエントリをラップします
+    class FailingStatEntry:
+        def __init__(self, entry):
+            self._entry = entry
 
-    with caplog.at_level(logging.WARNING):
-        try:
-            print("DEBUG: Starting scan_directory", file=sys.stderr)
+        def __getattr__(self, name):
+            return getattr(self._entry, name)
+
+        def stat(self, *args, **kwargs):
+            if self._entry.path == str(file_to_error):
+                raise OSError("Permission denied on stat")
+            return self._entry.stat(*args, **kwargs)
+
+    original_scandir = os.scandir
+
+    class WrappedScandir:
+        def __init__(self, path):
+            self._it = original_scandir(path)
+
+        def __enter__(self):
+            return (FailingStatEntry(entry) for entry in self._it)
+
+        def __exit__(self, *exc_info):
+            self._it.close()
+
+    with patch("kotemari.gateway.file_system_accessor.os.scandir", WrappedScandir):
+        with caplog.at_level(logging.WARNING):
             found_files = list(accessor.scan_directory(setup_test_directory))
-            print(f"DEBUG: scan_directory finished. Found: {[f.path for f in found_files]}", file=sys.stderr)
-        except Exception as e:
-            print(f"DEBUG: Error during scan_directory: {e}", file=sys.stderr)
-            raise
 
     found_paths = {f.path for f in found_files}
-    print(f"DEBUG: Found paths set: {found_paths}", file=sys.stderr)
 
     assert file_to_error not in found_paths, f"{file_to_error} should not be in found_paths"
     assert file_ok in found_paths, f"{file_ok} should be in found_paths"
@@ -238,6 +294,40 @@ def test_scan_directory_stat_error(mock_os_stat, setup_test_directory: Path, acc
     assert f"Could not access file info for {file_to_error}" in caplog.text, "Warning log for stat error not found"
     assert "Permission denied on stat" in caplog.text, "Original error message not in log"
 
+# --- Tests for get_file_info ---
+
+def test_get_file_info_success(setup_test_directory: Path, accessor: FileSystemAccessor):
+    """Tests that get_file_info returns size and raw mtime for an existing file."""
+    file_path = setup_test_directory / "src" / "main.py"
+    file_info = accessor.get_file_info(file_path)
+    assert file_info is not None
+    assert file_info.path == file_path
+    assert file_info.size == file_path.stat().st_size
+    assert file_info.mtime_ns == file_path.stat().st_mtime_ns
+
+def test_get_file_info_missing_or_directory(setup_test_directory: Path, accessor: FileSystemAccessor):
+    """Tests that get_file_info returns None for missing paths and directories."""
+    assert accessor.get_file_info(setup_test_directory / "missing.py") is None
+    assert accessor.get_file_info(setup_test_directory / "src") is None
+
+# --- Tests for read_many_bytes ---
+
+def test_read_many_bytes(setup_test_directory: Path, accessor: FileSystemAccessor, caplog):
+    """Tests that read_many_bytes returns contents per path and None for unreadable files."""
+    main_py = setup_test_directory / "src" / "main.py"
+    readme = setup_test_directory / "docs" / "readme.md"
+    missing = setup_test_directory / "missing.txt"
+
+    with caplog.at_level(logging.WARNING):
+        contents = accessor.read_many_bytes([main_py, readme, missing])
+
+    assert contents == {
+        main_py: b"print('hello')",
+        readme: b"# Project",
+        missing: None,
+    }
+    assert f"Could not preload {missing}" in caplog.text
+
 # --- Tests for exists ---
 
 def test_exists_true(setup_test_directory: Path, accessor: FileSystemAccessor):
@@ -250,6 +340,26 @@ def test_exists_false(setup_test_directory: Path, accessor: FileSystemAccessor):
     assert accessor.exists(setup_test_directory / "non_existent.file") is False
     assert accessor.exists(setup_test_directory / "non_existent_dir" / "file") is False
 
+# --- Tests for write_bytes ---
+
+def test_write_bytes_replaces_file_atomically(setup_test_directory: Path, accessor: FileSystemAccessor):
+    """Tests that write_bytes creates missing directories, replaces the target and leaves no temporary file."""
+    target = setup_test_directory / "out" / "data.bin"
+    accessor.write_bytes(b"first", target)
+    accessor.write_bytes(b"second", target)
+    assert target.read_bytes() == b"second"
+    assert [p.name for p in target.parent.iterdir()] == ["data.bin"]
+
+def test_write_bytes_removes_temporary_file_on_failure(setup_test_directory: Path, accessor: FileSystemAccessor):
+    """Tests that a failed replace raises FileSystemError, keeps the old content and leaves no temporary file."""
+    target = setup_test_directory / "out" / "data.bin"
+    accessor.write_bytes(b"first", target)
+    with patch("os.replace", side_effect=OSError("disk full")):
+        with pytest.raises(FileSystemError):
+            accessor.write_bytes(b"second", target)
+    assert target.read_bytes() == b"first"
+    assert [p.name for p in target.parent.iterdir()] == ["data.bin"]
+
 # --- Tests for write_pickle ---
 
 def test_write_pickle_success(setup_test_directory: Path, accessor: FileSystemAccessor):
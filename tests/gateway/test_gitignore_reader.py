@@ -3,6 +3,7 @@ from pathlib import Path
 import pathspec
 from unittest.mock import patch, mock_open, MagicMock
 import io
+import os
 
 from kotemari.gateway.gitignore_reader import GitignoreReader
 
@@ -243,18 +244,11 @@ def test_read_gitignore_patterns_encoding_error(mock_path_open, mock_is_file, tm
 
 # --- Tests for read (Error Handling) ---
 
-@patch("pathlib.Path.is_file", return_value=True)
-@patch("pathlib.Path.open") # Patch Path.open
 @patch("pathspec.PathSpec.from_lines")
-def test_read_exception_handling(mock_from_lines, mock_path_open, mock_is_file, tmp_path, caplog):
+def test_read_exception_handling(mock_from_lines, tmp_path, caplog):
     """Tests generic exception handling during read (e.g., pathspec error)."""
     gitignore_path = tmp_path / "compile_error.gitignore"
-
-    # Mock Path.open to return a handle that simulates successful readlines
-    mock_file_handle = MagicMock()
-    mock_file_handle.__enter__.return_value = mock_file_handle
-    mock_file_handle.readlines.return_value = ["*.py\n", "# comment\n", " "]
-    mock_path_open.return_value = mock_file_handle
+    gitignore_path.write_bytes(b"*.py\n# comment\n \n")
 
     # Simulate an error during pathspec compilation
     mock_from_lines.side_effect = ValueError("Invalid pattern")
@@ -264,7 +258,20 @@ def test_read_exception_handling(mock_from_lines, mock_path_open, mock_is_file,
     assert f"Error reading or parsing .gitignore file at {gitignore_path}" in caplog.text
     # Check that the original ValueError is mentioned in the log (due to exc_info=True)
     assert "ValueError: Invalid pattern" in caplog.text
-    mock_is_file.assert_called_once()
-    mock_path_open.assert_called_once_with('r', encoding='utf-8')
-    mock_file_handle.readlines.assert_called_once()
-    mock_from_lines.assert_called_once_with('gitwildmatch', ["*.py"]) # Ensure only valid patterns are passed 
\ No newline at end of file
+    mock_from_lines.assert_called_once_with('gitwildmatch', ["*.py"]) # Ensure only valid patterns are passed
+
+def test_read_rereads_a_changed_file(tmp_path: Path):
+    """Tests that every read reflects the current content, even if the mtime and size are unchanged."""
+    # mtime とサイズが同じでも、毎回の読み込みが現在の内容を反映することをテストします。
+    gitignore_path = tmp_path / ".gitignore"
+    gitignore_path.write_text("*.log\n", encoding="utf-8")
+    mtime_ns = gitignore_path.stat().st_mtime_ns
+    assert GitignoreReader.read(gitignore_path).match_file("a.log")
+
+    # Same size, same mtime (a second edit within one timestamp tick)
+    # 同じサイズ・同じ mtime（1つのタイムスタンプの刻み内での2回目の編集）
+    gitignore_path.write_text("*.tmp\n", encoding="utf-8")
+    os.utime(gitignore_path, ns=(mtime_ns, mtime_ns))
+    spec = GitignoreReader.read(gitignore_path)
+    assert spec.match_file("a.tmp")
+    assert not spec.match_file("a.log") 
\ No newline at end of file
@@ -3,6 +3,7 @@ import sys
 import pytest
 from pathlib import Path
 import shutil
+import logging
 import os
 from kotemari.gateway.cli_parser import app # Assuming app is defined here
 # from click.testing import CliRunner # Use Typer's runner instead
@@ -266,4 +267,67 @@ def test_watch_command(setup_test_project: Path):
             process.terminate()
             process.wait(timeout=5)
 
-    pytest.fail("Watch command testing needs a more robust approach.")
\ No newline at end of file
+    pytest.fail("Watch command testing needs a more robust approach.")
+
+def test_main_registers_only_the_requested_command(setup_test_project: Path, monkeypatch):
+    """
+    Tests that main() finds the subcommand after the global options and runs an app holding only that command.
+    main() がグローバルオプションの後のサブコマンドを見つけ、そのコマンドのみを持つアプリを実行することをテストします。
+    """
+    from kotemari.gateway import cli_parser
+
+    assert cli_parser._requested_command(["-p", "list", "-v", "tree"]) == "tree"
+    assert cli_parser._requested_command(["--config", "c.yml", "--no-use-cache"]) is None
+
+    single_app = cli_parser._single_command_app("list")
+    result = runner.invoke(single_app, ["--project-root", str(setup_test_project), "list"])
+    assert result.exit_code == 0
+    assert "main.py" in result.stdout
+    result = runner.invoke(single_app, ["--project-root", str(setup_test_project), "tree"])
+    assert result.exit_code != 0
+
+    monkeypatch.setattr(sys, "argv", ["kotemari", "--project-root", str(setup_test_project), "list"])
+    with pytest.raises(SystemExit) as exc_info:
+        cli_parser.main()
+    assert exc_info.value.code == 0
+
+def test_commands_in_one_process_reuse_the_controller(setup_test_project: Path):
+    """
+    Tests that consecutive commands with the same options share one controller (and its Kotemari instance).
+    同じオプションの連続したコマンドが1つのコントローラー（とその Kotemari インスタンス）を共有することをテストします。
+    """
+    from kotemari.gateway import cli_parser
+
+    cli_parser._get_controller.cache_clear()
+    assert runner.invoke(app, ["--project-root", str(setup_test_project), "analyze"]).exit_code == 0
+    controller = cli_parser._get_controller(str(setup_test_project.resolve()), None, True, logging.WARNING)
+    instance = controller._kotemari_instance
+    assert instance is not None
+
+    result = runner.invoke(app, ["--project-root", str(setup_test_project), "list"])
+    assert result.exit_code == 0
+    assert controller._kotemari_instance is instance
+    assert cli_parser._get_controller.cache_info().hits == 2
+
+    # A file added between commands shows up in the reused instance's results
+    # コマンド間に追加されたファイルは、再利用されたインスタンスの結果に現れる
+    (setup_test_project / "added_later.py").write_text("print('late')\n")
+    result = runner.invoke(app, ["--project-root", str(setup_test_project), "list"])
+    assert result.exit_code == 0
+    assert "added_later.py" in result.stdout
+    assert controller._kotemari_instance is instance
+
+def test_no_use_cache_disables_the_persisted_index(setup_test_project: Path):
+    """
+    Tests that --no-use-cache reaches the Kotemari instance, so no analysis index is written.
+    --no-use-cache が Kotemari インスタンスまで渡され、分析インデックスが書き込まれないことをテストします。
+    """
+    cache_home = Path(os.environ["XDG_CACHE_HOME"])
+
+    result = runner.invoke(app, ["--project-root", str(setup_test_project), "--no-use-cache", "list"])
+    assert result.exit_code == 0
+    assert not list(cache_home.rglob("*.idx"))
+
+    result = runner.invoke(app, ["--project-root", str(setup_test_project), "list"])
+    assert result.exit_code == 0
+    assert list(cache_home.rglob("*.idx"))
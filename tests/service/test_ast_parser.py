@@ -2,6 +2,7 @@
 import pytest
 from pathlib import Path
 import textwrap
+from unittest.mock import patch
 
 from kotemari.service.ast_parser import AstParser
 from kotemari.domain.dependency_info import DependencyInfo
@@ -109,6 +110,34 @@ def test_parse_imports_inside_code(parser: AstParser):
     # 注意: 現在の実装は ast.NodeVisitor によって見つけられるトップレベルおよびクラスレベルのインポートに焦点を当てています
     assert parser.parse_dependencies(content, file_path) == expected
 
+def test_parse_imports_in_compound_statements(parser: AstParser):
+    """Tests that imports nested in if/try/with blocks are still found."""
+    content = textwrap.dedent("""
+    import typing
+
+    if typing.TYPE_CHECKING:
+        from collections import OrderedDict
+
+    try:
+        import json
+    except ImportError:
+        import simplejson
+    finally:
+        pass
+
+    with open(__file__) as f:
+        import csv
+    """)
+    file_path = Path("/fake/compound_imports.py")
+    expected = [
+        DependencyInfo("collections"),
+        DependencyInfo("csv"),
+        DependencyInfo("json"),
+        DependencyInfo("simplejson"),
+        DependencyInfo("typing"),
+    ]
+    assert parser.parse_dependencies(content, file_path) == expected
+
 def test_parse_no_imports(parser: AstParser):
     """Tests parsing a file with no import statements."""
     content = textwrap.dedent("""
@@ -156,4 +185,11 @@ def test_parse_complex_from_import(parser: AstParser):
         DependencyInfo("concurrent.futures"),
         DependencyInfo("my_package.sub_module"),
     ])
-    assert parser.parse_dependencies(content, file_path) == expected 
\ No newline at end of file
+    assert parser.parse_dependencies(content, file_path) == expected 
+def test_parse_skips_ast_without_import_keyword(parser: AstParser):
+    """Tests that content without the word 'import' returns no dependencies without building an AST."""
+    file_path = Path("/fake/plain.py")
+    with patch("kotemari.service.ast_parser.ast.parse") as mock_parse:
+        assert parser.parse_dependencies(b"x = 1\nprint(x)\n", file_path) == []
+        assert parser.parse_dependencies("def f(:\n", file_path) == []
+    mock_parse.assert_not_called()
@@ -46,6 +46,7 @@ def monitor_setup(tmp_path: Path, mocker):
     # Configure the mock object's get_ignore_function to return our mock checker
     # モックオブジェクトの get_ignore_function がモックチェッカーを返すように設定します
     mock_ignore_processor.get_ignore_function.return_value = mock_check_ignore
+    mock_ignore_processor.get_dir_ignore_function.return_value = mock_check_ignore
 
     monitor = FileSystemEventMonitor(project_root, mock_ignore_processor)
     mock_callback = MagicMock(spec=FileSystemEventCallback)
@@ -259,4 +260,24 @@ def test_ignore_directory_creation(monitor_setup):
         if event.src_path == ignored_dir_path or event.src_path == file_inside:
              called_for_ignored = True
              break
-    assert not called_for_ignored, f"Callback was called for an event in ignored directory: {mock_callback.call_args_list}" 
\ No newline at end of file
+    assert not called_for_ignored, f"Callback was called for an event in ignored directory: {mock_callback.call_args_list}" 
+
+def test_moves_are_dropped_only_when_both_ends_are_ignored(monitor_setup):
+    """Test that a move out of or into an ignored path reaches the callback, and one between ignored paths does not."""
+    # """無視パスからの移動・無視パスへの移動はコールバックに届き、無視パス間の移動は届かないことをテストします。"""
+    from watchdog.events import FileMovedEvent
+    from kotemari.service.file_system_event_monitor import _EventHandler
+
+    project_root, monitor, mock_callback, mock_ignore_processor = monitor_setup
+    handler = _EventHandler(mock_callback, mock_ignore_processor, project_root)
+    ignored = project_root / "ignored_file.txt"
+    tracked = project_root / "tracked.txt"
+
+    handler.dispatch(FileMovedEvent(str(ignored), str(tracked)))
+    handler.dispatch(FileMovedEvent(str(tracked), str(ignored)))
+    handler.dispatch(FileMovedEvent(str(ignored), str(project_root / "ignored_dir" / "x.txt")))
+
+    assert mock_callback.call_args_list == [
+        call(FileSystemEvent("moved", ignored, False, dest_path=tracked)),
+        call(FileSystemEvent("moved", tracked, False, dest_path=ignored)),
+    ]
@@ -1,8 +1,9 @@
 import pytest
 from pathlib import Path
 import hashlib
+from unittest.mock import patch
 
-from kotemari.service.hash_calculator import HashCalculator
+from kotemari.service.hash_calculator import HashCalculator, DEFAULT_HASH_ALGORITHM
 
 # Helper to create temporary files for testing
 @pytest.fixture
@@ -39,14 +40,26 @@ def test_calculate_hash_sha256_success(setup_hash_test_files):
     expected_hash2 = hashlib.sha256(setup_hash_test_files["content2"]).hexdigest()
     expected_hash_empty = hashlib.sha256(b"").hexdigest()
 
-    hash1 = HashCalculator.calculate_file_hash(setup_hash_test_files["file1"])
+    hash1 = HashCalculator.calculate_file_hash(setup_hash_test_files["file1"], algorithm='sha256')
     hash2 = HashCalculator.calculate_file_hash(setup_hash_test_files["file2"], algorithm='sha256')
-    hash_empty = HashCalculator.calculate_file_hash(setup_hash_test_files["empty"])
+    hash_empty = HashCalculator.calculate_file_hash(setup_hash_test_files["empty"], algorithm='sha256')
 
     assert hash1 == expected_hash1
     assert hash2 == expected_hash2
     assert hash_empty == expected_hash_empty
 
+def test_calculate_hash_default_algorithm(setup_hash_test_files):
+    """
+    Tests that the default algorithm is BLAKE3 when available, otherwise SHA256.
+    デフォルトのアルゴリズムが、利用可能なら BLAKE3、そうでなければ SHA256 であることをテストします。
+    """
+    default_hash = HashCalculator.calculate_file_hash(setup_hash_test_files["file1"])
+    explicit_hash = HashCalculator.calculate_file_hash(setup_hash_test_files["file1"], algorithm=DEFAULT_HASH_ALGORITHM)
+    assert default_hash is not None
+    assert default_hash == explicit_hash
+    if DEFAULT_HASH_ALGORITHM == 'sha256':
+        assert default_hash == hashlib.sha256(setup_hash_test_files["content1"]).hexdigest()
+
 def test_calculate_hash_md5_success(setup_hash_test_files):
     """
     Tests calculating MD5 hash for an existing file.
@@ -83,4 +96,24 @@ def test_calculate_hash_on_directory(tmp_path: Path):
     dir_path = tmp_path / "a_directory"
     dir_path.mkdir()
     file_hash = HashCalculator.calculate_file_hash(dir_path)
-    assert file_hash is None 
\ No newline at end of file
+    assert file_hash is None 
+def test_calculate_hash_from_preloaded_data(tmp_path: Path):
+    """
+    Tests that preloaded data is hashed without opening the file.
+    事前に読み込まれたデータが、ファイルを開かずにハッシュ化されることをテストします。
+    """
+    missing_path = tmp_path / "not_read.txt"
+    file_hash = HashCalculator.calculate_file_hash(missing_path, algorithm='sha256', data=b"Hello, world!")
+    assert file_hash == hashlib.sha256(b"Hello, world!").hexdigest()
+
+def test_calculate_hash_without_file_digest(tmp_path: Path):
+    """
+    Tests that the readinto fallback (used before Python 3.11) hashes across several chunks correctly.
+    readinto によるフォールバック（Python 3.11 未満で使用）が複数チャンクにわたって正しくハッシュすることをテストします。
+    """
+    file_path = tmp_path / "chunks.bin"
+    content = bytes(range(256)) * 10
+    file_path.write_bytes(content)
+    with patch("kotemari.service.hash_calculator._file_digest", None):
+        file_hash = HashCalculator.calculate_file_hash(file_path, algorithm='sha256', chunk_size=1000)
+    assert file_hash == hashlib.sha256(content).hexdigest()
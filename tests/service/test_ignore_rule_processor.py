@@ -156,5 +156,74 @@ def test_ignore_function_non_absolute_path(setup_ignore_test_structure, ignore_f
     # 解決フレーズが存在するかを確認し、完全一致ではない
     assert "Resolving relative to project root" in caplog.text
 
+def test_is_ignored_dir_uses_directory_patterns(setup_ignore_test_structure, path_resolver):
+    """
+    Tests that directory-only patterns (trailing '/') match the directory itself.
+    ディレクトリ専用パターン（末尾 '/'）がディレクトリ自体にマッチすることをテストします。
+    """
+    project_root = setup_ignore_test_structure["project"]
+    processor = IgnoreRuleProcessor(project_root, ProjectConfig(), path_resolver)
+
+    assert processor.is_ignored_dir(project_root / "build")
+    assert processor.is_ignored_dir(project_root / "src" / "generated")
+    assert not processor.is_ignored_dir(project_root / "src")
+    # The file matcher does not treat 'build' as a directory
+    # ファイル用の判定関数は 'build' をディレクトリとして扱いません
+    assert not processor.get_ignore_function()(project_root / "build")
+    assert not processor.should_ignore(project_root / "build")
+    assert processor.should_ignore(project_root / "build", is_dir=True)
+
 # TODO: Add tests for ignore rules from ProjectConfig when implemented
-# TODO: ProjectConfig からの無視ルールが実装されたらテストを追加する 
\ No newline at end of file
+# TODO: ProjectConfig からの無視ルールが実装されたらテストを追加する 
+def test_ignore_function_is_cached_until_rules_reload(setup_ignore_test_structure, path_resolver):
+    """
+    Tests that ignore decisions are memoized and that reload_rules picks up .gitignore changes.
+    無視判定がメモ化され、reload_rules で .gitignore の変更が反映されることをテストします。
+    """
+    project_root = setup_ignore_test_structure["project"]
+    processor = IgnoreRuleProcessor(project_root, ProjectConfig(), path_resolver)
+    target = project_root / "notes.md"
+
+    ignore_func = processor.get_ignore_function()
+    assert processor.get_ignore_function() is ignore_func
+    assert not ignore_func(target)
+    assert ignore_func.cache_info().currsize == 1
+    assert not processor.should_ignore(target) # Served by the same memoized function
+    assert ignore_func.cache_info().hits == 1
+
+    (project_root / ".gitignore").write_text("*.md\n", encoding="utf-8")
+    assert not processor.get_ignore_function()(target) # Cached decision until the rules are reloaded
+    processor.reload_rules()
+    assert processor.get_ignore_function()(target)
+
+def test_gitignore_specs_are_merged_unless_they_negate(setup_ignore_test_structure, path_resolver, monkeypatch):
+    """
+    Tests that several specs are checked as one, and that a negation still only applies within its own file.
+    複数のスペックが1つとしてチェックされ、否定は引き続きそのファイル内にのみ適用されることをテストします。
+    """
+    project_root = setup_ignore_test_structure["project"]
+    specs = [pathspec.PathSpec.from_lines("gitwildmatch", lines) for lines in (["*.tmp"], ["*.log"])]
+    monkeypatch.setattr(GitignoreReader, "find_and_read_all", MagicMock(return_value=specs))
+    processor = IgnoreRuleProcessor(project_root, ProjectConfig(), path_resolver)
+    with patch.object(pathspec.PathSpec, "match_file", autospec=True, side_effect=pathspec.PathSpec.match_file) as match_file:
+        ignore_func = processor.get_ignore_function()
+        assert ignore_func(project_root / "a.log")
+        assert match_file.call_count == 1
+    assert ignore_func(project_root / "a.tmp")
+    assert not ignore_func(project_root / "a.py")
+
+    specs.append(pathspec.PathSpec.from_lines("gitwildmatch", ["!keep.log"]))
+    processor.reload_rules()
+    assert processor.get_ignore_function()(project_root / "keep.log") # Another file's negation does not un-ignore
+
+def test_paths_under_the_root_are_matched_without_resolving(setup_ignore_test_structure, path_resolver):
+    """
+    Tests that absolute paths under the project root are made relative by string slicing, not Path.resolve().
+    プロジェクトルート配下の絶対パスが Path.resolve() ではなく文字列のスライスで相対化されることをテストします。
+    """
+    project_root = setup_ignore_test_structure["project"]
+    processor = IgnoreRuleProcessor(project_root, ProjectConfig(), path_resolver)
+    with patch.object(Path, "resolve", side_effect=AssertionError("resolve() called")):
+        assert processor._relative_posix(project_root / "src" / "main.py") == "src/main.py"
+        assert processor._relative_posix(f"{project_root}/src/../src/helper.tmp") == "src/helper.tmp"
+        assert processor.get_ignore_function()(project_root / "src" / "helper.tmp")
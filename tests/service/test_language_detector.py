@@ -70,4 +70,13 @@ def test_detect_language_custom_map():
     assert custom_detector.detect_language(Path("Image.JPG")) == "JPEG Image" # Input lowercased, map keys lowercased on init
                                                                               # 入力は小文字化、マップキーは初期化時に小文字化
     assert custom_detector.detect_language(Path("main.py")) is None # Default map not used
-                                                                 # デフォルトマップは使用されない 
\ No newline at end of file
+                                                                 # デフォルトマップは使用されない 
+def test_detect_language_memoizes_by_file_name(detector: LanguageDetector):
+    """
+    Tests that files sharing a name in different directories are resolved from the cache.
+    異なるディレクトリにある同名のファイルがキャッシュから解決されることをテストします。
+    """
+    assert detector.detect_language(Path("pkg_a/__init__.py")) == "Python"
+    assert detector.detect_language(Path("pkg_b/__init__.py")) == "Python"
+    cache_info = detector._detect_by_name.cache_info()
+    assert (cache_info.hits, cache_info.misses) == (1, 1)
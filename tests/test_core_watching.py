@@ -71,10 +71,11 @@ def test_start_watching_initializes_and_starts_monitor(MockMonitor, kotemari_ins
 
     MockMonitor.assert_called_once_with(
         kotemari_instance.project_root,
-        ANY, # internal_event_handler
-        ignore_func=ANY # ignore_func from ignore_processor
+        kotemari_instance._ignore_processor,
+        ignore_func=ANY, # the facade's cached matchers
+        ignore_dir_func=ANY
     )
-    mock_monitor_instance.start.assert_called_once()
+    mock_monitor_instance.start.assert_called_once_with(ANY) # internal_event_handler
     assert kotemari_instance._event_monitor is mock_monitor_instance
     assert kotemari_instance._background_worker_thread.is_alive() # Check worker thread started
 
@@ -105,16 +106,51 @@ def test_stop_watching_stops_monitor(MockMonitor, kotemari_instance: Kotemari):
     mock_monitor_instance.is_alive.return_value = True
 
     kotemari_instance.start_watching()
+    worker_thread = kotemari_instance._background_worker_thread
 
-    # Mock the worker thread join for faster test
-    with patch.object(kotemari_instance._background_worker_thread, 'join') as mock_join:
-        kotemari_instance.stop_watching()
+    kotemari_instance.stop_watching()
 
     mock_monitor_instance.stop.assert_called_once()
-    mock_monitor_instance.join.assert_called_once()
     assert kotemari_instance._stop_worker_event.is_set()
-    mock_join.assert_called_once()
     assert kotemari_instance._event_monitor is None
+    # The worker is parked, not torn down
+    # ワーカーは破棄されず、待機状態になる
+    assert not kotemari_instance._watch_active.is_set()
+    assert kotemari_instance._worker_idle.is_set()
+    assert kotemari_instance._background_worker_thread is worker_thread
+    assert worker_thread.is_alive()
+
+@patch("kotemari.core.FileSystemEventMonitor")
+def test_restart_watching_reuses_worker_thread(MockMonitor, kotemari_instance: Kotemari):
+    """Test that a stop/start cycle reuses the same worker thread and event queue."""
+    MockMonitor.return_value.is_alive.return_value = True
+
+    kotemari_instance.start_watching()
+    worker_thread = kotemari_instance._background_worker_thread
+    event_queue = kotemari_instance._event_queue
+    kotemari_instance.stop_watching()
+    kotemari_instance.start_watching()
+
+    assert kotemari_instance._background_worker_thread is worker_thread
+    assert kotemari_instance._event_queue is event_queue
+    assert kotemari_instance._watch_active.is_set()
+    assert not kotemari_instance._stop_worker_event.is_set()
+
+    kotemari_instance.stop_watching()
+
+@patch("kotemari.core.FileSystemEventMonitor")
+def test_close_ends_the_parked_worker_thread(MockMonitor, kotemari_instance: Kotemari):
+    """Test that close() lets the worker thread parked between watch sessions exit."""
+    MockMonitor.return_value.is_alive.return_value = True
+
+    kotemari_instance.start_watching()
+    worker_thread = kotemari_instance._background_worker_thread
+    kotemari_instance.stop_watching()
+    assert worker_thread.is_alive()
+
+    kotemari_instance.close()
+
+    assert not worker_thread.is_alive()
     assert kotemari_instance._background_worker_thread is None
 
 @patch("kotemari.core.FileSystemEventMonitor")
@@ -192,4 +228,117 @@ async def test_event_triggers_cache_invalidation_and_callback(
     # --- Cleanup ---
     kotemari_instance.stop_watching()
     # Ensure the monitor's stop method was called
-    mock_monitor_instance.stop.assert_called_once() 
\ No newline at end of file
+    mock_monitor_instance.stop.assert_called_once() 
+def test_event_queue_coalesces_events_for_same_path(kotemari_instance: Kotemari):
+    """Test that pending events for one path collapse to one, and delete+create becomes modify."""
+    from kotemari.core import EVENT_QUEUE_MAXSIZE, _event_coalesce_key, _merge_events
+    from kotemari.utility.batch_queue import BatchQueue
+
+    event_queue = BatchQueue(maxsize=EVENT_QUEUE_MAXSIZE, key_func=_event_coalesce_key, merge_func=_merge_events)
+    path = kotemari_instance.project_root / "dummy.py"
+    event_queue.put(FileSystemEvent("modified", path, False))
+    event_queue.put(FileSystemEvent("modified", path, False))
+    assert len(event_queue) == 1
+
+    event_queue.put(FileSystemEvent("deleted", path, False))
+    event_queue.put(FileSystemEvent("created", path, False))
+    assert event_queue.drain(timeout=0) == [FileSystemEvent("modified", path, False)]
+
+def test_event_batch_applies_each_event_differentially(kotemari_instance: Kotemari):
+    """Test that a batch, including directory events, is applied per event without a full re-analysis."""
+    root = kotemari_instance.project_root
+    kotemari_instance._run_analysis_and_update_memory = Mock()
+    kotemari_instance._process_event = Mock()
+
+    kotemari_instance._process_event_batch([
+        FileSystemEvent("modified", root / "dummy.py", False),
+        FileSystemEvent("created", root / "pkg", True),
+        FileSystemEvent("created", root / "pkg" / "mod.py", False),
+    ])
+    kotemari_instance._run_analysis_and_update_memory.assert_not_called()
+    assert kotemari_instance._process_event.call_count == 3
+
+def test_event_batch_skips_temporary_files_renamed_over_the_target(kotemari_instance: Kotemari):
+    """Test that an atomic save (write a temp file, rename it over the target) only processes the move."""
+    root = kotemari_instance.project_root
+    kotemari_instance._process_event = Mock()
+    tmp_file = root / "dummy.py.tmp"
+    move = FileSystemEvent("moved", tmp_file, False, dest_path=root / "dummy.py")
+
+    kotemari_instance._process_event_batch([
+        FileSystemEvent("created", tmp_file, False),
+        FileSystemEvent("modified", root / "other.py", False),
+        move,
+    ])
+    assert [c.args[0] for c in kotemari_instance._process_event.call_args_list] == [
+        FileSystemEvent("modified", root / "other.py", False),
+        move,
+    ]
+
+def test_event_batch_stops_early_when_stop_requested(kotemari_instance: Kotemari):
+    """Test that the remaining events of a batch are skipped once shutdown has been requested."""
+    root = kotemari_instance.project_root
+    kotemari_instance._process_event = Mock(side_effect=lambda event: kotemari_instance._stop_worker_event.set())
+
+    kotemari_instance._process_event_batch([
+        FileSystemEvent("modified", root / "a.py", False),
+        FileSystemEvent("modified", root / "b.py", False),
+    ])
+    kotemari_instance._process_event.assert_called_once()
+
+@patch("kotemari.core.FileSystemEventMonitor")
+def test_watcher_drops_events_for_ignored_paths_before_queueing(MockMonitor, kotemari_instance: Kotemari):
+    """Test that events under ignored paths neither reach the event queue nor the user callback."""
+    root = kotemari_instance.project_root
+    kotemari_instance._ignore_fn = lambda path: "node_modules" in str(path)
+    kotemari_instance._ignore_dir_fn = lambda path: "node_modules" in str(path)
+    user_callback = Mock()
+    kotemari_instance._process_event_batch = Mock()
+    kotemari_instance.start_watching(user_callback)
+    handler = MockMonitor.return_value.start.call_args.args[0]
+
+    handler(FileSystemEvent("modified", root / "node_modules" / "lib.js", False))
+    handler(FileSystemEvent("created", root / "node_modules" / "pkg", True))
+    assert len(kotemari_instance._event_queue) == 0
+    user_callback.assert_not_called()
+
+    handler(FileSystemEvent("moved", root / "node_modules" / "a.js", False, dest_path=root / "node_modules" / "b.js"))
+    assert len(kotemari_instance._event_queue) == 0
+
+    moved_out = FileSystemEvent("moved", root / "node_modules" / "pkg", True, dest_path=root / "pkg")
+    file_moved_out = FileSystemEvent("moved", root / "node_modules" / "x.py", False, dest_path=root / "x.py")
+    kotemari_instance.stop_watching()
+    handler(moved_out)
+    handler(file_moved_out)
+    handler(FileSystemEvent("modified", root / "dummy.py", False))
+    assert kotemari_instance._event_queue.drain(timeout=0) == [
+        moved_out, file_moved_out, FileSystemEvent("modified", root / "dummy.py", False)]
+    assert user_callback.call_count == 3
+
+def _wait_until(condition, timeout: float = 5.0) -> bool:
+    """Polls the condition until it holds or the timeout expires. / 条件が成立するかタイムアウトするまでポーリングします。"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+def test_watcher_picks_up_real_file_changes(test_project_path: Path):
+    """Test the watcher end to end against a real directory, without mocks."""
+    (test_project_path / ".gitignore").write_text("*.log\n")
+    kotemari = Kotemari(test_project_path, use_cache=False)
+    kotemari.analyze_project()
+    kotemari.start_watching()
+    try:
+        assert kotemari._event_monitor.is_alive()
+        (test_project_path / "new_module.py").write_text("import os\n")
+        (test_project_path / "debug.log").write_text("ignored\n")
+        assert _wait_until(lambda: "new_module.py" in kotemari.list_files())
+        assert "debug.log" not in kotemari.list_files()
+
+        (test_project_path / "file1.txt").unlink()
+        assert _wait_until(lambda: "file1.txt" not in kotemari.list_files())
+    finally:
+        kotemari.stop_watching()
+    assert kotemari._event_monitor is None or not kotemari._event_monitor.is_alive()
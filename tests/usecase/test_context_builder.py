@@ -4,13 +4,13 @@ from pathlib import Path
 from unittest.mock import MagicMock, call
 from typing import Dict, List, Optional
 import logging
-from datetime import datetime
+import time
 
 from kotemari.usecase.context_builder import ContextBuilder
 from kotemari.domain.file_content_formatter import FileContentFormatter
 from kotemari.gateway.file_system_accessor import FileSystemAccessor
 from kotemari.domain.context_data import ContextData
-from kotemari.domain.exceptions import ContextGenerationError
+from kotemari.domain.exceptions import ContextGenerationError, FileSystemError
 from kotemari.domain.file_info import FileInfo
 from kotemari.domain.parsed_python_info import ParsedPythonInfo
 from kotemari.domain.dependency_info import DependencyInfo, DependencyType
@@ -92,7 +92,7 @@ def setup_context_test(tmp_path: Path, mock_file_accessor: MagicMock):
     kotemari_instance_mock._analysis_results = {}
     kotemari_instance_mock._project_root = project_root # Store project root for reference
 
-    now = datetime.now()
+    now = time.time_ns()
     for p in mock_contents.keys():
         dependencies = []
         if p == main_py_path:
@@ -110,11 +110,11 @@ def setup_context_test(tmp_path: Path, mock_file_accessor: MagicMock):
         # 簡略化された FileInfo を作成します
         file_info = FileInfo(
             path=p,
-            mtime=now,
+            mtime_ns=now,
             size=len(mock_contents[p]),
             hash="dummy_hash"
         )
-        kotemari_instance_mock._analysis_results[p] = file_info
+        kotemari_instance_mock._analysis_results[str(p)] = file_info
 
     # Mock the reverse dependency index
     # リバース依存関係インデックスをモックします
@@ -212,6 +212,14 @@ def test_build_context_multiple_files(context_builder: ContextBuilder, mock_file
     # 依存関係分析が行われない場合、related_files にはターゲットファイルが含まれると仮定します
     assert set(result.related_files) == set(target_files)
 
+def test_build_context_wraps_file_system_errors(context_builder: ContextBuilder, mock_file_accessor: MagicMock):
+    """Tests that a FileSystemError from the accessor is reported as a ContextGenerationError."""
+    # アクセサからの FileSystemError が ContextGenerationError として報告されることをテストします。
+    mock_file_accessor.read_file.side_effect = FileSystemError("File not found: /project/gone.py")
+
+    with pytest.raises(ContextGenerationError, match="Error accessing file content"):
+        context_builder.build_context([Path("/project/gone.py")], Path("/project"))
+
 # Removed test_build_context_file_not_found, test_build_context_read_error, test_build_context_with_dependencies
 # test_build_context_file_not_found, test_build_context_read_error, test_build_context_with_dependencies を削除しました
 
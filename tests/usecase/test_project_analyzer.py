@@ -2,8 +2,10 @@ import pytest
 from pathlib import Path
 from unittest.mock import MagicMock, patch, call, create_autospec
 import datetime
+import time
 import logging
 import re # Import re for regex escaping
+import threading
 
 from kotemari.usecase.project_analyzer import ProjectAnalyzer
 from kotemari.domain.file_info import FileInfo
@@ -18,7 +20,7 @@ from kotemari.service.hash_calculator import HashCalculator
 from kotemari.service.language_detector import LanguageDetector
 from kotemari.service.ast_parser import AstParser
 from kotemari.usecase.config_manager import ConfigManager
-from kotemari.domain.exceptions import AnalysisError, FileSystemError # Import custom exceptions
+from kotemari.domain.exceptions import AnalysisError, AnalysisCancelledError, FileSystemError # Import custom exceptions
 
 # Fixture for a basic PathResolver
 @pytest.fixture
@@ -243,15 +245,17 @@ def test_analyze_integration_with_dependency_parsing(setup_analyzer_test_project
     # Mock FileSystemAccessor scan_directory to yield FileInfo objects
     # scan_directory は基本的な FileInfo (path, mtime, size) を返す想定
     # hash, language, dependencies は analyze メソッド内で設定される
-    now = datetime.datetime.now(datetime.timezone.utc)
+    now = time.time_ns()
+    # No preloaded contents: files are read through read_file as needed
+    mock_fs_accessor.read_many_bytes.return_value = {}
     mock_fs_accessor.scan_directory.return_value = iter([
-        FileInfo(path=proj_root / ".gitignore", mtime=now, size=10),
-        FileInfo(path=proj_root / ".kotemari.yml", mtime=now, size=0),
-        FileInfo(path=main_py_path, mtime=now, size=20),
-        FileInfo(path=utils_py_path, mtime=now, size=30),
-        FileInfo(path=proj_root / "data.txt", mtime=now, size=9),
-        FileInfo(path=proj_root / "README.md", mtime=now, size=15),
-        FileInfo(path=js_path, mtime=now, size=25),
+        FileInfo(path=proj_root / ".gitignore", mtime_ns=now, size=10),
+        FileInfo(path=proj_root / ".kotemari.yml", mtime_ns=now, size=0),
+        FileInfo(path=main_py_path, mtime_ns=now, size=20),
+        FileInfo(path=utils_py_path, mtime_ns=now, size=30),
+        FileInfo(path=proj_root / "data.txt", mtime_ns=now, size=9),
+        FileInfo(path=proj_root / "README.md", mtime_ns=now, size=15),
+        FileInfo(path=js_path, mtime_ns=now, size=25),
         # Ignored files (syntax_error.py, output.log, venv/*) are NOT yielded by scan_directory
         # if the ignore_func works correctly (or if mocked scan doesn't yield them).
         # For this test, assume scan_directory respects ignore rules or we manually yield non-ignored.
@@ -329,7 +333,11 @@ def test_analyze_integration_with_dependency_parsing(setup_analyzer_test_project
     assert js_fi.dependencies == [] # Should be default empty list
 
     # Check mock calls
-    mock_fs_accessor.scan_directory.assert_called_once_with(proj_root, ignore_func=mock_ignore_processor.get_ignore_function())
+    mock_fs_accessor.scan_directory.assert_called_once_with(
+        proj_root,
+        ignore_func=mock_ignore_processor.get_ignore_function(),
+        ignore_dir_func=mock_ignore_processor.get_dir_ignore_function(),
+    )
     assert mock_hash_calculator.calculate_file_hash.call_count == 7
     assert mock_language_detector.detect_language.call_count == 7
 
@@ -373,10 +381,12 @@ def test_analyze_with_python_syntax_error(setup_analyzer_test_project, path_reso
     mock_ignore_processor.get_ignore_function.return_value = lambda path: False # Ignore nothing
 
     # Yield the error file along with another valid file
-    now = datetime.datetime.now(datetime.timezone.utc)
+    now = time.time_ns()
+    # No preloaded contents: files are read through read_file as needed
+    mock_fs_accessor.read_many_bytes.return_value = {}
     mock_fs_accessor.scan_directory.return_value = iter([
-        FileInfo(path=proj_root / "main.py", mtime=now, size=20),
-        FileInfo(path=error_py_path, mtime=now, size=20), # Include the error file
+        FileInfo(path=proj_root / "main.py", mtime_ns=now, size=20),
+        FileInfo(path=error_py_path, mtime_ns=now, size=20), # Include the error file
     ])
 
     # Mock read_file
@@ -452,6 +462,7 @@ def mock_dependencies_for_analyze(
     mock_fs_accessor.scan_directory = MagicMock()
     mock_fs_accessor.read_file = MagicMock()
     mock_fs_accessor.get_file_info = MagicMock() # Add get_file_info explicitly
+    mock_fs_accessor.read_many_bytes = MagicMock(return_value={}) # No preloaded contents by default
 
     # Use autospec for others where it seemed to work or less complex
     mock_hash_calculator = create_autospec(HashCalculator, instance=True)
@@ -516,10 +527,10 @@ def test_analyze_handles_hash_error(setup_analyzer_test_project, path_resolver,
     proj_root = setup_analyzer_test_project
     file1_path = proj_root / "file1.py"
     file2_path = proj_root / "file2.txt"
-    now = datetime.datetime.now(datetime.timezone.utc)
+    now = time.time_ns()
     scan_results = [
-        FileInfo(path=file1_path, mtime=now, size=10),
-        FileInfo(path=file2_path, mtime=now, size=20),
+        FileInfo(path=file1_path, mtime_ns=now, size=10),
+        FileInfo(path=file2_path, mtime_ns=now, size=20),
     ]
 
     # Mock hash calculation to fail for file1.py
@@ -551,10 +562,10 @@ def test_analyze_handles_language_detect_error(setup_analyzer_test_project, path
     proj_root = setup_analyzer_test_project
     file1_path = proj_root / "file1.py"
     file2_path = proj_root / "file2.oddext"
-    now = datetime.datetime.now(datetime.timezone.utc)
+    now = time.time_ns()
     scan_results = [
-        FileInfo(path=file1_path, mtime=now, size=10),
-        FileInfo(path=file2_path, mtime=now, size=20),
+        FileInfo(path=file1_path, mtime_ns=now, size=10),
+        FileInfo(path=file2_path, mtime_ns=now, size=20),
     ]
 
     # Mock language detection to fail for file2.oddext
@@ -586,8 +597,8 @@ def test_analyze_handles_read_error_for_deps(setup_analyzer_test_project, path_r
     """Tests analyze logs warning if reading file for dependency parsing fails."""
     proj_root = setup_analyzer_test_project
     file1_path = proj_root / "file1.py"
-    now = datetime.datetime.now(datetime.timezone.utc)
-    scan_results = [FileInfo(path=file1_path, mtime=now, size=10)]
+    now = time.time_ns()
+    scan_results = [FileInfo(path=file1_path, mtime_ns=now, size=10)]
 
     # Mock read_file to return None for file1.py
     analyzer, mocks = mock_dependencies_for_analyze(
@@ -609,8 +620,8 @@ def test_analyze_handles_parse_dependencies_error(setup_analyzer_test_project, p
     proj_root = setup_analyzer_test_project
     file1_path = proj_root / "file1.py"
     file1_content = "import os"
-    now = datetime.datetime.now(datetime.timezone.utc)
-    scan_results = [FileInfo(path=file1_path, mtime=now, size=10)]
+    now = time.time_ns()
+    scan_results = [FileInfo(path=file1_path, mtime_ns=now, size=10)]
 
     # Mock parse_dependencies to raise a generic Exception
     def parse_deps_side_effect(content, path):
@@ -636,6 +647,156 @@ def test_analyze_handles_parse_dependencies_error(setup_analyzer_test_project, p
     assert "Unexpected AST issue" in caplog.text # Original error should be logged via exc_info
     mocks["ast"].parse_dependencies.assert_called_once_with(file1_content, file1_path)
 
+def test_analyze_uses_preloaded_contents(setup_analyzer_test_project, path_resolver):
+    """Tests that preloaded bytes are used for hashing and parsing without re-reading the file."""
+    proj_root = setup_analyzer_test_project
+    file1_path = proj_root / "file1.py"
+    file1_bytes = b"import os"
+    now = time.time_ns()
+    scan_results = [FileInfo(path=file1_path, mtime_ns=now, size=10)]
+
+    analyzer, mocks = mock_dependencies_for_analyze(
+        proj_root, path_resolver, scan_results,
+        lang_results={file1_path: "Python"},
+        dep_results={file1_path: [DependencyInfo("os")]}
+    )
+    mocks["fs"].read_many_bytes.return_value = {file1_path: file1_bytes}
+
+    results = analyzer.analyze()
+
+    assert results[0].dependencies == [DependencyInfo("os")]
+    mocks["fs"].read_many_bytes.assert_called_once_with([file1_path])
+    mocks["hash"].calculate_file_hash.assert_called_once_with(file1_path, data=file1_bytes)
+    mocks["ast"].parse_dependencies.assert_called_once_with(file1_bytes, file1_path)
+    mocks["fs"].read_file.assert_not_called()
+
+def test_analyze_streams_files_above_the_preload_limit(setup_analyzer_test_project, path_resolver):
+    """
+    Tests that files larger than PRELOAD_MAX_FILE_SIZE are not preloaded but hashed from disk.
+    PRELOAD_MAX_FILE_SIZE より大きなファイルは事前に読み込まれず、ディスクからハッシュ計算されることをテストします。
+    """
+    proj_root = setup_analyzer_test_project
+    small_path = proj_root / "file1.py"
+    large_path = proj_root / "file2.py"
+    now = time.time_ns()
+    scan_results = [FileInfo(path=small_path, mtime_ns=now, size=10),
+                    FileInfo(path=large_path, mtime_ns=now, size=11)]
+    analyzer, mocks = mock_dependencies_for_analyze(proj_root, path_resolver, scan_results)
+    analyzer.PRELOAD_MAX_FILE_SIZE = 10
+    mocks["fs"].read_many_bytes.return_value = {small_path: b"import os"}
+
+    analyzer.analyze()
+
+    mocks["fs"].read_many_bytes.assert_called_once_with([small_path])
+    mocks["hash"].calculate_file_hash.assert_any_call(small_path, data=b"import os")
+    mocks["hash"].calculate_file_hash.assert_any_call(large_path)
+
+def test_analyze_reads_next_batch_while_analyzing(setup_analyzer_test_project, path_resolver):
+    """Tests that the next batch is already being read while the current batch is analyzed."""
+    proj_root = setup_analyzer_test_project
+    now = time.time_ns()
+    paths = [proj_root / "file1.py", proj_root / "file2.py"]
+    scan_results = [FileInfo(path=path, mtime_ns=now, size=10) for path in paths]
+    analyzer, mocks = mock_dependencies_for_analyze(proj_root, path_resolver, scan_results)
+    analyzer.PRELOAD_BATCH_SIZE = 1
+    second_read = threading.Event()
+
+    def read_many_bytes(batch):
+        if batch == [paths[1]]:
+            second_read.set()
+        return {}
+
+    mocks["fs"].read_many_bytes.side_effect = read_many_bytes
+    reads_seen_while_hashing = []
+    mocks["hash"].calculate_file_hash.side_effect = lambda path, **kwargs: (
+        reads_seen_while_hashing.append(second_read.wait(timeout=5)) or "hash")
+
+    results = analyzer.analyze()
+
+    assert [fi.path for fi in results] == paths
+    assert reads_seen_while_hashing == [True, True]
+
+def test_analyze_stops_when_cancelled(setup_analyzer_test_project, path_resolver):
+    """Tests that a set cancel_event stops the analysis with AnalysisCancelledError before any file is read."""
+    proj_root = setup_analyzer_test_project
+    now = time.time_ns()
+    scan_results = [FileInfo(path=proj_root / "file1.py", mtime_ns=now, size=10)]
+    analyzer, mocks = mock_dependencies_for_analyze(proj_root, path_resolver, scan_results)
+    cancel_event = threading.Event()
+    cancel_event.set()
+
+    with pytest.raises(AnalysisCancelledError):
+        analyzer.analyze(cancel_event=cancel_event)
+    mocks["fs"].read_many_bytes.assert_not_called()
+
+def test_analyze_reuses_previous_results(setup_analyzer_test_project, path_resolver):
+    """
+    Tests that previous results are reused as is when the stat matches, and that a touched file
+    with unchanged content is re-hashed but not parsed again.
+    stat が一致する場合は以前の結果がそのまま再利用され、内容の変わらない更新されたファイルは
+    再ハッシュされるものの再解析されないことをテストします。
+    """
+    proj_root = setup_analyzer_test_project
+    unchanged_path = proj_root / "file1.py"
+    touched_path = proj_root / "file2.py"
+    now = time.time_ns()
+    scan_results = [FileInfo(path=unchanged_path, size=10, mtime_ns=1),
+                    FileInfo(path=touched_path, size=10, mtime_ns=2)]
+    previous = {
+        str(unchanged_path): FileInfo(path=unchanged_path, size=10, hash="h1",
+                                      language="Python", dependencies=[DependencyInfo("os")], mtime_ns=1),
+        str(touched_path): FileInfo(path=touched_path, size=10, hash="h2",
+                                    language="Python", dependencies=[DependencyInfo("sys")], mtime_ns=1),
+    }
+    analyzer, mocks = mock_dependencies_for_analyze(proj_root, path_resolver, scan_results,
+                                                    hash_results={touched_path: "h2"})
+
+    results = {str(fi.path): fi for fi in analyzer.analyze(previous_results=previous)}
+
+    assert results[str(unchanged_path)] is previous[str(unchanged_path)]
+    assert results[str(touched_path)].mtime_ns == 2
+    assert results[str(touched_path)].dependencies == [DependencyInfo("sys")]
+    mocks["hash"].calculate_file_hash.assert_called_once()
+    mocks["ast"].parse_dependencies.assert_not_called()
+
+def test_analyze_parses_in_worker_processes(tmp_path, path_resolver):
+    """
+    Tests that Python files are parsed in worker processes once the file count exceeds the threshold,
+    with the same results as parsing in-process.
+    ファイル数がしきい値を超えると Python ファイルがワーカープロセスで解析され、
+    プロセス内で解析した場合と同じ結果になることをテストします。
+    """
+    (tmp_path / "main.py").write_text("import os\nfrom . import utils\n", encoding="utf-8")
+    (tmp_path / "broken.py").write_text("def broken(:\n", encoding="utf-8")
+    analyzer = ProjectAnalyzer(tmp_path, path_resolver=path_resolver, parse_in_processes=True)
+    analyzer.PROCESS_POOL_MIN_FILES = 0
+    try:
+        results = {fi.path.name: fi for fi in analyzer.analyze()}
+        pool = analyzer._process_pool
+        assert pool is not None
+        analyzer.analyze()
+        assert analyzer._process_pool is pool # One pool per analyzer, not per analysis
+    finally:
+        analyzer.close()
+    assert analyzer._process_pool is None
+
+    assert [dep.module_name for dep in results["main.py"].dependencies] == [".", "os"]
+    assert results["broken.py"].dependencies == []
+
+def test_analyze_parses_on_threads_by_default(tmp_path, path_resolver):
+    """
+    Tests that no worker process is started unless parse_in_processes is enabled.
+    parse_in_processes が有効でない限り、ワーカープロセスが起動されないことをテストします。
+    """
+    (tmp_path / "main.py").write_text("import os\n", encoding="utf-8")
+    analyzer = ProjectAnalyzer(tmp_path, path_resolver=path_resolver)
+    analyzer.PROCESS_POOL_MIN_FILES = 0
+
+    results = analyzer.analyze()
+
+    assert analyzer._process_pool is None
+    assert [dep.module_name for dep in results[0].dependencies] == ["os"]
+
 # --- More Tests for analyze Method Error Handling ---
 
 def test_analyze_handles_scan_directory_file_not_found(setup_analyzer_test_project, path_resolver):
@@ -754,8 +915,8 @@ def test_analyze_single_file_handles_hash_error(mocked_analyzer, setup_analyzer_
     analyzer, mocks = mocked_analyzer
     proj_root = setup_analyzer_test_project
     target_file = proj_root / "hash_err.py"
-    now = datetime.datetime.now(datetime.timezone.utc)
-    mock_file_info = FileInfo(path=target_file.resolve(), mtime=now, size=10)
+    now = time.time_ns()
+    mock_file_info = FileInfo(path=target_file.resolve(), mtime_ns=now, size=10)
 
     mocks["ignore"].should_ignore.return_value = False
     mocks["fs"].get_file_info.return_value = mock_file_info
@@ -785,8 +946,8 @@ def test_analyze_single_file_handles_language_detect_error(mocked_analyzer, setu
     analyzer, mocks = mocked_analyzer
     proj_root = setup_analyzer_test_project
     target_file = proj_root / "lang_err.dat"
-    now = datetime.datetime.now(datetime.timezone.utc)
-    mock_file_info = FileInfo(path=target_file.resolve(), mtime=now, size=10)
+    now = time.time_ns()
+    mock_file_info = FileInfo(path=target_file.resolve(), mtime_ns=now, size=10)
 
     mocks["ignore"].should_ignore.return_value = False
     mocks["fs"].get_file_info.return_value = mock_file_info
@@ -814,8 +975,8 @@ def test_analyze_single_file_handles_read_error_for_deps(mocked_analyzer, setup_
     analyzer, mocks = mocked_analyzer
     proj_root = setup_analyzer_test_project
     target_file = proj_root / "read_err.py"
-    now = datetime.datetime.now(datetime.timezone.utc)
-    mock_file_info = FileInfo(path=target_file.resolve(), mtime=now, size=10)
+    now = time.time_ns()
+    mock_file_info = FileInfo(path=target_file.resolve(), mtime_ns=now, size=10)
 
     mocks["ignore"].should_ignore.return_value = False
     mocks["fs"].get_file_info.return_value = mock_file_info
@@ -842,8 +1003,8 @@ def test_analyze_single_file_handles_syntax_error_for_deps(mocked_analyzer, setu
     proj_root = setup_analyzer_test_project
     target_file = proj_root / "syntax_err.py"
     file_content = "def oops("
-    now = datetime.datetime.now(datetime.timezone.utc)
-    mock_file_info = FileInfo(path=target_file.resolve(), mtime=now, size=10)
+    now = time.time_ns()
+    mock_file_info = FileInfo(path=target_file.resolve(), mtime_ns=now, size=10)
 
     mocks["ignore"].should_ignore.return_value = False
     mocks["fs"].get_file_info.return_value = mock_file_info
@@ -867,8 +1028,8 @@ def test_analyze_single_file_handles_generic_error_for_deps(mocked_analyzer, set
     proj_root = setup_analyzer_test_project
     target_file = proj_root / "generic_err.py"
     file_content = "import stuff"
-    now = datetime.datetime.now(datetime.timezone.utc)
-    mock_file_info = FileInfo(path=target_file.resolve(), mtime=now, size=10)
+    now = time.time_ns()
+    mock_file_info = FileInfo(path=target_file.resolve(), mtime_ns=now, size=10)
 
     mocks["ignore"].should_ignore.return_value = False
     mocks["fs"].get_file_info.return_value = mock_file_info
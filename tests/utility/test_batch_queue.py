@@ -0,0 +1,108 @@
+import threading
+import time
+
+from kotemari.utility.batch_queue import BatchQueue
+
+# --- Test put / drain --- #
+
+def test_drain_returns_all_items_in_order():
+    """
+    Tests that drain returns every queued item in FIFO order and empties the queue.
+    drain がキュー内のすべての要素を FIFO 順で返し、キューを空にすることをテストします。
+    """
+    q = BatchQueue()
+    q.put(1)
+    q.put_many([2, 3])
+    assert len(q) == 3
+    assert q.drain(timeout=0) == [1, 2, 3]
+    assert len(q) == 0
+
+def test_drain_times_out_with_empty_list():
+    """
+    Tests that drain returns an empty list when nothing arrives before the timeout.
+    タイムアウトまでに何も届かない場合、drain が空のリストを返すことをテストします。
+    """
+    q = BatchQueue()
+    start = time.monotonic()
+    assert q.drain(timeout=0.05) == []
+    assert time.monotonic() - start >= 0.04
+
+def test_drain_wakes_on_put_from_other_thread():
+    """
+    Tests that a blocked drain wakes up when another thread puts a batch.
+    別スレッドがバッチを追加したときに、ブロック中の drain が起床することをテストします。
+    """
+    q = BatchQueue()
+    threading.Timer(0.05, lambda: q.put_many(["a", "b"])).start()
+    assert q.drain(timeout=2.0) == ["a", "b"]
+
+# --- Test coalescing and bounding --- #
+
+def test_items_with_same_key_are_coalesced_in_place():
+    """
+    Tests that a newer item for a pending key replaces it without changing its position.
+    保留中のキーに対する新しい要素が、位置を変えずに置き換わることをテストします。
+    """
+    q = BatchQueue(key_func=lambda item: item[0])
+    q.put_many([("a", 1), ("b", 1), ("a", 2)])
+    assert len(q) == 2
+    assert q.drain(timeout=0) == [("a", 2), ("b", 1)]
+
+def test_unkeyed_item_is_a_coalescing_barrier():
+    """
+    Tests that items after an un-keyed item are not merged into slots before it.
+    キーのない要素より後の要素が、それより前のスロットに統合されないことをテストします。
+    """
+    q = BatchQueue(key_func=lambda item: item[0], merge_func=lambda old, new: (old[0], old[1] + new[1]))
+    q.put_many([("a", 1), ("a", 1), (None, 0), ("a", 5)])
+    assert q.drain(timeout=0) == [("a", 2), (None, 0), ("a", 5)]
+
+def test_overflow_drops_oldest_and_is_reported_once():
+    """
+    Tests that a full queue drops the oldest slot and reports the overflow once.
+    満杯のキューが最も古いスロットを破棄し、あふれを一度だけ報告することをテストします。
+    """
+    q = BatchQueue(maxsize=2)
+    q.put_many([1, 2, 3])
+    assert q.take_overflow() is True
+    assert q.take_overflow() is False
+    assert q.drain(timeout=0) == [2, 3]
+
+def test_drain_settle_collects_a_burst_in_one_batch():
+    """
+    Tests that drain with a settle window also returns items that arrive shortly after the first one.
+    settle を指定した drain が、最初の要素の直後に届いた要素もまとめて返すことをテストします。
+    """
+    q = BatchQueue(key_func=lambda item: item)
+    q.put("a.py")
+
+    def late_producer():
+        time.sleep(0.02)
+        q.put_many(["a.py", "b.py"])
+
+    producer = threading.Thread(target=late_producer)
+    producer.start()
+    assert q.drain(timeout=1.0, settle=0.2) == ["a.py", "b.py"]
+    producer.join()
+
+def test_interrupt_wakes_a_blocked_drain_once():
+    """
+    Tests that interrupt() wakes a consumer blocked in drain, skips the settle window, and is consumed.
+    interrupt() が drain でブロック中のコンシューマーを起こし、settle 時間を省略し、一度で消費されることをテストします。
+    """
+    q = BatchQueue()
+    interrupter = threading.Timer(0.05, q.interrupt)
+    interrupter.start()
+    start = time.monotonic()
+    assert q.drain(timeout=5.0) == []
+    assert time.monotonic() - start < 1.0
+    interrupter.join()
+
+    q.put(1)
+    q.interrupt()
+    start = time.monotonic()
+    assert q.drain(timeout=5.0, settle=5.0) == [1]
+    assert time.monotonic() - start < 1.0
+    # The interrupt was consumed, so the next drain waits for its timeout again
+    # 割り込みは消費されたため、次の drain は再びタイムアウトまで待機します
+    assert q.drain(timeout=0.05) == []
@@ -0,0 +1,35 @@
+import logging
+
+from kotemari.utility.error_log_sampler import ErrorLogSampler
+
+logger = logging.getLogger("test_error_log_sampler")
+
+def test_traceback_only_for_first_occurrences(caplog):
+    """
+    Tests that a repeated error carries a traceback only for the first occurrences,
+    and that a different error gets its own budget.
+    繰り返し発生するエラーは最初の数回のみトレースバックを持ち、
+    異なるエラーには個別の上限が適用されることをテストします。
+    """
+    sampler = ErrorLogSampler(max_tracebacks=2)
+    with caplog.at_level(logging.ERROR, logger=logger.name):
+        for _ in range(4):
+            sampler.log(logger, ValueError("boom"), "Failed on %s", "a.py")
+        sampler.log(logger, KeyError("other"), "Failed on %s", "b.py")
+
+    records = caplog.records
+    assert [r.exc_info is not None for r in records] == [True, True, False, False, True]
+    assert records[0].getMessage() == "Failed on a.py: boom"
+    assert records[3].getMessage() == "Failed on a.py: repeat (4) ValueError: boom"
+
+def test_counts_reset_after_interval(caplog):
+    """
+    Tests that the traceback is attached again once the reset interval has passed.
+    リセット間隔の経過後は再びトレースバックが付加されることをテストします。
+    """
+    sampler = ErrorLogSampler(max_tracebacks=1, reset_interval=0.0)
+    with caplog.at_level(logging.ERROR, logger=logger.name):
+        sampler.log(logger, ValueError("boom"), "Failed")
+        sampler.log(logger, ValueError("boom"), "Failed")
+
+    assert all(r.exc_info is not None for r in caplog.records)